@@ -1,12 +1,9 @@
 import streamlit as st
-import pandas as pd
-import os
-import random
-import json
-from PIL import Image
-import io
-import base64
-from datetime import datetime
+from utils.bank_stats import load_bank_stats
+from utils.store import get_store, current_user_id, make_badge
+from utils.question_index import get_question_index
+from utils.question_store import load_question_store
+from utils.metrics import track_page
 
 # 디버깅 모드 설정 (True면 켜짐, False면 꺼짐)
 DEBUG_MODE = False
@@ -16,6 +13,9 @@ def debug_print(message):
     if DEBUG_MODE:
         st.write(f"🐞 디버깅: {message}")
 
+# 실행 시간/횟수 지표 기록 (페이지를 처음 불러올 때 지표 내보내기도 시작)
+track_page("app")
+
 # 페이지 설정
 st.set_page_config(
     page_title="Anatomy Ace", 
@@ -97,10 +97,13 @@ st.markdown("""
 st.markdown("<div class='main-title'>🧠 Anatomy Ace - 해부학 모의고사</div>", unsafe_allow_html=True)
 st.markdown("<div class='subtitle'>해부학 시험 준비를 위한 모의고사 앱입니다.</div>", unsafe_allow_html=True)
 
-# 데이터 로드 - 간단하게 직접 로드
+# 사용자 식별 (URL의 uid 파라미터, 없으면 새로 만듦)
+user_id = current_user_id()
+
+# 통계 로드 - 문제 은행 버전마다 한 번 계산해서 은행 옆에 저장해 둔 스냅숏 사용
 try:
-    questions = pd.read_csv("data/questions.csv")
-    total_questions = len(questions)
+    bank_stats = load_bank_stats()
+    total_questions = bank_stats["total"]
     
     # 문제 수 표시 부분 삭제 (문제가 있으므로 표시하지 않음)
     # st.markdown(f"<div class='success-box'>✅ 총 {total_questions}개의 문제가 로드되었습니다.</div>", unsafe_allow_html=True)
@@ -112,9 +115,10 @@ except Exception as e:
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     if st.button("🚀 모의고사 시작하기", type="primary", use_container_width=True):
-        # 세션 상태 초기화
+        # 세션 상태 초기화 (사용자 ID는 유지)
         for key in list(st.session_state.keys()):
-            del st.session_state[key]
+            if key != "user_id":
+                del st.session_state[key]
         
         # 단순히 페이지 이동 (URL 파라미터 없이)
         st.switch_page("pages/exam.py")
@@ -136,7 +140,7 @@ st.markdown("""
 # 문제 유형 통계
 st.markdown("<div class='section-title'>📊 문제 유형 통계</div>", unsafe_allow_html=True)
 
-type_counts = questions['Type'].value_counts()
+type_counts = dict(bank_stats["counts"]["Type"])
 단답형_count = type_counts.get('단답형', 0)
 서술형_count = type_counts.get('서술형', 0)
 
@@ -159,13 +163,13 @@ with col2:
     """, unsafe_allow_html=True)
 
 # 연도별 문제 수 (선택 사항)
-if 'Year' in questions.columns:
+if bank_stats["counts"].get("Year"):
     st.markdown("<div class='section-title'>📅 연도별 문제 통계</div>", unsafe_allow_html=True)
-    year_counts = questions['Year'].value_counts().sort_index()
+    year_counts = bank_stats["counts"]["Year"]  # 연도 순 [연도, 문제 수] 목록
     
     # 연도별 문제 수 표시
     cols = st.columns(len(year_counts))
-    for i, (year, count) in enumerate(year_counts.items()):
+    for i, (year, count) in enumerate(year_counts):
         with cols[i]:
             st.markdown(f"""
             <div class='stats-card'>
@@ -197,13 +201,12 @@ if 'badges' not in st.session_state:
     st.session_state.badges = []
 
 def load_questions(category, num_questions=10):
-    file_path = f"questions/{category}.json"
-    with open(file_path, 'r', encoding='utf-8') as f:
-        all_questions = json.load(f)
-    
-    # 랜덤하게 문제 선택
-    selected_questions = random.sample(all_questions, min(num_questions, len(all_questions)))
-    return selected_questions
+    # 미리 만들어 둔 역색인에서 카테고리 조건으로 랜덤하게 문제 선택 (파일을 다시 읽지 않음)
+    # (Category 열이 없는 문제 은행이면 홈 화면에 안내하고 전체 문제에서 선택)
+    index = get_question_index()
+    categories = [category] if "Category" in index.fields else None
+    question_ids = index.sample(num_questions, Category=categories)
+    return load_question_store().get_questions(question_ids).to_dict("records")
 
 def start_quiz(category, num_questions=10):
     st.session_state.current_page = 'quiz'
@@ -334,12 +337,12 @@ def render_profile_page():
     # 배지 목록 표시
     st.header("획득한 배지")
     
-    if not st.session_state.badges:
+    # 저장소에서 최근 순으로 읽음 (탭을 닫아도 유지됨)
+    badges = get_store().user_badges(current_user_id())
+    
+    if not badges:
         st.info("아직 획득한 배지가 없습니다. 모의고사를 완료하면 배지를 획득할 수 있습니다.")
     else:
-        # 최근 순으로 정렬
-        badges = sorted(st.session_state.badges, key=lambda x: x['date'], reverse=True)
-        
         for i, badge in enumerate(badges):
             st.markdown(f"""
             <div style="border:2px solid gold; border-radius:10px; padding:10px; margin-bottom:10px; background-color:#f8f9fa;">
@@ -374,6 +377,8 @@ def render_home_page():
     }
     
     category = st.selectbox("카테고리 선택", list(categories.keys()), format_func=lambda x: categories[x])
+    if "Category" not in get_question_index().fields:
+        st.info("현재 문제 은행에는 카테고리 정보가 없어 모든 카테고리의 문제에서 출제됩니다.")
     num_questions = st.slider("문제 수", min_value=5, max_value=50, value=10, step=5)
     
     if st.button("모의고사 시작"):
@@ -481,38 +486,21 @@ def create_badge():
     if not hasattr(st.session_state, 'badges'):
         st.session_state.badges = []
     
-    # 현재 날짜와 시간
-    now = datetime.now()
-    date_str = now.strftime("%Y-%m-%d %H:%M")
-    
     # 배지 타입 결정 (일반 모의고사 또는 복습 모의고사)
     badge_type = "복습 모의고사" if st.session_state.review_mode else "일반 모의고사"
     
-    # 점수에 따른 등급 결정
-    percentage = st.session_state.percentage
-    if percentage >= 90:
-        grade = "🏆 최우수"
-    elif percentage >= 80:
-        grade = "🥇 우수"
-    elif percentage >= 70:
-        grade = "🥈 장려"
-    else:
-        grade = "🥉 노력"
-    
-    # 배지 생성
-    badge = {
-        "date": date_str,
-        "type": badge_type,
-        "category": st.session_state.category,
-        "score": f"{st.session_state.total_score}/{st.session_state.max_score}",
-        "percentage": f"{percentage:.1f}%",
-        "grade": grade,
-        "title": f"{badge_type} 완료: {grade}"
-    }
+    # 배지 생성 (점수에 따른 등급 포함)
+    badge = make_badge(
+        badge_type,
+        st.session_state.category,
+        st.session_state.total_score,
+        st.session_state.max_score,
+    )
     
-    # 배지 저장
+    # 배지 저장 (저장소에는 백그라운드에서 기록됨)
     st.session_state.badges.append(badge)
     st.session_state.latest_badge = badge
+    get_store().add_badge(current_user_id(), badge)
     
     if DEBUG_MODE:
         debug_print(f"배지 생성: {badge['title']}")
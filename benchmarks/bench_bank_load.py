@@ -0,0 +1,114 @@
+"""
+문제 은행 콜드 로드 벤치마크 (CSV vs 바이너리 아티팩트)
+
+실제 문제 은행을 여러 배로 복제한 가상 문제 은행을 만들고, CSV를 파싱/정리하는
+경우와 extract_keywords.py가 만드는 바이너리 아티팩트(.pkl)를 읽는 경우의
+로드 시간을 비교합니다. 매 측정은 새 프로세스에서 실행해서 캐시 영향을 없앱니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_bank_load --scales 1,100,1000
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from utils.question_bank import QUESTIONS_PATH, build_artifact
+
+# 새 프로세스에서 read_question_bank 한 번의 시간만 재는 코드 (import 시간 제외)
+_TIMING_SNIPPET = """
+import sys, time
+from utils.question_bank import read_question_bank
+start = time.perf_counter()
+read_question_bank(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+
+def make_scaled_bank(source_path, scale, directory):
+    """
+    원본 CSV를 scale배로 복제한 CSV와 아티팩트를 만드는 함수
+
+    Returns:
+    tuple: (CSV 경로, 아티팩트 경로, 문제 수)
+    """
+    raw = pd.read_csv(source_path)
+    scaled = pd.concat([raw] * scale, ignore_index=True)
+    # 복제한 문제도 ID가 겹치지 않게 다시 매김 (빈 행은 빈 ID 유지)
+    has_id = scaled["ID"].notna()
+    scaled.loc[has_id, "ID"] = range(1, int(has_id.sum()) + 1)
+
+    csv_path = os.path.join(directory, f"questions_x{scale}.csv")
+    scaled.to_csv(csv_path, index=False)
+    artifact_path = build_artifact(csv_path)
+    return csv_path, artifact_path, int(has_id.sum())
+
+
+def time_cold_load(path, repeats):
+    """새 프로세스에서 파일을 읽는 시간을 repeats번 재서 목록으로 반환하는 함수"""
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", _TIMING_SNIPPET, path],
+            capture_output=True, text=True, check=True, env=env,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문제 은행 콜드 로드 시간 비교 (CSV vs 아티팩트)")
+    parser.add_argument("--questions", default=QUESTIONS_PATH, help="원본 문제 CSV 파일 경로")
+    parser.add_argument("--scales", default="1,100,1000", help="원본을 몇 배로 복제할지 (쉼표 구분)")
+    parser.add_argument("--repeats", type=int, default=3, help="측정 반복 횟수")
+    parser.add_argument("--output", default="benchmarks/results/bank_load.json", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in [int(x) for x in args.scales.split(",")]:
+            csv_path, artifact_path, num_questions = make_scaled_bank(args.questions, scale, directory)
+            csv_times = time_cold_load(csv_path, args.repeats)
+            artifact_times = time_cold_load(artifact_path, args.repeats)
+
+            csv_median = statistics.median(csv_times)
+            artifact_median = statistics.median(artifact_times)
+            results.append({
+                "scale": scale,
+                "questions": num_questions,
+                "csv_bytes": os.path.getsize(csv_path),
+                "artifact_bytes": os.path.getsize(artifact_path),
+                "csv_load_s": round(csv_median, 4),
+                "artifact_load_s": round(artifact_median, 4),
+                "speedup": round(csv_median / artifact_median, 2),
+            })
+            print(f"문제 {num_questions:7d}개: CSV {csv_median * 1000:8.1f}ms, "
+                  f"아티팩트 {artifact_median * 1000:8.1f}ms ({csv_median / artifact_median:.1f}배)")
+
+    report = {
+        "benchmark": "bank_load",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "repeats": args.repeats,
+        "results": results,
+    }
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
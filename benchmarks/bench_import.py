@@ -0,0 +1,187 @@
+"""
+페이지 콜드 스타트 import 시간 벤치마크 (회귀 검사)
+
+페이지(app.py, pages/*.py)마다 새 프로세스에서 그 페이지의 최상위 import 문만
+`python -X importtime` 으로 실행해서, 페이지를 처음 열 때 드는 모듈 로드 시간과
+모듈별 비용을 기록합니다. Streamlit 자체의 import 시간은 모든 페이지가 똑같이
+내는 비용이므로 따로 재서 빼고, 페이지가 추가로 부르는 import 시간만 예산과
+비교합니다. --check 를 주면 예산을 넘거나 pandas/numpy 같은 무거운 모듈을 첫 실행에서
+바로 불러오는 페이지가 있을 때 종료 코드 1로 끝납니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --check --budget-ms 150
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+# 페이지를 처음 열 때 불러오면 안 되는 무거운 모듈 (필요한 코드 경로에서만 불러와야 함)
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "PIL")
+
+# 페이지별 추가 import 시간 예산 (ms, Streamlit import 시간 제외)
+DEFAULT_BUDGET_MS = 150
+
+# 결과에 남기는 페이지별 비용이 큰 모듈 수
+TOP_MODULES = 15
+
+# 모든 페이지가 공통으로 내는 기준 비용
+_BASELINE_IMPORTS = "import streamlit as st"
+
+
+def page_imports(page_path):
+    """
+    페이지 파일의 최상위 import 문만 골라서 소스 코드로 만드는 함수
+
+    Returns:
+    str: import 문 (한 줄에 하나)
+    """
+    with open(page_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=page_path)
+    statements = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(statements)
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime 출력을 모듈 -> (자체 시간, 누적 시간) (마이크로초)로 바꾸는 함수
+
+    같은 모듈은 한 번만 로드되므로 처음 나온 값을 사용합니다.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():  # 머리글 줄
+            continue
+        modules.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(source, extra_imports=""):
+    """
+    새 프로세스에서 source를 -X importtime 으로 실행해서 모듈별 import 시간을 재는 함수
+
+    Parameters:
+    source (str): 기준 import 문
+    extra_imports (str): 기준 import 뒤에 실행할 import 문 (페이지 import)
+
+    Returns:
+    dict: 모듈 -> (자체 시간, 누적 시간) (마이크로초)
+    """
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    # 앞 실행에서 생긴 .pyc 는 그대로 씀 (실제 서버 재시작과 같은 조건)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source + "\n" + extra_imports],
+        capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import 실패:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def page_cost(page_path, repeats):
+    """
+    페이지 하나의 추가 import 시간(ms, 반복 측정 중앙값)과 모듈별 비용을 구하는 함수
+
+    Returns:
+    dict: 측정 결과
+    """
+    imports = page_imports(page_path)
+    totals = []
+    runs = []
+    for _ in range(repeats):
+        modules = measure(_BASELINE_IMPORTS, imports)
+        baseline = measure(_BASELINE_IMPORTS)
+        # 기준(Streamlit)에서 이미 로드되는 모듈은 빼고, 페이지 때문에 새로 로드된 모듈의 자체 시간만 더함
+        extra = {name: times for name, times in modules.items() if name not in baseline}
+        totals.append(sum(self_us for self_us, _ in extra.values()) / 1000)
+        runs.append(extra)
+
+    # 중앙값에 해당하는 실행의 모듈별 비용을 기록
+    median_total, extra = sorted(zip(totals, runs), key=lambda run: run[0])[len(runs) // 2]
+    heaviest = sorted(extra.items(), key=lambda item: item[1][0], reverse=True)[:TOP_MODULES]
+    return {
+        "page": page_path,
+        "import_ms": round(median_total, 1),
+        "modules": len(extra),
+        "heavy_modules": sorted(m for m in HEAVY_MODULES if m in extra),
+        "top_modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cumulative_us / 1000, 2)}
+            for name, (self_us, cumulative_us) in heaviest
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이지 콜드 스타트 import 시간 측정 및 예산 검사")
+    parser.add_argument("--pages", default="app.py,pages/*.py", help="측정할 페이지 (쉼표 구분, glob 가능)")
+    parser.add_argument("--repeats", type=int, default=5, help="측정 반복 횟수")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="페이지별 추가 import 시간 예산 (ms, Streamlit import 제외)")
+    parser.add_argument("--check", action="store_true",
+                        help="예산을 넘거나 무거운 모듈을 바로 불러오는 페이지가 있으면 실패 (종료 코드 1)")
+    parser.add_argument("--output", default="benchmarks/results/import_time.json", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    pages = []
+    for pattern in args.pages.split(","):
+        pages.extend(sorted(glob.glob(pattern)))
+
+    baseline_ms = statistics.median(
+        sum(self_us for self_us, _ in measure(_BASELINE_IMPORTS).values()) / 1000 for _ in range(args.repeats)
+    )
+    print(f"Streamlit import (기준): {baseline_ms:8.1f}ms")
+
+    results = []
+    failures = []
+    for page in pages:
+        cost = page_cost(page, args.repeats)
+        over_budget = cost["import_ms"] > args.budget_ms
+        cost["over_budget"] = over_budget
+        results.append(cost)
+
+        heavy = ", ".join(cost["heavy_modules"]) or "-"
+        status = "예산 초과" if over_budget else "OK"
+        print(f"{page:20s} 추가 import {cost['import_ms']:8.1f}ms (모듈 {cost['modules']:4d}개, "
+              f"무거운 모듈: {heavy}) {status}")
+        for item in cost["top_modules"][:5]:
+            print(f"    {item['module']:40s} {item['self_ms']:7.2f}ms (누적 {item['cumulative_ms']:.2f}ms)")
+
+        if over_budget:
+            failures.append(f"{page}: {cost['import_ms']}ms > 예산 {args.budget_ms}ms")
+        if cost["heavy_modules"]:
+            failures.append(f"{page}: 첫 실행에서 무거운 모듈을 불러옴 ({heavy})")
+
+    report = {
+        "benchmark": "import_time",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeats": args.repeats,
+        "baseline_ms": round(baseline_ms, 1),
+        "budget_ms": args.budget_ms,
+        "results": results,
+    }
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+    if args.check and failures:
+        print("\n".join(["", "콜드 스타트 예산 검사 실패:"] + failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+채점 속도 벤치마크
+
+실제 문제 은행(data/questions.csv)의 문제마다 여러 종류의 가상 답변을 만들고
+utils.scoring.check_answer 의 처리량과 지연 시간(p50/p95/p99)을 문제 유형별로
+측정해서 JSON 파일로 저장합니다. 기타 유형(other)은 문제마다 유형만 바꾼 사본으로
+측정합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_scoring
+    python -m benchmarks.bench_scoring --output new.json --baseline old.json
+    python -m benchmarks.bench_scoring --fuzzy --output fuzzy.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+
+from utils.question_bank import QUESTIONS_PATH, read_question_bank
+from utils.scoring import check_answer, get_compiled_keywords
+
+# 답변 종류 (typo: 키워드마다 글자 하나를 바꾼 긴 답변, 오타 허용 채점의 최악의 경우)
+ANSWER_CASES = ["empty", "exact", "partial", "numbered", "essay", "typo"]
+
+# 긴 서술형 답변의 목표 길이 (글자 수)
+ESSAY_LENGTH = 3000
+
+ESSAY_FILLER = "해부학적 구조와 기능을 설명하면 다음과 같다. "
+
+# 문제 은행에 없는 유형(기타 유형 채점 경로)을 측정할 때 쓰는 유형 이름
+#   문제 은행에는 단답형/서술형만 있으므로 문제마다 유형만 바꾼 사본을 만들어 측정
+OTHER_TYPE = "기타"
+
+
+def type_group(question_type):
+    """문제 유형을 벤치마크 집계 단위로 바꾸는 함수"""
+    if question_type in ("단답형", "서술형"):
+        return question_type
+    return "other"
+
+
+def make_answers(question_data, rng):
+    """
+    문제 하나에 대한 가상 답변을 종류별로 만드는 함수
+
+    Parameters:
+    question_data (Series): 문제 데이터
+    rng (Random): 난수 생성기
+
+    Returns:
+    dict: 답변 종류 -> 답변 문자열
+    """
+    keywords = list(get_compiled_keywords(question_data).keywords)
+    answer = str(question_data["Answer"])
+
+    partial = rng.sample(keywords, max(1, len(keywords) // 2)) if keywords else []
+    numbered = " ".join(f"{i + 1}) {kw}" for i, kw in enumerate(keywords))
+
+    # 정답과 키워드 사이에 일반 문장을 섞어서 긴 서술형 답변 만들기
+    essay_parts = [answer]
+    while sum(len(p) for p in essay_parts) < ESSAY_LENGTH:
+        essay_parts.append(ESSAY_FILLER)
+        if keywords:
+            essay_parts.append(rng.choice(keywords))
+
+    # 키워드마다 글자 하나를 바꾸고 긴 서술형 답변과 같은 길이로 채움
+    typo_parts = []
+    for kw in keywords:
+        if kw:
+            position = rng.randrange(len(kw))
+            kw = kw[:position] + rng.choice("가나다abc") + kw[position + 1:]
+        typo_parts.append(kw)
+    typo = " ".join(typo_parts)
+    while len(typo) < ESSAY_LENGTH:
+        typo += " " + ESSAY_FILLER
+
+    return {
+        "empty": "",
+        "exact": answer,
+        "partial": " ".join(partial),
+        "numbered": numbered,
+        "essay": " ".join(essay_parts),
+        "typo": typo,
+    }
+
+
+def summarize(samples_ns):
+    """지연 시간 표본(ns)을 요약하는 함수"""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    total_seconds = samples.sum() / 1e6
+    return {
+        "calls": int(samples.size),
+        "throughput_per_s": round(samples.size / total_seconds, 1) if total_seconds else None,
+        "mean_us": round(float(samples.mean()), 3),
+        "p50_us": round(float(np.percentile(samples, 50)), 3),
+        "p95_us": round(float(np.percentile(samples, 95)), 3),
+        "p99_us": round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def run_benchmark(path, rounds, seed, fuzzy=False):
+    """
+    벤치마크를 실행하는 함수
+
+    Parameters:
+    path (str): 문제 CSV 파일 경로
+    rounds (int): 답변마다 반복 채점할 횟수
+    seed (int): 가상 답변 생성용 시드
+    fuzzy (bool): 오타 허용 채점으로 측정
+
+    Returns:
+    dict: 유형별, 답변 종류별 요약 결과
+    """
+    questions = read_question_bank(path)
+    rng = random.Random(seed)
+
+    cases = []
+    for _, question_data in questions.iterrows():
+        other_type = question_data.copy()
+        other_type["Type"] = OTHER_TYPE
+        for case, answer in make_answers(question_data, rng).items():
+            cases.append((type_group(question_data["Type"]), case, answer, question_data))
+            cases.append((type_group(OTHER_TYPE), case, answer, other_type))
+
+    # 채점 전에 한 번씩 돌려서 캐시/지연 초기화 비용 제외
+    for _, _, answer, question_data in cases:
+        check_answer(answer, question_data, fuzzy=fuzzy)
+
+    samples = {}
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(rounds):
+        # 순서를 섞어서 분기 예측/캐시 효과가 한쪽에 몰리지 않게 함
+        rng.shuffle(cases)
+        for group, case, answer, question_data in cases:
+            start = perf_counter_ns()
+            check_answer(answer, question_data, fuzzy=fuzzy)
+            samples.setdefault((group, case), []).append(perf_counter_ns() - start)
+
+    by_type = {}
+    for group in sorted({group for group, _ in samples}):
+        group_samples = [s for (g, _), values in samples.items() if g == group for s in values]
+        by_type[group] = summarize(group_samples)
+        by_type[group]["cases"] = {
+            case: summarize(samples[(group, case)])
+            for case in ANSWER_CASES if (group, case) in samples
+        }
+
+    all_samples = [s for values in samples.values() for s in values]
+    return {
+        "questions": len(questions),
+        "overall": summarize(all_samples),
+        "by_type": by_type,
+    }
+
+
+def git_commit():
+    """현재 git 커밋 해시 (git이 없으면 None)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result, baseline, max_regression):
+    """
+    기준 결과와 비교해서 p95 지연 시간이 허용치 이상 느려진 항목을 찾는 함수
+
+    Returns:
+    list: 느려진 항목 설명 문자열 목록
+    """
+    regressions = []
+    for group, current in result["by_type"].items():
+        previous = baseline.get("by_type", {}).get(group)
+        if not previous:
+            continue
+        for case, stats in current["cases"].items():
+            old = previous.get("cases", {}).get(case)
+            if not old or not old["p95_us"]:
+                continue
+            change = stats["p95_us"] / old["p95_us"] - 1
+            if change > max_regression:
+                regressions.append(
+                    f"{group}/{case}: p95 {old['p95_us']}us -> {stats['p95_us']}us (+{change:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check_answer 채점 속도 벤치마크")
+    parser.add_argument("--questions", default=QUESTIONS_PATH, help="문제 CSV 파일 경로")
+    parser.add_argument("--rounds", type=int, default=200, help="답변마다 반복 채점할 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="가상 답변 생성용 시드")
+    parser.add_argument("--output", default="benchmarks/results/scoring.json", help="결과 JSON 파일 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="허용하는 p95 지연 시간 증가율 (기본 0.25 = 25%%)")
+    parser.add_argument("--fuzzy", action="store_true", help="오타 허용 채점(fuzzy=True)으로 측정")
+    args = parser.parse_args()
+
+    result = {
+        "benchmark": "scoring",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rounds": args.rounds,
+        "seed": args.seed,
+        "fuzzy": args.fuzzy,
+    }
+    result.update(run_benchmark(args.questions, args.rounds, args.seed, args.fuzzy))
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    overall = result["overall"]
+    print(f"전체: {overall['throughput_per_s']}회/초, p50 {overall['p50_us']}us, "
+          f"p95 {overall['p95_us']}us, p99 {overall['p99_us']}us")
+    for group, stats in result["by_type"].items():
+        print(f"  {group}: {stats['throughput_per_s']}회/초, p50 {stats['p50_us']}us, "
+              f"p95 {stats['p95_us']}us, p99 {stats['p99_us']}us")
+    print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.max_regression)
+        if regressions:
+            print("속도 저하 발견:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print("기준 결과 대비 속도 저하 없음")
+
+
+if __name__ == "__main__":
+    main()
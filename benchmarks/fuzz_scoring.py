@@ -0,0 +1,405 @@
+"""
+채점 엔진 차등 퍼징 (differential fuzzing)
+
+benchmarks/reference_scoring.py 에 얼려둔 기준 check_answer와 후보 채점 함수를
+같은 (답변, 문제) 쌍으로 돌려서 (정답 여부, 점수)가 하나라도 다르면 찾아냅니다.
+답변은 실제 문제 은행(data/questions.csv)의 문제마다 경계 사례(빈 답변, 키워드
+일부/전부, 번호 항목 개수, 대소문자/공백, 소수점 숫자 ...)와 무작위 답변을 만들고,
+문제도 키워드 없이 정답을 나눠 쓰는 경우와 기타 유형으로 바꿔서 함께 확인합니다.
+차이가 난 답변은 차이가 유지되는 가장 짧은 답변으로 줄여서(delta debugging)
+보고하고, 같은 사례를 채점하는 데 걸린 시간으로 기준 대비 속도도 알려줍니다.
+
+후보는 "모듈:함수" 형식이며 check_answer(user_answer, question_data)와 같이
+호출할 수 있어야 합니다. 차이가 있으면 종료 코드 1로 끝납니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.fuzz_scoring
+    python -m benchmarks.fuzz_scoring --candidate mypackage.fast:check_answer --cases-per-question 2000
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import re
+import time
+from datetime import datetime
+
+from benchmarks import reference_scoring
+from benchmarks.bench_scoring import git_commit
+from utils.question_bank import QUESTIONS_PATH, read_question_bank
+
+DEFAULT_CANDIDATE = "utils.scoring:check_answer"
+
+# 문제 변형 (bank: 문제 은행 그대로, compiled: 미리 컴파일한 채점 기준 없이,
+#           answer_split: 키워드 없이 정답을 나눠서 키워드로, other_type: 단답형/서술형이 아닌 유형)
+QUESTION_VARIANTS = ["bank", "compiled", "answer_split", "other_type"]
+
+# 후보가 미리 컴파일한 채점 기준을 쓰지 못하게 지우는 열
+PRECOMPILED_COLUMNS = ["Matcher", "KeywordList"]
+
+# 무작위 답변에 섞는 조각 (번호 항목 패턴, 소수점 숫자, 구두점, 공백)
+NUMBER_TOKENS = ["1)", "2)", "3) ", "1.", "2. ", "10)", "1.5", "3.14", "2)3)", "1)1."]
+FILLER_TOKENS = ["는", "이다", "and", "the", ",", ";", ".", "(", ")", "-", "~", "·"]
+SEPARATORS = [" ", "", "  ", ", ", "; ", "\n", "\t"]
+MUTATION_CHARS = "가나다ㄱㅏabcXYZ019 .)(;,-　 "
+
+# 보고서에 남기는 후보별 최대 실패 사례 수
+MAX_FAILURES = 20
+
+
+def load_candidate(spec):
+    """
+    "모듈:함수" 문자열로 후보 채점 함수를 불러오는 함수
+
+    Returns:
+    callable: 채점 함수
+    """
+    module_name, _, attribute = spec.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"후보는 '모듈:함수' 형식이어야 합니다: {spec}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def question_variants(question_data):
+    """
+    문제 하나를 채점 경로별 변형으로 만드는 함수
+
+    Returns:
+    dict: 변형 이름 -> 문제 데이터 (Series)
+    """
+    compiled = question_data.drop(PRECOMPILED_COLUMNS, errors="ignore")
+    other_type = compiled.copy()
+    other_type["Type"] = "기타"
+    return {
+        "bank": question_data,
+        "compiled": compiled,
+        "answer_split": compiled.drop("Keywords", errors="ignore"),
+        "other_type": other_type,
+    }
+
+
+def answer_fragments(question_data):
+    """
+    답변을 만들 재료 (키워드, 정답을 번호/구분자로 나눈 항목)를 꺼내는 함수
+
+    채점 기준을 그대로 재현할 필요는 없으므로 후보나 기준 구현의 코드는 쓰지 않습니다.
+
+    Returns:
+    tuple: (키워드 목록, 정답 항목 목록)
+    """
+    keywords = question_data.get("Keywords")
+    keywords = [kw.strip() for kw in keywords.split(";") if kw.strip()] if isinstance(keywords, str) else []
+    answer = str(question_data["Answer"])
+    items = [item.strip() for item in re.split(r"\s*\d+\)\s*|\s*\d+\.\s*|[;,\n]", answer) if item.strip()]
+    return keywords, items or [answer.strip()]
+
+
+def edge_case_answers(question_data):
+    """
+    문제 하나에 대한 경계 사례 답변을 만드는 함수
+
+    키워드 개수 k개(0~전부)를 포함한 답변으로 부분 점수의 모든 비율(round()의
+    .5 경계 포함)을, 번호 항목 수를 0~키워드 수+1까지 바꾼 답변으로 서술형의
+    번호 항목 제한과 0.99 기준을 확인합니다.
+
+    Returns:
+    list: 답변 문자열 목록
+    """
+    keywords, items = answer_fragments(question_data)
+    answer = str(question_data["Answer"])
+    answers = ["", " ", "\t\n", answer, answer.upper(), f"  {answer}  ", answer.replace(" ", ""),
+               answer.lower().strip() + ".", "1.5 " + answer]
+
+    for parts in (keywords, items):
+        if not parts:
+            continue
+        answers.extend(parts)
+        answers.extend(part.upper() for part in parts)
+        answers.extend(part[:-1] for part in parts if len(part) > 1)
+        answers.extend(part + part for part in parts)
+        for separator in (" ", ", ", "\n", ""):
+            answers.append(separator.join(parts))
+        answers.append(" ".join(reversed(parts)))
+        # 앞에서부터 k개만 포함 (모든 부분 점수 비율)
+        answers.extend(" ".join(parts[:k]) for k in range(1, len(parts)))
+        # 번호 항목 m개 (나머지는 번호 없이)
+        for m in range(len(parts) + 2):
+            numbered = [f"{i + 1}) {part}" for i, part in enumerate(parts[:m])] + parts[m:]
+            answers.append(" ".join(numbered))
+            answers.append(" ".join(f"{i + 1}.{part}" for i, part in enumerate(parts[:m])))
+        answers.append(" ".join(f"{i + 1}){part}" for i, part in enumerate(parts)))
+        answers.append(" ".join(f"{i + 1}. {part}" for i, part in enumerate(parts)) + " 4)")
+    return answers
+
+
+def random_answer(question_data, rng):
+    """
+    키워드/정답 조각, 번호 패턴, 구두점을 무작위로 섞고 글자를 바꾼 답변을 만드는 함수
+
+    Parameters:
+    question_data (Series): 문제 데이터
+    rng (Random): 난수 생성기
+
+    Returns:
+    str: 답변
+    """
+    keywords, items = answer_fragments(question_data)
+    pool = keywords + items + NUMBER_TOKENS + FILLER_TOKENS
+    tokens = []
+    for _ in range(rng.randint(1, 12)):
+        token = rng.choice(pool)
+        roll = rng.random()
+        if roll < 0.1:
+            token = token.upper()
+        elif roll < 0.2 and len(token) > 1:
+            start = rng.randrange(len(token))
+            token = token[start:rng.randint(start + 1, len(token))]
+        tokens.append(token)
+        tokens.append(rng.choice(SEPARATORS))
+    text = "".join(tokens)
+
+    # 글자 단위 변형 (삽입, 삭제, 바꾸기)
+    for _ in range(rng.choice((0, 0, 1, 2, 4))):
+        position = rng.randint(0, len(text))
+        operation = rng.randrange(3)
+        if operation == 0:
+            text = text[:position] + rng.choice(MUTATION_CHARS) + text[position:]
+        elif operation == 1:
+            text = text[:position] + text[position + 1:]
+        else:
+            text = text[:position] + rng.choice(MUTATION_CHARS) + text[position + 1:]
+    if rng.random() < 0.1:
+        text = rng.choice(SEPARATORS) + text + rng.choice(SEPARATORS)
+    return text
+
+
+def make_cases(questions, cases_per_question, seed):
+    """
+    (문제 ID, 변형 이름, 문제 데이터, 답변) 사례 목록을 만드는 함수
+
+    Parameters:
+    questions (DataFrame): 문제 은행
+    cases_per_question (int): 문제마다 만드는 무작위 답변 수 (변형마다 같은 답변)
+    seed (int): 난수 시드
+
+    Returns:
+    list: 사례 목록
+    """
+    rng = random.Random(seed)
+    cases = []
+    for _, question_data in questions.iterrows():
+        answers = edge_case_answers(question_data)
+        answers.extend(random_answer(question_data, rng) for _ in range(cases_per_question))
+        for variant, variant_data in question_variants(question_data).items():
+            cases.extend((int(question_data["ID"]), variant, variant_data, answer) for answer in answers)
+    return cases
+
+
+def outcome(function, user_answer, question_data):
+    """채점 결과 (예외가 나면 예외 종류를 결과로 봄 - 기준과 같은 예외면 같은 결과)"""
+    try:
+        return function(user_answer, question_data)
+    except Exception as e:
+        return ("error", type(e).__name__)
+
+
+def same_outcome(expected, actual):
+    """(정답 여부, 점수)가 값과 종류(정답 여부는 bool, 점수는 정수/실수)까지 같은지 확인하는 함수"""
+    if expected != actual:
+        return False
+    if expected[0] == "error":
+        return True
+    return (isinstance(expected[0], bool) == isinstance(actual[0], bool)
+            and isinstance(expected[1], float) == isinstance(actual[1], float))
+
+
+def minimize(text, still_fails):
+    """
+    차이가 유지되는 가장 짧은 답변을 찾는 함수 (글자 단위 delta debugging, ddmin)
+
+    Parameters:
+    text (str): 차이가 난 답변
+    still_fails (callable): 답변 -> 아직 차이가 나는지
+
+    Returns:
+    str: 줄인 답변 (어느 한 글자를 더 빼도 차이가 사라짐)
+    """
+    chars = list(text)
+    granularity = 2
+    while len(chars) >= 2:
+        size = len(chars) // granularity
+        chunks = [chars[i:i + size] for i in range(0, len(chars), size)] if size else [[c] for c in chars]
+        reduced = False
+        for i in range(len(chunks)):
+            # 조각 하나만 남기기 -> 조각 하나만 빼기 순서로 시도
+            subset = chunks[i]
+            complement = [c for j, chunk in enumerate(chunks) if j != i for c in chunk]
+            if still_fails("".join(subset)):
+                chars, granularity, reduced = subset, 2, True
+                break
+            if still_fails("".join(complement)):
+                chars, granularity, reduced = complement, max(granularity - 1, 2), True
+                break
+        if not reduced:
+            if granularity >= len(chars):
+                break
+            granularity = min(granularity * 2, len(chars))
+    if len(chars) == 1 and still_fails(""):
+        chars = []
+    return "".join(chars)
+
+
+def time_engines(reference, candidate, cases, rounds):
+    """
+    기준과 후보가 사례를 채점하는 데 걸린 시간을 문제 변형별로 재는 함수
+
+    측정 순서에 따른 치우침(캐시, GC)을 줄이려고 변형마다 기준과 후보를 번갈아
+    rounds번 돌리고 가장 짧은 시간을 씁니다. 예외가 나는 사례는 넘겨받기 전에 뺍니다.
+
+    Returns:
+    dict: 변형 이름 -> (기준 시간, 후보 시간) (초)
+    """
+    perf_counter = time.perf_counter
+    timings = {}
+    for variant in QUESTION_VARIANTS:
+        variant_cases = [(question_data, answer) for _, name, question_data, answer in cases if name == variant]
+        best = [None, None]
+        for _ in range(rounds):
+            for slot, function in enumerate((reference, candidate)):
+                start = perf_counter()
+                for question_data, answer in variant_cases:
+                    function(answer, question_data)
+                elapsed = perf_counter() - start
+                best[slot] = elapsed if best[slot] is None else min(best[slot], elapsed)
+        if variant_cases:
+            timings[variant] = tuple(best)
+    return timings
+
+
+def speed_report(reference_seconds, candidate_seconds):
+    """기준/후보 시간과 속도 비율 (기준 시간 / 후보 시간, 1보다 크면 후보가 빠름)"""
+    return {
+        "reference_seconds": round(reference_seconds, 4),
+        "candidate_seconds": round(candidate_seconds, 4),
+        "speedup": round(reference_seconds / candidate_seconds, 2) if candidate_seconds else None,
+    }
+
+
+def fuzz_candidate(candidate, cases, expected, rounds, max_failures=MAX_FAILURES):
+    """
+    후보 채점 함수 하나를 기준 결과와 비교하고 속도를 재는 함수
+
+    Parameters:
+    candidate (callable): 후보 채점 함수
+    cases (list): make_cases()의 사례 목록
+    expected (list): 사례별 기준 결과
+    rounds (int): 시간 측정 반복 횟수
+    max_failures (int): 줄여서 보고할 최대 실패 사례 수
+
+    Returns:
+    dict: 비교/속도 결과
+    """
+    reference = reference_scoring.check_answer
+    mismatches = 0
+    failures = []
+    seen = set()
+    timed = []
+    for case, reference_result in zip(cases, expected):
+        question_id, variant, question_data, answer = case
+        actual = outcome(candidate, answer, question_data)
+        if reference_result[0] != "error" and actual[0] != "error":
+            timed.append(case)
+        if same_outcome(reference_result, actual):
+            continue
+        mismatches += 1
+        if len(failures) >= max_failures:
+            continue
+
+        def still_fails(text, question_data=question_data):
+            return not same_outcome(outcome(reference, text, question_data), outcome(candidate, text, question_data))
+
+        minimized = minimize(answer, still_fails)
+        if (question_id, variant, minimized) in seen:
+            continue
+        seen.add((question_id, variant, minimized))
+        failures.append({
+            "question_id": question_id,
+            "variant": variant,
+            "type": question_data["Type"],
+            "answer": answer,
+            "minimized": minimized,
+            "reference": list(outcome(reference, minimized, question_data)),
+            "candidate": list(outcome(candidate, minimized, question_data)),
+        })
+
+    # 속도는 두 구현 모두 예외 없이 채점한 사례로만 비교
+    # (bank 변형이 실제 서비스 경로, 나머지는 채점 기준을 채점할 때마다 만드는 경로)
+    timings = time_engines(reference, candidate, timed, rounds)
+    report = {
+        "cases": len(cases),
+        "mismatches": mismatches,
+        "failures": failures,
+        "timed_cases": len(timed),
+    }
+    report.update(speed_report(sum(t[0] for t in timings.values()), sum(t[1] for t in timings.values())))
+    report["by_variant"] = {variant: speed_report(*times) for variant, times in timings.items()}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채점 엔진 차등 퍼징 (기준 check_answer와 점수 비교)")
+    parser.add_argument("--candidate", action="append",
+                        help=f"비교할 채점 함수 '모듈:함수' (여러 번 지정 가능, 기본 {DEFAULT_CANDIDATE})")
+    parser.add_argument("--questions", default=QUESTIONS_PATH, help="문제 CSV 파일 경로")
+    parser.add_argument("--cases-per-question", type=int, default=300, help="문제마다 만드는 무작위 답변 수")
+    parser.add_argument("--seed", type=int, default=0, help="답변 생성용 시드")
+    parser.add_argument("--rounds", type=int, default=3, help="속도 측정 반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--output", default="benchmarks/results/fuzz_scoring.json", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    questions = read_question_bank(args.questions)
+    cases = make_cases(questions, args.cases_per_question, args.seed)
+    expected = [outcome(reference_scoring.check_answer, answer, question_data)
+                for _, _, question_data, answer in cases]
+
+    result = {
+        "benchmark": "fuzz_scoring",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "questions": len(questions),
+        "cases_per_question": args.cases_per_question,
+        "candidates": {},
+    }
+    for spec in args.candidate or [DEFAULT_CANDIDATE]:
+        result["candidates"][spec] = fuzz_candidate(load_candidate(spec), cases, expected, args.rounds)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    failed = False
+    for spec, report in result["candidates"].items():
+        print(f"{spec}: 사례 {report['cases']}개, 불일치 {report['mismatches']}개, "
+              f"기준 {report['reference_seconds']}초 -> 후보 {report['candidate_seconds']}초 "
+              f"(x{report['speedup']})")
+        for variant, speed in report["by_variant"].items():
+            print(f"  {variant}: 기준 {speed['reference_seconds']}초 -> 후보 {speed['candidate_seconds']}초 "
+                  f"(x{speed['speedup']})")
+        for failure in report["failures"]:
+            print(f"  문제 {failure['question_id']} ({failure['variant']}, {failure['type']}): "
+                  f"{failure['minimized']!r} 기준 {failure['reference']} / 후보 {failure['candidate']}")
+        failed = failed or report["mismatches"] > 0
+    print(f"결과 저장: {args.output}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+동시 접속 부하 테스트
+
+로컬에서 `streamlit run app.py` 서버를 띄우고, 브라우저 대신 웹소켓 클라이언트
+N개를 동시에 붙여서 홈 화면 -> '모의고사 시작하기' -> 문제 풀이(답변 제출, 다음 문제)
+흐름을 그대로 진행합니다. 동시 접속 수를 늘려가며 다음을 기록합니다.
+
+- 초당 스크립트 실행(rerun) 횟수
+- 사용자 동작 하나당 응답 시간과 스크립트 실행 1회당 평균 시간
+- 서버 프로세스의 최대 RSS와 세션당 메모리 증가량 (RSS 차이로 구한 근삿값)
+- 응답 시간이 1명일 때보다 크게 나빠지기 시작하는 동시 접속 수
+
+네트워크 없이 리눅스 한 대에서 동작합니다 (/proc 에서 메모리를 읽음).
+서버는 임시 폴더의 저장소(ANATOMY_ACE_STORE_PATH)에 기록하므로 data/anatomy_ace.db의
+실제 응시 기록은 바뀌지 않습니다.
+Streamlit과 함께 설치되는 websockets 패키지를 사용합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.load_test --levels 1,2,4,8,16,32 --questions 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+# st.rerun() 때문에 중간에 끝난 스크립트 실행 (뒤이어 다시 실행됨)
+FINISHED_EARLY_FOR_RERUN = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+
+# 응답 하나를 기다리는 최대 시간 (초)
+RESPONSE_TIMEOUT = 60
+
+
+def read_memory_kb(pid):
+    """
+    /proc 에서 프로세스의 현재 RSS와 최대 RSS(kB)를 읽는 함수
+
+    Returns:
+    tuple: (VmRSS, VmHWM)
+    """
+    values = {}
+    with open(f"/proc/{pid}/status", encoding="ascii") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(rest.split()[0])
+    return values.get("VmRSS", 0), values.get("VmHWM", 0)
+
+
+def start_server(port, store_path):
+    """
+    부하 테스트용 Streamlit 서버를 띄우고 준비될 때까지 기다리는 함수
+
+    Parameters:
+    port (int): 서버 포트
+    store_path (str): 서버가 응시 기록을 쓸 저장소 파일 경로 (실제 저장소 대신 쓰는 임시 파일)
+    """
+    command = [
+        sys.executable, "-m", "streamlit", "run", "app.py",
+        "--server.headless", "true",
+        "--server.port", str(port),
+        "--server.enableCORS", "false",
+        "--server.enableXsrfProtection", "false",
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+    ]
+    env = dict(os.environ, ANATOMY_ACE_STORE_PATH=store_path)
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Streamlit 서버가 시작되지 않았습니다.")
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+
+    server.terminate()
+    raise RuntimeError("Streamlit 서버가 제한 시간 안에 준비되지 않았습니다.")
+
+
+class SimulatedSession:
+    """웹소켓으로 서버에 붙는 가상 학생 한 명"""
+
+    def __init__(self, url, answer, think_time, rng):
+        self.url = url
+        self.answer = answer
+        self.think_time = think_time
+        self.rng = rng
+        self.page_hash = ""
+        self.widgets = []
+        self.latencies = []
+        self.script_runs = 0
+        self.questions_done = 0
+        self.error = None
+
+    async def interact(self, ws, widget_states=()):
+        """
+        위젯 상태를 보내서 스크립트를 다시 실행시키고, 최종 실행이 끝날 때까지 기다리는 함수
+
+        Parameters:
+        ws: 웹소켓 연결
+        widget_states (list): (위젯 id, 값) 목록, 값이 True이면 버튼 클릭
+        """
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_script_hash = self.page_hash
+        for widget_id, value in widget_states:
+            widget = client_state.widget_states.widgets.add()
+            widget.id = widget_id
+            if value is True:
+                widget.trigger_value = True
+            else:
+                widget.string_value = value
+
+        start = time.perf_counter()
+        await ws.send(message.SerializeToString())
+
+        # st.rerun()/st.switch_page()는 같은 요청 안에서 스크립트를 여러 번 실행시킴
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await asyncio.wait_for(ws.recv(), RESPONSE_TIMEOUT))
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = msg.new_session.page_script_hash
+                self.widgets = []
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in ("button", "text_area"):
+                    widget = getattr(element, element_type)
+                    self.widgets.append((element_type, widget.id, widget.label))
+            elif kind == "script_finished":
+                self.script_runs += 1
+                if msg.script_finished != FINISHED_EARLY_FOR_RERUN:
+                    break
+
+        self.latencies.append(time.perf_counter() - start)
+
+    def find_widget(self, element_type, label_part):
+        for widget_type, widget_id, label in self.widgets:
+            if widget_type == element_type and label_part in label:
+                return widget_id
+        return None
+
+    async def think(self):
+        if self.think_time > 0:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.think_time))
+
+    async def run(self, num_questions, all_done, measured):
+        """홈 화면부터 문제 num_questions개를 풀 때까지 진행하는 함수"""
+        try:
+            async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None) as ws:
+                await self.interact(ws)
+
+                start_button = self.find_widget("button", "모의고사 시작하기")
+                await self.interact(ws, [(start_button, True)])
+
+                # 시험 구성 화면은 기본 조건 그대로 시작
+                compose_button = self.find_widget("button", "이 구성으로 시작하기")
+                if compose_button is not None:
+                    await self.interact(ws, [(compose_button, True)])
+
+                while self.questions_done < num_questions:
+                    text_area = self.find_widget("text_area", "답변")
+                    submit = self.find_widget("button", "답변 제출")
+                    if text_area is None or submit is None:
+                        break  # 모든 문제 완료
+
+                    await self.think()
+                    await self.interact(ws, [(text_area, self.answer), (submit, True)])
+
+                    next_button = self.find_widget("button", "다음 문제로")
+                    if next_button is None:
+                        raise RuntimeError("채점 결과 화면이 표시되지 않았습니다.")
+                    await self.interact(ws, [(next_button, True)])
+                    self.questions_done += 1
+
+                # 메모리 측정이 끝날 때까지 세션(연결)을 유지
+                all_done.release()
+                await measured.wait()
+        except Exception as e:  # 부하 상황의 모든 실패를 기록
+            self.error = f"{type(e).__name__}: {e}"
+            all_done.release()
+
+
+def percentile_ms(values, q):
+    if not values:
+        return None
+    return round(float(np.percentile(np.asarray(values) * 1000, q)), 2)
+
+
+async def run_level(url, server_pid, num_sessions, num_questions, answer, think_time, seed):
+    """동시 접속 수 하나에 대한 부하 테스트를 실행하는 함수"""
+    rss_before, _ = read_memory_kb(server_pid)
+
+    all_done = asyncio.Semaphore(0)
+    measured = asyncio.Event()
+    sessions = [
+        SimulatedSession(url, answer, think_time, random.Random(seed + i))
+        for i in range(num_sessions)
+    ]
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(s.run(num_questions, all_done, measured)) for s in sessions]
+    for _ in sessions:
+        await all_done.acquire()
+    elapsed = time.perf_counter() - start
+
+    # 모든 세션이 살아 있는 상태에서 메모리 측정
+    rss_with_sessions, peak_rss = read_memory_kb(server_pid)
+    measured.set()
+    await asyncio.gather(*tasks)
+
+    latencies = [x for s in sessions for x in s.latencies]
+    script_runs = sum(s.script_runs for s in sessions)
+    errors = [s.error for s in sessions if s.error]
+    return {
+        "sessions": num_sessions,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "questions_answered": sum(s.questions_done for s in sessions),
+        "wall_time_s": round(elapsed, 3),
+        "interactions": len(latencies),
+        "script_runs": script_runs,
+        "reruns_per_s": round(script_runs / elapsed, 2) if elapsed else None,
+        "mean_ms_per_script_run": round(sum(latencies) / script_runs * 1000, 2) if script_runs else None,
+        "latency_p50_ms": percentile_ms(latencies, 50),
+        "latency_p95_ms": percentile_ms(latencies, 95),
+        "latency_p99_ms": percentile_ms(latencies, 99),
+        "rss_before_kb": rss_before,
+        "rss_with_sessions_kb": rss_with_sessions,
+        "peak_rss_kb": peak_rss,
+        "memory_per_session_kb": round((rss_with_sessions - rss_before) / num_sessions, 1),
+    }
+
+
+async def run_load_test(args, server_pid):
+    url = f"ws://localhost:{args.port}/_stcore/stream"
+    levels = [int(x) for x in args.levels.split(",")]
+
+    # 첫 접속에서만 드는 비용(페이지 import, 문제 은행 로드)은 결과에서 제외
+    await run_level(url, server_pid, 1, 1, args.answer, 0, args.seed)
+
+    results = []
+    baseline_p95 = None
+    saturation = None
+    for num_sessions in levels:
+        result = await run_level(url, server_pid, num_sessions, args.questions,
+                                 args.answer, args.think_time, args.seed)
+        results.append(result)
+        print(f"동시 {num_sessions:4d}명: {result['reruns_per_s']} rerun/초, "
+              f"p95 {result['latency_p95_ms']}ms, 세션당 {result['memory_per_session_kb']}kB, "
+              f"오류 {result['errors']}")
+
+        if baseline_p95 is None:
+            baseline_p95 = result["latency_p95_ms"]
+        degraded = result["errors"] > 0 or (
+            baseline_p95 and result["latency_p95_ms"] > args.degradation_factor * baseline_p95
+        )
+        if degraded and saturation is None:
+            saturation = num_sessions
+            if not args.keep_going:
+                break
+
+    healthy = [r["sessions"] for r in results if saturation is None or r["sessions"] < saturation]
+    return {
+        "levels": results,
+        "baseline_p95_ms": baseline_p95,
+        "degradation_factor": args.degradation_factor,
+        "degraded_at_sessions": saturation,
+        "max_healthy_sessions": max(healthy) if healthy else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모의고사 흐름 동시 접속 부하 테스트")
+    parser.add_argument("--levels", default="1,2,4,8,16,32,64", help="차례로 시험할 동시 접속 수 (쉼표 구분)")
+    parser.add_argument("--questions", type=int, default=5, help="세션마다 풀 문제 수")
+    parser.add_argument("--answer", default="anteriorly epidermis basal layer", help="제출할 답변")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="동작 사이 평균 대기 시간(초), 0이면 쉬지 않고 요청")
+    parser.add_argument("--degradation-factor", type=float, default=2.0,
+                        help="1명일 때 p95 응답 시간의 몇 배부터 성능 저하로 볼지")
+    parser.add_argument("--keep-going", action="store_true", help="성능 저하가 나타나도 모든 단계를 실행")
+    parser.add_argument("--port", type=int, default=8599, help="테스트 서버 포트")
+    parser.add_argument("--seed", type=int, default=0, help="대기 시간 난수 시드")
+    parser.add_argument("--output", default="benchmarks/results/load_test.json", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="anatomy_ace_load_test_") as store_dir:
+        server = start_server(args.port, os.path.join(store_dir, "anatomy_ace.db"))
+        try:
+            report = asyncio.run(run_load_test(args, server.pid))
+        finally:
+            server.terminate()
+            server.wait()
+
+    report.update({
+        "benchmark": "load_test",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "questions_per_session": args.questions,
+        "think_time_s": args.think_time,
+    })
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if report["degraded_at_sessions"]:
+        print(f"동시 {report['degraded_at_sessions']}명에서 응답 시간이 크게 늘어났습니다. "
+              f"(정상 범위 최대 {report['max_healthy_sessions']}명)")
+    else:
+        print("시험한 모든 동시 접속 수에서 성능 저하가 없었습니다.")
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
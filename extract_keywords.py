@@ -1,69 +1,371 @@
-import pandas as pd
+import argparse
+import json
+import os
 import re
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from utils.question_bank import build_artifact
+from utils.question_store import build_question_store
+from utils.bank_stats import build_bank_stats
+
+# 원본 문제 파일과 키워드를 붙여 저장할 파일
+SOURCE_PATH = 'data/Integrated data.csv'
+OUTPUT_PATH = 'data/questions.csv'
+
+# 행 해시 -> 키워드 캐시 (이전 실행 결과를 재사용해서 바뀐 행만 다시 추출)
+CACHE_PATH = 'data/.keywords_cache.json'
+
+# 추출 규칙이 바뀌면 올려서 이전 캐시를 무효화
+EXTRACTOR_VERSION = 1
+
+# 해시 계산에 쓰는 열
+HASH_COLUMNS = ['Question', 'Answer', 'Type']
+
+# 분할 처리 모드에서 워커마다 동시에 맡겨 두는 조각 수 (메모리 상한)
+CHUNKS_PER_WORKER = 2
+
+# 추출에 쓰는 정규식 (미리 컴파일)
+BRACKETS = re.compile(r'\((.*?)\)')
+ENGLISH_TERMS = re.compile(r'[a-zA-Z][a-zA-Z\s]{2,}')
+NUMBER_TERMS = re.compile(r'\d+[\s\w]+')
+PART_SEPARATORS = re.compile(r'[,;()]')
+
+
+def _finalize_keywords(keywords):
+    """중복/빈 문자열을 제거하고 최대 10개까지 세미콜론으로 이어 붙이는 함수"""
+    # 중복 제거 및 빈 문자열 제거 (순서 유지)
+    unique_keywords = list(dict.fromkeys(k for k in (k.strip() for k in keywords) if k and len(k) > 1))
+
+    # 키워드가 너무 많으면 중요한 것만 선택
+    if len(unique_keywords) > 10:
+        unique_keywords = unique_keywords[:10]
+
+    # 세미콜론으로 구분된 문자열로 변환
+    return ';'.join(unique_keywords)
+
+
+def _short_answer_keywords(answer, brackets):
+    """단답형 키워드: 정답 자체, 쉼표로 구분된 항목, 괄호 안의 내용"""
+    keywords = [answer.strip()]
+    keywords.extend(p.strip() for p in answer.split(','))
+    keywords.extend(b.strip() for b in brackets)
+    return keywords
+
+
+def _essay_keywords(brackets, english_terms, numbers, parts):
+    """서술형 키워드: 괄호 안의 내용, 영어 용어, 숫자 표현, 길이가 3자 초과인 구절"""
+    keywords = [b.strip() for b in brackets]
+    keywords.extend(term.strip() for term in english_terms)
+    keywords.extend(n.strip() for n in numbers)
+    for part in parts:
+        part = part.strip()
+        if len(part) > 3 and not part.isdigit():  # 길이가 3자 이상인 의미있는 단어만
+            keywords.append(part)
+    return keywords
 
-# CSV 파일 읽기
-df = pd.read_csv('data/Integrated data.csv')
 
 # 키워드 추출 함수
 def extract_keywords(row):
+    """
+    문제 한 행에서 키워드를 추출하는 함수
+
+    Parameters:
+    row (Series): 문제 데이터 (Answer, Type 열 필요)
+
+    Returns:
+    str: 세미콜론으로 구분된 키워드 문자열
+    """
     # 답변 텍스트 가져오기
     answer = str(row['Answer']).lower()
-    
-    # 키워드 저장할 리스트
-    keywords = []
-    
-    # 단답형인 경우
+    brackets = BRACKETS.findall(answer)
+
     if row['Type'] == '단답형':
-        # 기본 키워드는 정답 자체
-        main_answer = answer.strip()
-        keywords.append(main_answer)
-        
-        # 쉼표로 구분된 항목들 추가
-        parts = [p.strip() for p in answer.split(',')]
-        keywords.extend(parts)
-        
-        # 괄호 안의 내용 추가
-        brackets = re.findall(r'\((.*?)\)', answer)
-        keywords.extend([b.strip() for b in brackets])
-        
-    # 서술형인 경우
+        keywords = _short_answer_keywords(answer, brackets)
     else:
-        # 중요 단어 추출
-        # 괄호 안의 내용 추출
-        brackets = re.findall(r'\((.*?)\)', answer)
-        keywords.extend([b.strip() for b in brackets])
-        
-        # 영어 단어나 구문 추출
-        english_terms = re.findall(r'[a-zA-Z][a-zA-Z\s]{2,}', answer)
-        keywords.extend([term.strip() for term in english_terms])
-        
-        # 숫자가 포함된 표현 추출
-        numbers = re.findall(r'\d+[\s\w]+', answer)
-        keywords.extend([n.strip() for n in numbers])
-        
-        # 중요 한글 용어 추출 (세미콜론이나 쉼표로 구분된 항목)
-        for part in re.split(r'[,;()]', answer):
-            part = part.strip()
-            if len(part) > 3 and not part.isdigit():  # 길이가 3자 이상인 의미있는 단어만
-                keywords.append(part)
-    
-    # 중복 제거 및 빈 문자열 제거
-    unique_keywords = []
-    for k in keywords:
-        k = k.strip()
-        if k and k not in unique_keywords and len(k) > 1:
-            unique_keywords.append(k)
-    
-    # 키워드가 너무 많으면 중요한 것만 선택
-    if len(unique_keywords) > 10:
-        unique_keywords = unique_keywords[:10]
-    
-    # 세미콜론으로 구분된 문자열로 변환
-    return ';'.join(unique_keywords)
+        keywords = _essay_keywords(
+            brackets,
+            ENGLISH_TERMS.findall(answer),
+            NUMBER_TERMS.findall(answer),
+            PART_SEPARATORS.split(answer),
+        )
+    return _finalize_keywords(keywords)
+
+
+def extract_keywords_column(df):
+    """
+    여러 행의 키워드를 한 번에 추출하는 함수 (정규식은 pandas 문자열 연산으로 일괄 처리)
+
+    Parameters:
+    df (DataFrame): 문제 데이터 (Answer, Type 열 필요)
+
+    Returns:
+    list: 행 순서대로 키워드 문자열 목록
+    """
+    # str(NaN) == 'nan' 까지 행 단위 처리와 같게 맞춤
+    answers = pd.Series([str(a) for a in df['Answer'].tolist()], index=df.index, dtype=object).str.lower()
+    is_short = [t == '단답형' for t in df['Type'].tolist()]
+
+    brackets = answers.str.findall(BRACKETS).tolist()
+    english_terms = answers.str.findall(ENGLISH_TERMS).tolist()
+    numbers = answers.str.findall(NUMBER_TERMS).tolist()
+    parts = answers.str.split(PART_SEPARATORS).tolist()
+
+    results = []
+    for i, answer in enumerate(answers.tolist()):
+        if is_short[i]:
+            keywords = _short_answer_keywords(answer, brackets[i])
+        else:
+            keywords = _essay_keywords(brackets[i], english_terms[i], numbers[i], parts[i])
+        results.append(_finalize_keywords(keywords))
+    return results
+
+
+def row_hashes(df):
+    """Question/Answer/Type 내용으로 행마다 안정적인 해시(16진수 문자열)를 계산하는 함수"""
+    hashes = pd.util.hash_pandas_object(df[HASH_COLUMNS], index=False)
+    return [format(h, '016x') for h in hashes.tolist()]
+
+
+def load_cache(path):
+    """키워드 캐시를 읽는 함수 (없거나 버전이 다르면 빈 캐시)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != EXTRACTOR_VERSION:
+        return {}
+    return cache.get('keywords', {})
+
+
+def save_cache(path, keywords):
+    """키워드 캐시를 저장하는 함수 (임시 파일에 쓴 뒤 교체)"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': EXTRACTOR_VERSION, 'keywords': keywords}, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def add_keywords(df, cache):
+    """
+    캐시에 없는(새로 추가되었거나 바뀐) 행만 키워드를 추출해서 Keywords 열을 붙이는 함수
+
+    Parameters:
+    df (DataFrame): 원본 문제 데이터
+    cache (dict): 행 해시 -> 키워드 문자열
+
+    Returns:
+    tuple: (Keywords 열이 붙은 DataFrame, 새 캐시, 새로 추출한 행 수)
+    """
+    hashes = row_hashes(df)
+    keywords = [cache.get(h) for h in hashes]
+
+    missing = [i for i, k in enumerate(keywords) if k is None]
+    if missing:
+        extracted = extract_keywords_column(df.iloc[missing])
+        for i, k in zip(missing, extracted):
+            keywords[i] = k
+
+    df = df.assign(Keywords=keywords)
+    # 현재 파일에 있는 행만 캐시에 남김
+    return df, dict(zip(hashes, keywords)), len(missing)
+
+
+def scan_dtypes(path, chunksize):
+    """
+    원본 CSV를 조각 단위로 한 번 훑어서 열마다 최종 자료형을 정하는 함수
+
+    한 번에 읽을 때와 같은 자료형으로 읽어야 출력(예: 1 / 1.0)이 똑같아집니다.
+    조각마다 추론된 자료형이 다르면 정수+실수는 실수로, 나머지는 문자열로 맞춥니다.
+
+    Returns:
+    dict: 열 이름 -> 자료형
+    """
+    found = {}
+    has_null = set()
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for column in chunk.columns:
+            found.setdefault(column, set())
+            not_null = chunk[column].notna()
+            if not not_null.all():
+                has_null.add(column)
+            # 값이 모두 비어 있는 조각은 자료형 결정에 쓰지 않음
+            if not_null.any():
+                found[column].add(chunk[column].dtype)
+
+    is_number = pd.api.types.is_numeric_dtype
+    is_bool = pd.api.types.is_bool_dtype
+    dtypes = {}
+    for column, kinds in found.items():
+        if not kinds:
+            dtype = 'float64'
+        elif len(kinds) == 1:
+            dtype = kinds.pop()
+        elif all(is_number(k) and not is_bool(k) for k in kinds):
+            dtype = 'float64'
+        else:
+            dtype = 'str'
+        # 빈 값이 섞인 정수/논리 열은 한 번에 읽을 때처럼 실수/객체가 됨
+        if column in has_null and dtype not in ('float64', 'str'):
+            if pd.api.types.is_integer_dtype(dtype):
+                dtype = 'float64'
+            elif is_bool(dtype):
+                dtype = 'object'
+        dtypes[column] = dtype
+    return dtypes
+
+
+def _extract_shard(chunk, keywords, shard_path):
+    """
+    워커 프로세스에서 조각 하나의 빈 키워드를 채우고 조각 파일(헤더 없음)로 쓰는 함수
+
+    Returns:
+    list: 조각의 행 순서대로 키워드 문자열 목록
+    """
+    missing = [i for i, k in enumerate(keywords) if k is None]
+    if missing:
+        for i, k in zip(missing, extract_keywords_column(chunk.iloc[missing])):
+            keywords[i] = k
+    chunk.assign(Keywords=keywords).to_csv(shard_path, index=False, header=False)
+    return keywords
+
+
+def add_keywords_chunked(input_path, output_path, cache, cache_path, chunksize, workers):
+    """
+    원본 CSV를 조각 단위로 읽어 프로세스 풀에서 키워드를 추출하고, 조각 파일을
+    원래 순서대로 이어 붙여 출력 파일을 만드는 함수
+
+    새 캐시도 조각이 끝날 때마다 캐시 파일에 이어 쓰므로, 메모리에는 워커마다
+    몇 개의 조각과 이전 캐시만 올라갑니다. 결과는 한 번에 처리할 때와 같습니다.
+
+    Parameters:
+    input_path (str): 원본 CSV 파일 경로
+    output_path (str): 키워드를 붙여 저장할 CSV 파일 경로
+    cache (dict): 이전 캐시 (행 해시 -> 키워드 문자열)
+    cache_path (str): 새 캐시를 저장할 파일 경로
+    chunksize (int): 조각 하나의 행 수
+    workers (int): 프로세스 수
+
+    Returns:
+    tuple: (전체 행 수, 새로 추출한 행 수)
+    """
+    dtypes = scan_dtypes(input_path, chunksize)
+    total = 0
+    extracted = 0
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    cache_temp_path = cache_path + '.tmp'
+    with tempfile.TemporaryDirectory(dir=output_dir) as shard_dir, \
+            ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(cache_temp_path, 'w', encoding='utf-8') as cache_file:
+        shard_paths = []
+        pending = {}
+        header = None
+        # load_cache가 읽는 것과 같은 형식 (같은 해시가 여러 번 나와도 키워드는 같음)
+        cache_file.write(f'{{"version": {EXTRACTOR_VERSION}, "keywords": {{')
+        separator = ''
+
+        def collect(done):
+            nonlocal extracted, separator
+            for future in done:
+                hashes, num_missing = pending.pop(future)
+                for h, k in zip(hashes, future.result()):
+                    cache_file.write(f'{separator}{json.dumps(h)}: {json.dumps(k, ensure_ascii=False)}')
+                    separator = ', '
+                extracted += num_missing
+
+        for index, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize, dtype=dtypes)):
+            if header is None:
+                header = chunk.iloc[:0].assign(Keywords=[]).to_csv(index=False)
+            hashes = row_hashes(chunk)
+            keywords = [cache.get(h) for h in hashes]
+            total += len(chunk)
+
+            shard_path = os.path.join(shard_dir, f'{index:08d}.csv')
+            shard_paths.append(shard_path)
+            future = pool.submit(_extract_shard, chunk, keywords, shard_path)
+            pending[future] = (hashes, sum(k is None for k in keywords))
+
+            # 맡겨 둔 조각이 많으면 하나라도 끝날 때까지 기다림
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(wait(pending)[0])
+        cache_file.write('}}')
+
+        # 조각 파일을 원래 순서대로 이어 붙인 뒤 한 번에 교체
+        temp_path = output_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8', newline='') as out:
+            out.write(header or '')
+            for shard_path in shard_paths:
+                with open(shard_path, encoding='utf-8', newline='') as shard:
+                    shutil.copyfileobj(shard, out)
+        os.replace(temp_path, output_path)
+    os.replace(cache_temp_path, cache_path)
+
+    return total, extracted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문제 데이터에서 채점 키워드를 추출합니다.")
+    parser.add_argument('--input', default=SOURCE_PATH, help="원본 문제 CSV 파일 경로")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="키워드를 붙여 저장할 CSV 파일 경로")
+    parser.add_argument('--cache', default=CACHE_PATH, help="키워드 캐시 파일 경로")
+    parser.add_argument('--full', action='store_true', help="캐시를 무시하고 모든 행을 다시 추출")
+    parser.add_argument('--chunksize', type=int,
+                        help="지정하면 원본을 이 행 수만큼씩 나눠 여러 프로세스에서 처리 (큰 원본용). "
+                             "이때는 출력 CSV 전체를 다시 읽어야 하는 바이너리 문제 은행/문제 저장소/통계를 "
+                             "만들지 않음 (앱은 그동안 CSV를 직접 읽음, --derived로 함께 생성)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="분할 처리 모드에서 사용할 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--derived', action='store_true',
+                        help="분할 처리 모드에서도 바이너리 문제 은행/문제 저장소/통계를 생성 (출력 CSV를 한 번에 읽음)")
+    args = parser.parse_args()
+
+    previous_cache = {} if args.full else load_cache(args.cache)
+    if args.chunksize:
+        # 조각 단위로 읽고 추출해서 바로 출력 파일과 캐시 파일로 합침
+        total, extracted = add_keywords_chunked(
+            args.input, args.output, previous_cache, args.cache, args.chunksize, max(1, args.workers or 1))
+    else:
+        # CSV 파일 읽기
+        df = pd.read_csv(args.input)
+
+        # 키워드 추출 적용 (바뀐 행만)
+        df, cache, extracted = add_keywords(df, previous_cache)
+        total = len(df)
+
+        # 결과 저장
+        df.to_csv(args.output, index=False)
+        if cache != previous_cache:
+            save_cache(args.cache, cache)
+
+    print(f"키워드 추출 완료! 전체 {total}행 중 {extracted}행을 새로 추출했습니다. "
+          f"'{args.output}' 파일이 생성되었습니다.")
+
+    if args.chunksize and not args.derived:
+        # 파생 파일은 출력 CSV를 한 번에 읽어야 하므로 분할 처리 모드에서는 만들지 않음
+        # (현재 CSV로 만든 것이 아니면 앱은 CSV를 직접 읽음)
+        print("분할 처리 모드라서 바이너리 문제 은행/문제 저장소/통계는 만들지 않았습니다. "
+              "필요하면 --derived를 붙여 다시 실행하세요.")
+        return
+
+    # 앱이 CSV 대신 바로 읽을 수 있도록 정리/타입 변환된 바이너리 문제 은행도 생성
+    artifact_path = build_artifact(args.output)
+    print(f"바이너리 문제 은행 생성 완료! '{artifact_path}' 파일이 생성되었습니다.")
+
+    # 페이지에서 문제를 ID로 하나씩 읽을 수 있는 메모리 매핑 저장소도 생성
+    store_path = build_question_store(args.output)
+    print(f"문제 저장소 생성 완료! '{store_path}' 파일이 생성되었습니다.")
+
+    # 홈 화면에서 쓰는 문제 은행 통계 스냅숏
+    stats_path = build_bank_stats(args.output)
+    print(f"문제 은행 통계 생성 완료! '{stats_path}' 파일이 생성되었습니다.")
 
-# 키워드 추출 적용
-df['Keywords'] = df.apply(extract_keywords, axis=1)
 
-# 결과 저장
-df.to_csv('data/questions.csv', index=False)
-print("키워드 추출 완료! 'data/questions.csv' 파일이 생성되었습니다.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.question_bank import QUESTIONS_PATH, ArtifactError, preferred_source, read_question_bank
+from utils.scoring import check_answer
+
+# 입력 파일의 문제 ID, 답변 열(필드) 이름 (응시 기록 저장소의 results 테이블과 같음)
+ID_COLUMN = 'question_id'
+ANSWER_COLUMN = 'user_answer'
+
+# 워커에 한 번에 맡기는 행 수
+CHUNKSIZE = 2000
+
+# 워커마다 동시에 맡겨 두는 조각 수 (메모리 상한)
+CHUNKS_PER_WORKER = 2
+
+# 채점 방식이 바뀌면 올려서 이전 결과를 모두 다시 채점
+GRADER_VERSION = 1
+
+# 워커 프로세스마다 한 번 읽는 문제 은행 (문제 ID -> 문제 데이터)
+_questions = None
+_options = None
+_similarity_index = None
+
+
+def load_questions(bank_path, synonyms=False):
+    """
+    문제 은행을 읽어 문제 ID -> 문제 데이터(dict, 컴파일된 채점 기준 포함)로 만드는 함수
+
+    앱과 같은 파일(현재 CSV로 만든 .pkl 아티팩트가 있으면 아티팩트)을 읽습니다.
+    synonyms면 동의어 채점용 데이터도 읽을 때 한 번 만듭니다.
+    """
+    source = preferred_source(bank_path)
+    try:
+        questions = read_question_bank(source, synonyms)
+    except ArtifactError:
+        questions = read_question_bank(bank_path, synonyms)
+    return {int(record['ID']): record for record in questions.to_dict('records')}
+
+
+def options_digest(questions, options):
+    """
+    문제 한 개가 아니라 채점 옵션 전체에 걸린 상태의 해시를 만드는 함수
+
+    synonyms면 동의어 사전 파일 내용, similarity면 IDF를 계산하는 문제 은행 전체
+    정답이 채점 결과를 바꾸므로, 켜진 옵션에 해당하는 것만 해시에 넣습니다.
+
+    Parameters:
+    questions (dict): 문제 ID -> 문제 데이터
+    options (dict): 채점 옵션 (fuzzy, synonyms, similarity)
+
+    Returns:
+    str: 해시 (켜진 옵션이 없으면 빈 문자열)
+    """
+    if not (options.get('synonyms') or options.get('similarity')):
+        return ''
+    digest = hashlib.sha1()
+    if options.get('synonyms'):
+        from utils.synonyms import SYNONYMS_PATH
+
+        with open(SYNONYMS_PATH, 'rb') as f:
+            digest.update(f.read())
+    if options.get('similarity'):
+        answers = [[qid, str(question['Answer'])] for qid, question in questions.items()]
+        digest.update(json.dumps(answers, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def keywords_hash(question_data, options, context=''):
+    """
+    채점 결과에 영향을 주는 문제 정보(유형, 배점, 정답, 키워드)와 채점 옵션의 해시
+
+    증분 모드에서 이 값이 이전 실행과 같은 행은 다시 채점하지 않습니다.
+    context는 options_digest의 값 (동의어 사전, 문제 은행 전체 정답)입니다.
+    """
+    payload = [
+        GRADER_VERSION,
+        str(question_data['Type']),
+        int(question_data['Points']),
+        str(question_data['Answer']),
+        list(question_data['Matcher'].keywords),
+        sorted(options.items()),
+    ]
+    if context:
+        payload.append(context)
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def _init_worker(bank_path, options):
+    """워커 프로세스 시작 시 문제 은행을 한 번 읽는 함수"""
+    global _questions, _options, _similarity_index
+    _questions = load_questions(bank_path, options['synonyms'])
+    _options = options
+    if options['similarity']:
+        from utils.similarity import SimilarityIndex
+
+        _similarity_index = SimilarityIndex(
+            list(_questions), [question['Answer'] for question in _questions.values()])
+
+
+def _grade_chunk(items):
+    """
+    워커 프로세스에서 조각 하나를 채점하는 함수
+
+    Parameters:
+    items (list): (문제 ID, 답변) 목록
+
+    Returns:
+    list: 같은 순서의 (정답 여부, 점수), 은행에 없는 문제는 None
+    """
+    rows = [(i, _questions.get(qid), answer) for i, (qid, answer) in enumerate(items)]
+    rows = [(i, question, answer) for i, question, answer in rows if question is not None]
+
+    similarity = {}
+    if _similarity_index is not None:
+        # 조각의 서술형 답변 유사도는 한 번에 계산
+        essays = [(i, question, answer) for i, question, answer in rows
+                  if question['Type'] == '서술형' and answer]
+        cosines = _similarity_index.similarities(
+            [question['ID'] for _, question, _ in essays], [answer for _, _, answer in essays])
+        similarity = dict(zip((i for i, _, _ in essays), cosines.tolist()))
+
+    results = [None] * len(items)
+    for i, question, answer in rows:
+        results[i] = check_answer(answer, question, fuzzy=_options['fuzzy'],
+                                  synonyms=_options['synonyms'], similarity=similarity.get(i))
+    return results
+
+
+def detect_format(path, fmt=None):
+    """파일 형식 (--format 지정 또는 확장자로 csv / jsonl)"""
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(path, fmt):
+    """
+    입력 파일을 한 행씩 읽는 생성기 (파일 전체를 메모리에 올리지 않음)
+
+    Yields:
+    dict: 열 이름 -> 값
+    """
+    # 긴 서술형 답변이 CSV 기본 필드 크기 제한(128KB)을 넘을 수 있음
+    csv.field_size_limit(1 << 30)
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+class RowWriter:
+    """결과 행을 CSV 또는 JSONL로 쓰는 객체 (CSV 열 순서는 첫 행 기준)"""
+
+    def __init__(self, f, fmt):
+        self.f = f
+        self.fmt = fmt
+        self._writer = None
+
+    def write(self, row):
+        if self.fmt == 'jsonl':
+            self.f.write(json.dumps(row, ensure_ascii=False) + '\n')
+            return
+        if self._writer is None:
+            self._writer = csv.DictWriter(self.f, fieldnames=list(row), extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(row)
+
+
+def _same_row(row, previous, id_column, answer_column):
+    """이전 결과 행이 같은 입력 행에 대한 것인지 확인하는 함수"""
+    return (previous is not None
+            and str(previous.get(id_column)) == str(row.get(id_column))
+            and (previous.get(answer_column) or '') == (row.get(answer_column) or ''))
+
+
+def _previous_result(previous, fmt):
+    """이전 결과 행에서 (정답 여부, 점수)를 꺼내는 함수"""
+    is_correct, score = previous['is_correct'], previous['score']
+    if fmt == 'csv':
+        is_correct, score = is_correct == 'True', int(score)
+    return bool(is_correct), int(score)
+
+
+def grade_file(input_path, output_path, bank_path=QUESTIONS_PATH, previous_path=None,
+               workers=None, chunksize=CHUNKSIZE, options=None, input_format=None,
+               output_format=None, id_column=ID_COLUMN, answer_column=ANSWER_COLUMN):
+    """
+    (문제 ID, 답변) 파일을 스트리밍으로 읽어 프로세스 풀에서 채점하고, 입력 순서대로
+    결과를 쓰는 함수
+
+    조각 단위로 워커에 맡기고, 맡겨 둔 조각이 workers * CHUNKS_PER_WORKER개가 되면
+    가장 먼저 맡긴 조각의 결과를 기다려 씁니다. 그래서 입력이 아무리 커도 메모리에는
+    그만큼의 조각만 올라갑니다.
+
+    previous_path(이전 실행의 결과 파일)를 주면 같은 입력 행이고 keywords_hash가
+    지금 문제 은행과 같은 행은 이전 결과를 그대로 쓰고, 나머지만 다시 채점합니다.
+    이전 결과 파일은 입력과 같은 순서로 나란히 읽습니다.
+
+    Parameters:
+    input_path (str): 입력 CSV/JSONL 파일
+    output_path (str): 결과 파일 ('-'이면 표준 출력)
+    bank_path (str): 문제 CSV 파일 경로
+    previous_path (str): 이전 결과 파일 (증분 모드)
+    workers (int): 프로세스 수 (기본: CPU 코어 수)
+    chunksize (int): 워커에 한 번에 맡기는 행 수
+    options (dict): 채점 옵션 (fuzzy, synonyms, similarity)
+
+    Returns:
+    dict: 처리한 행 수 (total, graded, reused, unknown)
+    """
+    options = {'fuzzy': False, 'synonyms': False, 'similarity': False, **(options or {})}
+    workers = max(1, workers or os.cpu_count() or 1)
+    input_format = detect_format(input_path, input_format)
+    output_format = output_format or (detect_format(output_path) if output_path != '-' else input_format)
+
+    # 증분 모드 비교용 문제별 해시 (워커와 같은 문제 은행)
+    questions = load_questions(bank_path)
+    context = options_digest(questions, options)
+    hashes = {qid: keywords_hash(question, options, context) for qid, question in questions.items()}
+
+    counts = {'total': 0, 'graded': 0, 'reused': 0, 'unknown': 0}
+    previous_format = detect_format(previous_path) if previous_path else None
+    previous_rows = read_rows(previous_path, previous_format) if previous_path else iter(())
+
+    out = sys.stdout if output_path == '-' else open(output_path + '.tmp', 'w', encoding='utf-8', newline='')
+    writer = RowWriter(out, output_format)
+    pending = deque()  # 입력 순서의 (행 목록, 행별 결과, 채점을 맡긴 행 위치, Future)
+
+    def flush_oldest():
+        rows, results, positions, future = pending.popleft()
+        if future is not None:
+            for position, result in zip(positions, future.result()):
+                results[position] = result
+        # 입력 열 뒤에 is_correct, score, keywords_hash(채점에 쓴 문제 정보의 해시) 열을 붙임
+        for row, result in zip(rows, results):
+            qid_hash = row.pop('_hash')
+            if result is None:
+                row.update(is_correct=None, score=None, keywords_hash=None)
+            else:
+                row.update(is_correct=result[0], score=result[1], keywords_hash=qid_hash)
+            writer.write(row)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(bank_path, options)) as pool:
+            def submit(rows):
+                results = [None] * len(rows)
+                items = []
+                positions = []
+                for position, row in enumerate(rows):
+                    previous = next(previous_rows, None)
+                    if row['_hash'] is None:
+                        counts['unknown'] += 1
+                    elif _same_row(row, previous, id_column, answer_column) \
+                            and previous.get('keywords_hash') == row['_hash']:
+                        results[position] = _previous_result(previous, previous_format)
+                        counts['reused'] += 1
+                    else:
+                        items.append((int(row[id_column]), row.get(answer_column) or ''))
+                        positions.append(position)
+                        counts['graded'] += 1
+                future = pool.submit(_grade_chunk, items) if items else None
+                pending.append((rows, results, positions, future))
+                if len(pending) >= workers * CHUNKS_PER_WORKER:
+                    flush_oldest()
+
+            chunk = []
+            for row in read_rows(input_path, input_format):
+                counts['total'] += 1
+                try:
+                    row['_hash'] = hashes.get(int(row[id_column]))
+                except (KeyError, TypeError, ValueError):
+                    row['_hash'] = None  # 문제 ID가 없거나 숫자가 아님
+                chunk.append(row)
+                if len(chunk) >= chunksize:
+                    submit(chunk)
+                    chunk = []
+            if chunk:
+                submit(chunk)
+            while pending:
+                flush_oldest()
+    except BaseException:
+        if out is not sys.stdout:
+            out.close()
+            os.remove(output_path + '.tmp')
+        raise
+
+    if out is not sys.stdout:
+        # 이전 결과 파일과 같은 경로에 써도 되도록 다 쓴 뒤 교체
+        out.close()
+        os.replace(output_path + '.tmp', output_path)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="(문제 ID, 답변) CSV/JSONL 파일을 check_answer와 같은 방식으로 일괄 채점합니다.")
+    parser.add_argument('input', help="입력 파일 (CSV 또는 JSONL, question_id/user_answer 열)")
+    parser.add_argument('--output', default='-', help="결과 파일 경로 (기본: 표준 출력)")
+    parser.add_argument('--bank', default=QUESTIONS_PATH, help="문제 CSV 파일 경로")
+    parser.add_argument('--previous',
+                        help="이전 결과 파일 (증분 모드: 키워드가 바뀐 문제의 행만 다시 채점)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help="워커에 한 번에 맡기는 행 수")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="입력 형식 (기본: 확장자로 판단)")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help="출력 형식 (기본: 확장자 또는 입력 형식)")
+    parser.add_argument('--id-column', default=ID_COLUMN, help="문제 ID 열 이름")
+    parser.add_argument('--answer-column', default=ANSWER_COLUMN, help="답변 열 이름")
+    parser.add_argument('--fuzzy', action='store_true', help="키워드 오타 허용 채점")
+    parser.add_argument('--synonyms', action='store_true', help="동의어/표기 정규화 채점")
+    parser.add_argument('--similarity', action='store_true', help="서술형 모범 답안 유사도 반영")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = grade_file(
+        args.input, args.output, bank_path=args.bank, previous_path=args.previous,
+        workers=args.workers, chunksize=args.chunksize,
+        options={'fuzzy': args.fuzzy, 'synonyms': args.synonyms, 'similarity': args.similarity},
+        input_format=args.format, output_format=args.output_format,
+        id_column=args.id_column, answer_column=args.answer_column,
+    )
+    elapsed = time.perf_counter() - started
+
+    # 결과를 표준 출력으로 쓸 수 있으므로 요약은 표준 오류로
+    print(f"채점 완료! 전체 {counts['total']}행 중 {counts['graded']}행 채점, "
+          f"{counts['reused']}행은 이전 결과 사용, 문제 은행에 없는 문제 {counts['unknown']}행 "
+          f"({elapsed:.1f}초, {counts['total'] / max(elapsed, 1e-9):.0f}행/초)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
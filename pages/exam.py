@@ -1,9 +1,19 @@
 import streamlit as st
-import pandas as pd
 import time
-import os
-import numpy as np
-from utils.scoring import check_answer
+import random
+from utils.grading import get_grading_service, wait_for_grade
+from utils.timer import start_timer, countdown, is_late_submission, keep_answer
+from utils.images import show_question_image
+from utils.question_store import load_question_store
+from utils.question_index import get_question_index
+from utils.exam_solver import assemble_exam
+from utils.exam_state import AnswerRecord, id_array
+from utils.store import get_store, current_user_id, make_badge
+from utils.scheduler import get_user_scheduler
+from utils.metrics import track_page, exam_active, exam_finished
+
+# 실행 시간/횟수 지표 기록 (페이지를 처음 불러올 때 지표 내보내기도 시작)
+track_page("exam")
 
 # 페이지 설정
 st.set_page_config(
@@ -77,37 +87,125 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 세션 상태 초기화
+# 사용자 식별 (URL의 uid 파라미터) 및 응시 기록 저장소
+user_id = current_user_id()
+store = get_store()
+
+# 시험 구성 (조건을 고르면 미리 만들어 둔 역색인에서 바로 뽑음)
 if "exam_started" not in st.session_state:
-    st.session_state.exam_started = True
-    st.session_state.current_question = 0
-    st.session_state.score = 0
-    st.session_state.answers = []
-    st.session_state.wrong_questions = []
-    
-    # 모든 문제 로드
     try:
-        # CSV 파일 로드
-        questions = pd.read_csv("data/questions.csv")
-        
-        # NaN 값 처리 및 유효한 문제만 필터링
-        questions = questions.dropna(subset=['Question', 'Answer'])  # 문제나 답이 없는 행 제거
-        
-        # 데이터 타입 변환 - 오류 방지
-        questions['Time_lmit'] = questions['Time_lmit'].fillna(240).astype(int)  # NaN 값은 240으로 대체
-        questions['Points'] = questions['Points'].fillna(3).astype(int)  # NaN 값은 3으로 대체
-        questions['Year'] = questions['Year'].fillna(0).astype(int)  # NaN 값은 0으로 대체
-        
-        # 세션 상태에 저장
-        st.session_state.exam_questions = questions
-        st.session_state.total_questions = len(questions)  # 실제 총 문제 수 저장
+        index = get_question_index()
     except Exception as e:
         st.error(f"문제 데이터를 로드하는 중 오류가 발생했습니다: {e}")
         st.stop()
+    
+    st.markdown("<div class='main-title'>🧩 모의고사 구성</div>", unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        years = st.multiselect("📅 출제 연도", index.values("Year"), default=index.values("Year"))
+        points = st.multiselect("🎯 배점", index.values("Points"), default=index.values("Points"))
+        categories = None
+        if "Category" in index.fields:
+            categories = st.multiselect("📚 카테고리", index.values("Category"), default=index.values("Category"))
+    
+    filters = {"Year": years, "Points": points, "Category": categories}
+    available = index.count(**filters)
+    
+    with col2:
+        num_questions = st.number_input("📝 문제 수", min_value=1, max_value=max(1, available),
+                                        value=min(20, max(1, available)))
+        essay_percent = st.slider("✍️ 서술형 비율 (%)", min_value=0, max_value=100,
+                                  value=round(100 * index.count(Type=["서술형"], **filters) / max(1, available)))
+        # 실제 시험과 같은 총 시간/총점으로 구성하거나, 시간 상한만 두고 무작위로 구성
+        match_targets = st.toggle("📐 실제 시험처럼 총 시간·총점 맞추기")
+        if match_targets:
+            target_minutes = st.number_input("⏱️ 목표 시간 합계 (분)", min_value=1, value=60)
+            target_points = st.number_input("🏅 목표 총점", min_value=1, value=50)
+        else:
+            time_budget = st.number_input("⏱️ 전체 제한 시간 (분, 0이면 제한 없음)", min_value=0, value=0)
+    
+    st.markdown(f"<div class='info-text'>조건에 맞는 문제: {available}개</div>", unsafe_allow_html=True)
+    
+    if st.button("🎯 이 구성으로 시작하기", type="primary"):
+        # 같은 시드로 다시 뽑으면 같은 시험이 나옴
+        seed = random.randrange(2 ** 32)
+        deviation = None
+        if match_targets:
+            result = assemble_exam(
+                index,
+                size=int(num_questions),
+                total_time=int(target_minutes) * 60,
+                total_points=int(target_points),
+                type_ratio={"서술형": essay_percent / 100},
+                seed=seed,
+                **filters,
+            )
+            exam_ids = result.question_ids
+            deviation = result.deviation
+        else:
+            exam_ids = index.sample(
+                int(num_questions),
+                type_ratio={"서술형": essay_percent / 100},
+                time_budget=int(time_budget) * 60 or None,
+                seed=seed,
+                **filters,
+            )
+        if not exam_ids:
+            st.warning("조건에 맞는 문제가 없습니다. 조건을 바꿔보세요.")
+            st.stop()
+        
+        # 세션 상태 초기화 (세션 상태에는 문제 ID만 저장, 문제 내용은 공유 문제 저장소에서 찾음)
+        st.session_state.exam_started = True
+        st.session_state.exam_seed = seed
+        st.session_state.exam_deviation = deviation  # 목표와의 차이 (목표를 지정한 경우)
+        st.session_state.current_question = 0
+        st.session_state.score = 0
+        st.session_state.answers = []  # AnswerRecord 목록
+        st.session_state.wrong_questions = id_array([])  # 오답 문제 ID
+        st.session_state.exam_question_ids = id_array(exam_ids)
+        st.session_state.total_questions = len(exam_ids)  # 실제 총 문제 수 저장
+        st.session_state.attempt_id = store.start_attempt(user_id, "exam")
+        st.rerun()
+    st.stop()
+
+# 공유 문제 저장소 (화면에 표시하는 문제만 ID로 읽음, 읽기 전용)
+bank = load_question_store()
+
+# 공유 채점 서비스 (채점은 채점 스레드에서, 결과는 채점표로 확인)
+grading = get_grading_service()
+
+
+def record_answer(question_data, user_answer, is_correct, score):
+    """채점 결과를 기록하고 결과 표시 상태로 바꾸는 함수"""
+    # 결과 저장 (저장소에는 백그라운드에서 기록됨)
+    record = AnswerRecord(
+        question_id=question_data["ID"],
+        user_answer=user_answer,
+        score=score,
+        is_correct=is_correct,
+        started_at=st.session_state.timer_start,
+    )
+    st.session_state.answers.append(record)
+    store.add_result(st.session_state.attempt_id, user_id, len(st.session_state.answers) - 1, record)
+    
+    st.session_state.score += int(score)
+    
+    # 채점 결과로 간격 반복 복습 일정 갱신 (틀린 문제는 바로 복습 대상)
+    get_user_scheduler(store, user_id).record(question_data["ID"], score, int(question_data["Points"]), is_correct)
+    
+    # 오답 또는 부분 점수인 경우 오답 리스트에 추가
+    if not is_correct or score < question_data["Points"]:
+        st.session_state.wrong_questions.append(int(question_data["ID"]))
+    
+    # 결과 표시 상태로 변경
+    st.session_state.question_state = "showing_result"
+    st.rerun()
+
 
 # 현재 문제 가져오기
 current_q = st.session_state.current_question
-total_q = len(st.session_state.exam_questions)
+total_q = len(st.session_state.exam_question_ids)
 
 # 문제 상태 초기화 (오류 수정)
 if "question_state" not in st.session_state:
@@ -116,11 +214,29 @@ if "question_state" not in st.session_state:
     st.session_state.user_answer = ""
 
 if current_q < total_q:
-    question_data = st.session_state.exam_questions.iloc[current_q]
+    exam_active(st.session_state.attempt_id)  # 진행 중인 시험 수 지표
+    question_data = bank.get_question(st.session_state.exam_question_ids[current_q])
+    
+    # 시험 도중 문제 은행에서 삭제된 문제는 건너뜀
+    if question_data is None:
+        st.session_state.current_question += 1
+        for key in ["question_state", "timer_start", "time_limit", "user_answer", "grading_ticket"]:
+            if key in st.session_state:
+                del st.session_state[key]
+        st.rerun()
+    
+    # 목표에 맞춰 구성한 시험이면 첫 문제에서 목표와의 차이를 알려줌
+    deviation = st.session_state.get("exam_deviation")
+    if current_q == 0 and deviation:
+        st.info(
+            f"목표와의 차이 - 문제 수 {deviation['size']:+d}개, 시간 {deviation['time'] / 60:+.1f}분, "
+            f"총점 {deviation['points']:+d}점, 서술형 {deviation['types']['서술형']:+d}문제"
+        )
     
     # 문제 표시
     st.markdown(f"<div class='main-title'>📝 문제 {current_q + 1}/{total_q} <span class='points-badge'>{question_data['Points']}점</span></div>", unsafe_allow_html=True)
     st.markdown(f"<div class='question-text'>{question_data['Question']}</div>", unsafe_allow_html=True)
+    show_question_image(question_data)
     
     # 문제 정보 표시
     col1, col2 = st.columns(2)
@@ -131,89 +247,71 @@ if current_q < total_q:
     
     # 문제 상태에 따라 다른 UI 표시
     if st.session_state.question_state == "asking":
-        # 타이머 계산
-        if "time_limit" not in st.session_state:
-            try:
-                st.session_state.time_limit = int(question_data["Time_lmit"])
-            except (ValueError, TypeError):
-                # NaN 값이나 변환 오류 처리
-                st.session_state.time_limit = 60  # 기본값 설정
-        
-        elapsed = time.time() - st.session_state.timer_start
-        remaining = max(0, st.session_state.time_limit - elapsed)
-        progress = remaining / st.session_state.time_limit
+        # 타이머 설정
+        try:
+            start_timer(int(question_data["Time_lmit"]))
+        except (ValueError, TypeError):
+            # NaN 값이나 변환 오류 처리
+            start_timer(60)  # 기본값 설정
         
-        # 타이머 표시
-        st.progress(progress)
-        st.markdown(f"<div class='timer-text'>⏱️ 남은 시간: {int(remaining)}초</div>", unsafe_allow_html=True)
-        
-        # 시간이 다 되었는지 확인
-        time_up = remaining <= 0
+        # 타이머 표시 (브라우저에서 카운트다운, 시간 초과 판정은 서버에서)
+        time_up = countdown(key=f"countdown_{current_q}")
         
         # 답변 입력 영역
         if "user_answer" not in st.session_state:
             st.session_state.user_answer = ""
         
-        user_answer = st.text_area("💬 답변을 입력하세요:", value=st.session_state.user_answer, height=300)
-        st.session_state.user_answer = user_answer
+        # 마감 뒤에 고친 답변은 저장하지 않음 (시간 초과 시 마감 전에 저장된 답변을 채점)
+        user_answer = keep_answer(st.text_area("💬 답변을 입력하세요:", value=st.session_state.user_answer, height=300))
         
         # 제출 버튼
-        submit = st.button("📤 답변 제출", type="primary") or time_up
+        clicked = st.button("📤 답변 제출", type="primary")
+        submit = clicked or time_up
         
-        # 제출 처리
+        # 제출 처리 (시간 초과로 자동 제출되면 신호가 늦게 와도 마감 전에 저장된 답변을 채점)
         if submit:
-            if time_up and not user_answer.strip():
+            if clicked and is_late_submission():
+                # 제한 시간이 지난 뒤 도착한 제출 버튼 요청은 인정하지 않음
+                record_answer(question_data, user_answer, False, 0)
+            elif time_up and not user_answer.strip():
                 # 시간 초과 + 답변 없음
-                is_correct = False
-                score = 0
+                record_answer(question_data, user_answer, False, 0)
             else:
-                # 채점
-                is_correct, score = check_answer(user_answer, question_data)
-            
-            # 결과 저장
-            st.session_state.answers.append({
-                "question": question_data["Question"],
-                "user_answer": user_answer,
-                "correct_answer": question_data["Answer"],
-                "is_correct": is_correct,
-                "score": score,
-                "max_score": question_data["Points"]
-            })
-            
-            st.session_state.score += score
-            
-            # 오답 또는 부분 점수인 경우 오답 리스트에 추가
-            if not is_correct or score < question_data["Points"]:
-                st.session_state.wrong_questions.append(question_data)
-            
-            # 결과 표시 상태로 변경
-            st.session_state.question_state = "showing_result"
-            st.rerun()
-        
-        # 타이머 자동 업데이트 (1초마다)
-        if remaining > 0:
-            time.sleep(1)  # 1초 대기
-            st.rerun()  # 페이지 리프레시
+                # 채점 요청 (채점 스레드에서 채점, 결과가 나올 때까지 채점 중 상태)
+                st.session_state.grading_ticket = grading.submit(user_answer, question_data, bank)
+                st.session_state.question_state = "grading"
+                st.rerun()
+    
+    elif st.session_state.question_state == "grading":
+        user_answer = st.session_state.user_answer
+        try:
+            result = grading.result(st.session_state.grading_ticket)
+        except KeyError:
+            # 결과를 오래 찾아가지 않아 정리된 채점표는 다시 채점
+            st.session_state.grading_ticket = grading.submit(user_answer, question_data, bank)
+            result = None
         
-        # 시간 초과 처리
-        if time_up:
-            st.warning("⏰ 시간이 초과되었습니다!")
-            st.rerun()  # 제출 처리를 위해 리프레시
+        if result is None:
+            st.markdown(f"<div class='answer-text'>📝 <b>내 답변:</b> {user_answer or '(답변 없음)'}</div>", unsafe_allow_html=True)
+            wait_for_grade(st.session_state.grading_ticket)
+        else:
+            grading.release(st.session_state.pop("grading_ticket"))
+            record_answer(question_data, user_answer, *result)
     
     elif st.session_state.question_state == "showing_result":
         # 결과 표시
         last_answer = st.session_state.answers[-1]
         
-        if last_answer["is_correct"]:
-            st.markdown(f"<div class='result-title'>🎉 정답입니다! {last_answer['score']}점을 획득했습니다.</div>", unsafe_allow_html=True)
+        if last_answer.is_correct:
+            st.markdown(f"<div class='result-title'>🎉 정답입니다! {last_answer.score}점을 획득했습니다.</div>", unsafe_allow_html=True)
         else:
-            st.markdown(f"<div class='result-title'>❌ 오답입니다. {last_answer['score']}점을 획득했습니다.</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='result-title'>❌ 오답입니다. {last_answer.score}점을 획득했습니다.</div>", unsafe_allow_html=True)
         
         # 사용자 답변 표시
-        st.markdown(f"<div class='answer-text'>📝 <b>내 답변:</b> {last_answer['user_answer'] or '(답변 없음)'}</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='answer-text'>📝 <b>내 답변:</b> {last_answer.user_answer or '(답변 없음)'}</div>", unsafe_allow_html=True)
         
         # 정답 표시
-        st.markdown(f"<div class='answer-text'>✅ <b>정답:</b> {last_answer['correct_answer']}</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='answer-text'>✅ <b>정답:</b> {question_data['Answer']}</div>", unsafe_allow_html=True)
         
         # 다음 문제로 이동 버튼
         if st.button("➡️ 다음 문제로", type="primary"):
@@ -238,7 +336,15 @@ else:
     st.markdown("<div class='main-title'>🎓 모의고사 완료!</div>", unsafe_allow_html=True)
     
     # 총점 계산
-    total_possible_score = sum(st.session_state.exam_questions["Points"])
+    total_possible_score = int(bank.get_questions(st.session_state.exam_question_ids)["Points"].sum())
+    
+    # 최종 점수와 배지를 한 번만 저장
+    if not st.session_state.get("attempt_finished"):
+        store.finish_attempt(st.session_state.attempt_id, st.session_state.score, total_possible_score)
+        badge = make_badge("일반 모의고사", "전체 문제", st.session_state.score, total_possible_score)
+        store.add_badge(user_id, badge, attempt_id=st.session_state.attempt_id)
+        st.session_state.attempt_finished = True
+        exam_finished(st.session_state.attempt_id)
     
     # 결과 표시 - 크게 수정된 부분
     st.markdown(f"""
@@ -275,25 +381,30 @@ else:
         """, unsafe_allow_html=True)
         
         # 오답 문제 목록 표시
-        for i, wrong_q in enumerate(st.session_state.wrong_questions):
+        user_answers = {record.question_id: record.user_answer for record in st.session_state.answers}
+        for i, (_, wrong_q) in enumerate(bank.get_questions(st.session_state.wrong_questions).iterrows()):
             with st.expander(f"문제 {i+1}: {wrong_q['Question'][:50]}...", expanded=False):
                 st.markdown(f"<div class='question-text'>{wrong_q['Question']}</div>", unsafe_allow_html=True)
                 st.markdown(f"<div class='answer-text'>✅ <b>정답:</b> {wrong_q['Answer']}</div>", unsafe_allow_html=True)
                 
                 # 사용자 답변 찾기
-                user_answer = "답변 없음"
-                for ans in st.session_state.answers:
-                    if ans["question"] == wrong_q["Question"]:
-                        user_answer = ans["user_answer"] or "답변 없음"
-                        break
+                user_answer = user_answers.get(int(wrong_q["ID"])) or "답변 없음"
                 
                 st.markdown(f"<div class='answer-text'>📝 <b>내 답변:</b> {user_answer}</div>", unsafe_allow_html=True)
         
+        # 오답 복습 버튼 (복습 문제는 간격 반복 일정에서 꺼냄)
+        if st.button("📚 오답 복습하기", use_container_width=True):
+            for key in ["review_mode", "review_questions"]:
+                if key in st.session_state:
+                    del st.session_state[key]
+            st.switch_page("pages/review.py")
+        
         # 다시 시작하기 버튼 추가
         if st.button("🔄 다시 시작하기", type="primary", use_container_width=True):
             # 세션 상태 초기화
             for key in list(st.session_state.keys()):
-                del st.session_state[key]
+                if key != "user_id":
+                    del st.session_state[key]
             st.rerun()
     else:
         # 모든 문제를 맞춘 경우
@@ -309,5 +420,6 @@ else:
         if st.button("🔄 다시 시작하기", type="primary", use_container_width=True):
             # 세션 상태 초기화
             for key in list(st.session_state.keys()):
-                del st.session_state[key]
+                if key != "user_id":
+                    del st.session_state[key]
             st.rerun()
@@ -1,12 +1,36 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+from datetime import datetime
+from utils.question_store import load_question_store
+from utils.store import get_store, current_user_id
+from utils.metrics import track_page
+
+# 실행 시간/횟수 지표 기록 (페이지를 처음 불러올 때 지표 내보내기도 시작)
+track_page("results")
 
 # 페이지 설정
 st.set_page_config(page_title="Anatomy Ace - 결과", layout="wide")
 
+# 응시 기록은 저장소에서 읽음 (현재 세션의 응시, 없으면 가장 최근에 끝낸 응시)
+user_id = current_user_id()
+store = get_store()
+store.flush()  # 방금 제출한 답변까지 읽을 수 있도록 대기 중인 쓰기를 커밋
+
+attempt_id = st.session_state.get("attempt_id")
+if attempt_id is None:
+    recent = store.user_attempts(user_id, kind="exam", limit=1)
+    attempt_id = recent[0]["attempt_id"] if recent else None
+
+# 답변 기록에는 문제 ID만 있으므로 문제 내용은 공유 문제 저장소에서 찾음
+# (집계는 응시 지문별로 한 번만 계산하고, 여기서는 계산된 결과를 그리기만 함)
+bank = load_question_store()
+analytics = None
+if attempt_id:
+    # 집계 모듈은 pandas를 쓰므로 볼 응시 기록이 있을 때만 불러옴
+    from utils.results_analytics import load_attempt_analytics
+    analytics = load_attempt_analytics(store, bank, attempt_id)
+
 # 결과 확인
-if "answers" not in st.session_state:
+if analytics is None or analytics["totals"]["questions"] == 0:
     st.error("먼저 모의고사를 풀어야 합니다.")
     if st.button("메인 페이지로 돌아가기"):
         st.switch_page("app.py")
@@ -16,42 +40,67 @@ if "answers" not in st.session_state:
 st.title("모의고사 결과")
 
 # 점수 요약
-total_questions = len(st.session_state.answers)
-total_score = st.session_state.score
-max_score = sum(answer["max_score"] for answer in st.session_state.answers)
-percentage = (total_score / max_score) * 100
+totals = analytics["totals"]
 
 st.header("점수 요약")
 col1, col2, col3 = st.columns(3)
-col1.metric("총 문제 수", f"{total_questions}문제")
-col2.metric("획득 점수", f"{total_score}/{max_score}점")
-col3.metric("정답률", f"{percentage:.1f}%")
+col1.metric("총 문제 수", f"{totals['questions']}문제")
+col2.metric("획득 점수", f"{totals['score']}/{totals['max_score']}점")
+col3.metric("정답률", f"{totals['percentage']:.1f}%")
+
+# 유형/연도/배점별 분석
+st.header("영역별 분석")
+tab_type, tab_year, tab_points = st.tabs(["유형별", "연도별", "배점별"])
+tab_type.dataframe(analytics["by_type"])
+tab_year.dataframe(analytics["by_year"])
+tab_points.dataframe(analytics["by_points"])
+
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("점수 분포")
+    credit = analytics["credit"]
+    st.write(f"✅ 만점: {credit['만점']}문제 / ⚠️ 부분 점수: {credit['부분 점수']}문제 / ❌ 0점: {credit['0점']}문제")
+with col2:
+    st.subheader("풀이 시간")
+    time_used = analytics["time_used"]
+    st.write(f"합계 {time_used['total']}초, 평균 {time_used['mean']}초, 중앙값 {time_used['median']}초, "
+             f"상위 10% {time_used['p90']}초, 최대 {time_used['max']}초")
 
 # 문제별 결과
 st.header("문제별 결과")
-for i, answer in enumerate(st.session_state.answers):
-    with st.expander(f"문제 {i+1}: {answer['is_correct'] and '✅ 정답' or '❌ 오답'} ({answer['score']}/{answer['max_score']}점)"):
-        st.write(f"**문제:** {answer['question']}")
-        st.write(f"**내 답변:** {answer['user_answer']}")
-        st.write(f"**정답:** {answer['correct_answer']}")
+for i, row in enumerate(analytics["questions"].itertuples(index=False)):
+    with st.expander(f"문제 {i+1}: {row.is_correct and '✅ 정답' or '❌ 오답'} ({row.score}/{row.Points}점)"):
+        st.write(f"**문제:** {row.Question}")
+        st.write(f"**내 답변:** {row.user_answer}")
+        st.write(f"**정답:** {row.Answer}")
 
 # 오답 노트
 st.header("오답 노트")
-wrong_answers = [a for a in st.session_state.answers if not a['is_correct']]
-if wrong_answers:
+wrong_answers = analytics["wrong"]
+if len(wrong_answers):
     st.write(f"총 {len(wrong_answers)}개의 오답이 있습니다.")
-    for i, answer in enumerate(wrong_answers):
-        with st.expander(f"오답 {i+1}: {answer['question']}"):
-            st.write(f"**내 답변:** {answer['user_answer']}")
-            st.write(f"**정답:** {answer['correct_answer']}")
+    for i, row in enumerate(wrong_answers.itertuples(index=False)):
+        with st.expander(f"오답 {i+1}: {row.Question}"):
+            st.write(f"**내 답변:** {row.user_answer}")
+            st.write(f"**정답:** {row.Answer}")
 else:
     st.write("모든 문제를 맞혔습니다! 축하합니다! 🎉")
 
+# 지난 응시 기록
+history = store.user_attempts(user_id, kind="exam")
+if history:
+    st.header("지난 모의고사 기록")
+    for attempt in history:
+        finished = datetime.fromtimestamp(attempt["finished_at"]).strftime("%Y-%m-%d %H:%M")
+        rate = (attempt["score"] / attempt["max_score"]) * 100 if attempt["max_score"] else 0.0
+        st.write(f"{finished} - {attempt['score']}/{attempt['max_score']}점 ({rate:.1f}%)")
+
 # 다음 단계
 st.header("다음 단계")
 if st.button("메인 페이지로 돌아가기", type="primary"):
     # 현재 세션의 문제 관련 상태 초기화
-    for key in ["current_question", "score", "answers", "wrong_questions", "exam_questions"]:
+    for key in ["current_question", "score", "answers", "wrong_questions", "exam_question_ids",
+                "attempt_id", "attempt_finished"]:
         if key in st.session_state:
             del st.session_state[key]
     st.switch_page("app.py")
@@ -1,7 +1,17 @@
 import streamlit as st
-import pandas as pd
 import time
-from utils.scoring import check_answer
+from datetime import datetime
+from utils.grading import get_grading_service, wait_for_grade
+from utils.timer import start_timer, countdown, is_late_submission, keep_answer
+from utils.images import show_question_image
+from utils.question_store import load_question_store
+from utils.exam_state import AnswerRecord, id_array
+from utils.store import get_store, current_user_id, make_badge
+from utils.scheduler import get_user_scheduler
+from utils.metrics import track_page
+
+# 실행 시간/횟수 지표 기록 (페이지를 처음 불러올 때 지표 내보내기도 시작)
+track_page("review")
 
 # 페이지 설정
 st.set_page_config(
@@ -78,13 +88,73 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 리뷰 모드 확인
+# 사용자 식별 및 응시 기록 저장소 (복습도 하나의 응시로 기록)
+user_id = current_user_id()
+store = get_store()
+
+# 간격 반복 복습 일정 (사용자마다 프로세스에서 하나, 다른 탭에서 푼 결과도 바로 반영됨)
+scheduler = get_user_scheduler(store, user_id)
+
+# 공유 채점 서비스 (채점은 채점 스레드에서, 결과는 채점표로 확인)
+grading = get_grading_service()
+
+
+def start_review_session():
+    """지금 복습할 문제를 일정에서 꺼내 새 복습 세션을 시작하는 함수"""
+    st.session_state.review_mode = True
+    st.session_state.review_questions = id_array(scheduler.due())
+    st.session_state.current_review_question = 0
+    st.session_state.review_score = 0
+    st.session_state.review_answers = []
+    st.session_state.review_attempt_id = None
+    st.session_state.review_attempt_finished = False
+    for key in ["review_state", "timer_start", "time_limit", "user_answer", "grading_ticket"]:
+        if key in st.session_state:
+            del st.session_state[key]
+
+
+def record_answer(question_data, user_answer, is_correct, score):
+    """채점 결과를 기록하고 결과 표시 상태로 바꾸는 함수"""
+    # 결과 저장 (저장소에는 백그라운드에서 기록됨)
+    record = AnswerRecord(
+        question_id=question_data["ID"],
+        user_answer=user_answer,
+        score=score,
+        is_correct=is_correct,
+        started_at=st.session_state.timer_start,
+    )
+    st.session_state.review_answers.append(record)
+    store.add_result(st.session_state.review_attempt_id, user_id,
+                     len(st.session_state.review_answers) - 1, record)
+    
+    st.session_state.review_score += int(score)
+    
+    # 채점 결과로 다음 복습 시각 갱신
+    scheduler.record(question_data["ID"], score, int(question_data["Points"]), is_correct)
+    
+    # 결과 표시 상태로 변경
+    st.session_state.review_state = "showing_result"
+    st.rerun()
+
+
+# 복습 세션 구성 (복습 시각이 된 문제를 이른 순서대로)
 if "review_mode" not in st.session_state or "review_questions" not in st.session_state:
-    st.error("오답 복습 모드가 설정되지 않았습니다. 메인 페이지로 돌아가세요.")
+    start_review_session()
+
+# 복습할 문제가 없으면 다음 복습 시각 안내
+if len(st.session_state.review_questions) == 0:
+    next_due = scheduler.next_due_at()
+    if next_due is None:
+        st.info("아직 복습할 문제가 없습니다. 먼저 모의고사를 풀어보세요.")
+    else:
+        st.info(f"지금 복습할 문제가 없습니다. 다음 복습 시각: {datetime.fromtimestamp(next_due):%Y-%m-%d %H:%M}")
     if st.button("메인 페이지로 돌아가기"):
         st.switch_page("app.py")
     st.stop()
 
+if st.session_state.get("review_attempt_id") is None:
+    st.session_state.review_attempt_id = store.start_attempt(user_id, "review")
+
 # 리뷰 상태 초기화
 if "review_state" not in st.session_state:
     st.session_state.review_state = "asking"
@@ -102,18 +172,24 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+# 복습 문제는 ID만 저장되어 있으므로 공유 문제 저장소에서 ID로 찾음
+bank = load_question_store()
+
 if current_q < total_q:
-    # 데이터프레임으로 변환 (필요한 경우)
-    if not isinstance(st.session_state.review_questions, pd.DataFrame):
-        review_questions_df = pd.DataFrame(st.session_state.review_questions)
-    else:
-        review_questions_df = st.session_state.review_questions
+    question_data = bank.get_question(st.session_state.review_questions[current_q])
     
-    question_data = review_questions_df.iloc[current_q]
+    # 문제 은행에서 삭제된 문제는 건너뜀
+    if question_data is None:
+        st.session_state.current_review_question += 1
+        for key in ["review_state", "timer_start", "time_limit", "user_answer", "grading_ticket"]:
+            if key in st.session_state:
+                del st.session_state[key]
+        st.rerun()
     
     # 문제 표시
     st.markdown(f"<div class='main-title'>🔄 오답 복습 문제 {current_q + 1}/{total_q} <span class='points-badge'>{question_data['Points']}점</span></div>", unsafe_allow_html=True)
     st.markdown(f"<div class='question-text'>{question_data['Question']}</div>", unsafe_allow_html=True)
+    show_question_image(question_data)
     
     # 문제 정보 표시
     col1, col2 = st.columns(2)
@@ -128,76 +204,61 @@ if current_q < total_q:
     
     # 문제 상태에 따라 다른 UI 표시
     if st.session_state.review_state == "asking":
-        # 타이머 계산
-        if "time_limit" not in st.session_state:
-            # 복습 모드에서는 시간 제한을 2배로 늘림
-            st.session_state.time_limit = int(question_data["Time_lmit"]) * 2
-        
-        elapsed = time.time() - st.session_state.timer_start
-        remaining = max(0, st.session_state.time_limit - elapsed)
-        progress = remaining / st.session_state.time_limit
-        
-        # 타이머 표시
-        st.progress(progress)
-        st.markdown(f"<div class='timer-text'>⏱️ 남은 시간: {int(remaining)}초 (복습 모드에서는 시간이 2배로 주어집니다)</div>", unsafe_allow_html=True)
+        # 타이머 설정 (복습 모드에서는 시간 제한을 2배로 늘림)
+        start_timer(int(question_data["Time_lmit"]) * 2)
         
-        # 시간이 다 되었는지 확인
-        time_up = remaining <= 0
+        # 타이머 표시 (브라우저에서 카운트다운, 시간 초과 판정은 서버에서)
+        time_up = countdown(key=f"review_countdown_{current_q}", note="(복습 모드에서는 시간이 2배로 주어집니다)")
         
         # 답변 입력 영역
-        user_answer = st.text_area("💬 답변을 다시 입력해보세요:", value=st.session_state.user_answer, height=300)
-        st.session_state.user_answer = user_answer
+        # 마감 뒤에 고친 답변은 저장하지 않음 (시간 초과 시 마감 전에 저장된 답변을 채점)
+        user_answer = keep_answer(st.text_area("💬 답변을 다시 입력해보세요:", value=st.session_state.user_answer, height=300))
         
         # 제출 버튼
-        submit = st.button("📤 답변 제출", type="primary") or time_up
+        clicked = st.button("📤 답변 제출", type="primary")
+        submit = clicked or time_up
         
-        # 제출 처리
+        # 제출 처리 (시간 초과로 자동 제출되면 신호가 늦게 와도 마감 전에 저장된 답변을 채점)
         if submit:
-            if time_up and not user_answer.strip():
+            if clicked and is_late_submission():
+                # 제한 시간이 지난 뒤 도착한 제출 버튼 요청은 인정하지 않음
+                record_answer(question_data, user_answer, False, 0)
+            elif time_up and not user_answer.strip():
                 # 시간 초과 + 답변 없음
-                is_correct = False
-                score = 0
+                record_answer(question_data, user_answer, False, 0)
             else:
-                # 채점
-                is_correct, score = check_answer(user_answer, question_data)
-            
-            # 결과 저장
-            st.session_state.review_answers.append({
-                "question": question_data["Question"],
-                "user_answer": user_answer,
-                "correct_answer": question_data["Answer"],
-                "is_correct": is_correct,
-                "score": score,
-                "max_score": question_data["Points"]
-            })
-            
-            st.session_state.review_score += score
-            
-            # 결과 표시 상태로 변경
-            st.session_state.review_state = "showing_result"
-            st.rerun()
-        
-        # 타이머 자동 업데이트 (1초마다)
-        if remaining > 0:
-            time.sleep(1)  # 1초 대기
-            st.rerun()  # 페이지 리프레시
+                # 채점 요청 (채점 스레드에서 채점, 결과가 나올 때까지 채점 중 상태)
+                st.session_state.grading_ticket = grading.submit(user_answer, question_data, bank)
+                st.session_state.review_state = "grading"
+                st.rerun()
+    
+    elif st.session_state.review_state == "grading":
+        user_answer = st.session_state.user_answer
+        try:
+            result = grading.result(st.session_state.grading_ticket)
+        except KeyError:
+            # 결과를 오래 찾아가지 않아 정리된 채점표는 다시 채점
+            st.session_state.grading_ticket = grading.submit(user_answer, question_data, bank)
+            result = None
         
-        # 시간 초과 처리
-        if time_up:
-            st.warning("⏰ 시간이 초과되었습니다!")
-            st.rerun()  # 제출 처리를 위해 리프레시
+        if result is None:
+            st.markdown(f"<div class='answer-text'>📝 <b>내 답변:</b> {user_answer or '(답변 없음)'}</div>", unsafe_allow_html=True)
+            wait_for_grade(st.session_state.grading_ticket)
+        else:
+            grading.release(st.session_state.pop("grading_ticket"))
+            record_answer(question_data, user_answer, *result)
     
     elif st.session_state.review_state == "showing_result":
         # 결과 표시
         last_answer = st.session_state.review_answers[-1]
         
-        if last_answer["is_correct"]:
-            st.markdown(f"<div class='result-title'>🎉 정답입니다! {last_answer['score']}점을 획득했습니다.</div>", unsafe_allow_html=True)
+        if last_answer.is_correct:
+            st.markdown(f"<div class='result-title'>🎉 정답입니다! {last_answer.score}점을 획득했습니다.</div>", unsafe_allow_html=True)
         else:
-            st.markdown(f"<div class='result-title'>❌ 오답입니다. {last_answer['score']}점을 획득했습니다.</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='result-title'>❌ 오답입니다. {last_answer.score}점을 획득했습니다.</div>", unsafe_allow_html=True)
         
         # 사용자 답변 표시
-        st.markdown(f"<div class='answer-text'>📝 <b>내 답변:</b> {last_answer['user_answer'] or '(답변 없음)'}</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='answer-text'>📝 <b>내 답변:</b> {last_answer.user_answer or '(답변 없음)'}</div>", unsafe_allow_html=True)
         
         # 학습 팁 제공
         st.markdown("""
@@ -234,7 +295,14 @@ else:
     st.markdown("<div class='main-title'>🎓 오답 복습 완료!</div>", unsafe_allow_html=True)
     
     # 총점 계산
-    total_possible_score = sum(question["Points"] for question in st.session_state.review_questions)
+    total_possible_score = int(bank.get_questions(st.session_state.review_questions)["Points"].sum())
+    
+    # 최종 점수와 배지를 한 번만 저장
+    if not st.session_state.get("review_attempt_finished"):
+        store.finish_attempt(st.session_state.review_attempt_id, st.session_state.review_score, total_possible_score)
+        badge = make_badge("복습 모의고사", "오답 복습", st.session_state.review_score, total_possible_score)
+        store.add_badge(user_id, badge, attempt_id=st.session_state.review_attempt_id)
+        st.session_state.review_attempt_finished = True
     
     # 결과 표시 - 크게 표시
     st.markdown(f"""
@@ -296,20 +364,8 @@ else:
     
     with col1:
         if st.button("🔄 오답 문제 다시 복습하기", type="primary", use_container_width=True):
-            # 복습 상태 초기화
-            st.session_state.current_review_question = 0
-            st.session_state.review_score = 0
-            st.session_state.review_answers = []
-            
-            if "review_state" in st.session_state:
-                del st.session_state.review_state
-            if "timer_start" in st.session_state:
-                del st.session_state.timer_start
-            if "time_limit" in st.session_state:
-                del st.session_state.time_limit
-            if "user_answer" in st.session_state:
-                del st.session_state.user_answer
-            
+            # 아직 복습 시각이 된 문제로 새 복습 세션 시작 (새 응시로 기록)
+            start_review_session()
             st.rerun()
     
     with col2:
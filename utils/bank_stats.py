@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+
+import streamlit as st
+
+from utils.question_bank import QUESTIONS_PATH, _file_digest, clean_questions, is_built_from
+
+# 통계 스냅숏 형식 버전 (항목이 바뀌면 올려서 이전 파일을 다시 만들게 함)
+STATS_VERSION = 1
+
+# 값별 문제 수를 세는 열 (문제 은행에 있는 열만)
+COUNT_FIELDS = ("Type", "Year", "Category", "Points", "Time_lmit")
+
+# 스냅숏을 동시에 여러 번 만들지 않도록 막는 잠금
+_build_lock = threading.Lock()
+
+
+def stats_path_for(csv_path):
+    """CSV 문제 은행에 대응하는 통계 스냅숏 경로 (data/questions.csv -> data/questions.stats.json)"""
+    return os.path.splitext(csv_path)[0] + ".stats.json"
+
+
+def _value_counts(column):
+    """값 -> 문제 수를 값 순서대로 [값, 수] 목록으로 만드는 함수 (JSON에서도 값의 타입 유지)"""
+    counts = column.value_counts().sort_index()
+    return [[value, int(count)] for value, count in zip(counts.index.tolist(), counts.tolist())]
+
+
+def _time_summary(time_limits):
+    """제한 시간(초) 요약 통계"""
+    if time_limits.empty:
+        return {"total": 0, "mean": 0.0, "median": 0.0, "min": 0, "max": 0}
+    return {
+        "total": int(time_limits.sum()),
+        "mean": round(float(time_limits.mean()), 1),
+        "median": float(time_limits.median()),
+        "min": int(time_limits.min()),
+        "max": int(time_limits.max()),
+    }
+
+
+def compute_bank_stats(questions, bank_version):
+    """
+    정리된 문제 데이터로 홈 화면 통계 스냅숏을 계산하는 함수
+
+    Parameters:
+    questions (DataFrame): 정리된 문제 데이터
+    bank_version (str): 원본 CSV 내용의 해시
+
+    Returns:
+    dict: 통계 스냅숏 (JSON으로 저장 가능)
+    """
+    counts = {field: _value_counts(questions[field]) for field in COUNT_FIELDS if field in questions.columns}
+    by_type = {
+        question_type: _time_summary(group["Time_lmit"])
+        for question_type, group in questions.groupby("Type", sort=True)
+    }
+    return {
+        "version": STATS_VERSION,
+        "bank_version": bank_version,
+        "total": int(len(questions)),
+        "counts": counts,
+        "time_limits": dict(_time_summary(questions["Time_lmit"]), by_type=by_type),
+    }
+
+
+def build_bank_stats(csv_path=QUESTIONS_PATH, stats_path=None):
+    """
+    CSV 문제 은행의 통계 스냅숏을 계산해서 은행 옆에 저장하는 함수
+
+    Returns:
+    str: 저장한 파일 경로
+    """
+    import pandas as pd
+
+    if stats_path is None:
+        stats_path = stats_path_for(csv_path)
+
+    stats = compute_bank_stats(clean_questions(pd.read_csv(csv_path)), _file_digest(csv_path))
+
+    temp_path = stats_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, stats_path)
+    return stats_path
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _read_stats(stats_path, mtime_ns):
+    # 스냅숏 파일이 바뀔 때(mtime)만 다시 읽음
+    with open(stats_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _stats_bank_version(stats_path):
+    """스냅숏을 만든 원본 CSV의 해시 (형식 버전이 다르면 None이라 항상 다시 만듦)"""
+    stats = _read_stats(stats_path, os.stat(stats_path).st_mtime_ns)
+    return stats.get("bank_version") if stats.get("version") == STATS_VERSION else None
+
+
+def _is_fresh(stats_path, csv_path):
+    # mtime이 아니라 스냅숏에 기록된 bank_version과 현재 CSV 해시로 판단
+    return is_built_from(csv_path, stats_path, _stats_bank_version)
+
+
+def load_bank_stats(path=QUESTIONS_PATH):
+    """
+    현재 문제 은행 버전의 통계 스냅숏을 가져오는 함수
+
+    스냅숏은 extract_keywords.py가 문제 은행과 함께 만듭니다. 없거나 기록된 bank_version이
+    현재 CSV 해시와 다르면(또는 형식 버전이 다르면) 이 자리에서 한 번 만들어 저장하고, 그 뒤로는 파일이 바뀔
+    때까지 프로세스 메모리에 있는 스냅숏을 그대로 반환합니다. 반환된 dict는 모든
+    세션이 공유하므로 수정하면 안 됩니다.
+
+    Parameters:
+    path (str): 문제 CSV 파일 경로
+
+    Returns:
+    dict: 통계 스냅숏 (total, counts, time_limits)
+    """
+    stats_path = stats_path_for(path)
+    if not _is_fresh(stats_path, path):
+        with _build_lock:
+            # 다른 스레드가 먼저 만들었을 수 있으므로 다시 확인
+            if not _is_fresh(stats_path, path):
+                build_bank_stats(path, stats_path)
+    return _read_stats(stats_path, os.stat(stats_path).st_mtime_ns)
@@ -0,0 +1,220 @@
+import math
+import random
+import time
+
+from utils.question_index import draw
+
+# 담금질 국소 탐색 반복 횟수 (온도 내리기와 멈추는 시점은 반복 횟수로만 정하므로 같은 시드면 같은 시험)
+SOLVER_ITERATIONS = 40000
+
+# 구성 문제를 찾는 데 쓰는 최대 시간 (초, 느린 서버에서 요청이 오래 걸리지 않게 하는 안전장치로만 사용)
+SOLVER_TIME_LIMIT = 1.0
+
+# 문제를 서로 바꿔도 목표에 차이가 없는 단위 (유형, 제한 시간, 배점)
+SIGNATURE_FIELDS = ("Type", "Time_lmit", "Points")
+
+# 담금질 초기 온도 (목표 대비 상대 오차 단위)
+INITIAL_TEMPERATURE = 0.05
+
+
+class AssemblyResult:
+    """
+    시험 구성 결과
+
+    Attributes:
+    question_ids (list): 문제 ID 목록 (시험 순서)
+    total_time (int): 제한 시간 합계 (초)
+    total_points (int): 배점 합계
+    type_counts (dict): 유형 -> 문제 수
+    deviation (dict): 목표와의 차이 (실제 - 목표, 지정한 목표만)
+    cost (float): 목표 대비 상대 오차 합 (0이면 모든 목표 달성)
+    elapsed (float): 구성에 걸린 시간 (초)
+    """
+
+    __slots__ = ("question_ids", "total_time", "total_points", "type_counts", "deviation", "cost", "elapsed")
+
+    def __init__(self, question_ids, total_time, total_points, type_counts, deviation, cost, elapsed):
+        self.question_ids = question_ids
+        self.total_time = total_time
+        self.total_points = total_points
+        self.type_counts = type_counts
+        self.deviation = deviation
+        self.cost = cost
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (f"AssemblyResult(questions={len(self.question_ids)}, total_time={self.total_time}, "
+                f"total_points={self.total_points}, deviation={self.deviation})")
+
+
+class _Objective:
+    """목표 대비 상대 오차 (문제 수/시간/배점/유형 비율 목표 중 지정한 것만 더함)"""
+
+    def __init__(self, size, total_time, total_points, type_ratio):
+        self.size = size
+        self.total_time = total_time
+        self.total_points = total_points
+        self.type_ratio = type_ratio or {}
+
+    def __call__(self, count, seconds, points, type_counts):
+        cost = 0.0
+        if self.size:
+            cost += abs(count - self.size) / self.size
+        if self.total_time:
+            cost += abs(seconds - self.total_time) / self.total_time
+        if self.total_points:
+            cost += abs(points - self.total_points) / self.total_points
+        if self.type_ratio:
+            # 유형 비율은 실제 문제 수 기준 (문제가 없으면 최대 오차)
+            if count == 0:
+                cost += len(self.type_ratio)
+            else:
+                cost += sum(abs(type_counts.get(t, 0) - r * count) for t, r in self.type_ratio.items()) / count
+        return cost
+
+    def deviation(self, count, seconds, points, type_counts):
+        deviation = {}
+        if self.size:
+            deviation["size"] = count - self.size
+        if self.total_time:
+            deviation["time"] = seconds - self.total_time
+        if self.total_points:
+            deviation["points"] = points - self.total_points
+        if self.type_ratio:
+            deviation["types"] = {t: type_counts.get(t, 0) - round(r * count) for t, r in self.type_ratio.items()}
+        return deviation
+
+
+def assemble_exam(index, size=None, total_time=None, total_points=None, type_ratio=None,
+                  seed=None, iterations=SOLVER_ITERATIONS, time_limit=SOLVER_TIME_LIMIT, **filters):
+    """
+    제한 시간 합계, 배점 합계, 유형 비율 목표에 맞게 시험을 구성하는 함수
+
+    (유형, 제한 시간, 배점)이 같은 문제끼리는 어느 것을 골라도 목표에 차이가 없으므로
+    먼저 이 묶음(signature)마다 몇 문제를 뽑을지를 정하고, 그 다음 묶음 안에서 무작위로
+    문제를 고릅니다. 묶음 수는 값 조합 수뿐이라 문제 은행이 커져도 탐색 공간이 늘지
+    않습니다. 개수는 욕심쟁이 방식으로 시작해서 담금질(simulated annealing) 국소 탐색으로
+    iterations번(또는 모든 목표를 맞출 때까지) 다듬습니다. 탐색은 시계를 보지 않으므로
+    같은 시드와 조건이면 항상 같은 시험이 나오고, time_limit은 이를 넘기면 그때까지의
+    가장 좋은 결과로 끝내는 안전장치입니다 (이때는 같은 시드라도 결과가 다를 수 있음).
+
+    Parameters:
+    index (QuestionIndex): 문제 역색인
+    size (int): 목표 문제 수 (None이면 자유)
+    total_time (int): 목표 제한 시간 합계 (초)
+    total_points (int): 목표 배점 합계
+    type_ratio (dict): 유형 -> 비율 (예: {"서술형": 0.7})
+    seed (int): 난수 시드
+    iterations (int): 담금질 반복 횟수
+    time_limit (float): 탐색 시간 상한 (초, 안전장치)
+    **filters: 열 -> 허용하는 값 목록 (Year, Category 등)
+
+    Returns:
+    AssemblyResult: 구성 결과와 목표와의 차이
+    """
+    if not (size or total_time or total_points):
+        raise ValueError("문제 수, 제한 시간 합계, 배점 합계 중 하나 이상의 목표가 필요합니다.")
+
+    started = time.perf_counter()
+    deadline = started + time_limit
+    rng = random.Random(seed)
+    objective = _Objective(size, total_time, total_points, type_ratio)
+
+    groups = index.groups(SIGNATURE_FIELDS, **filters)
+    signatures = list(groups)
+    capacity = [groups[key].total for key in signatures]
+    num_groups = len(signatures)
+
+    counts = [0] * num_groups
+    state = {"count": 0, "time": 0, "points": 0, "types": {}}
+
+    def moved(g, step):
+        """묶음 g의 개수를 step만큼 바꿨을 때의 합계 (상태는 바꾸지 않음)"""
+        question_type, seconds, points = signatures[g]
+        types = dict(state["types"])
+        types[question_type] = types.get(question_type, 0) + step
+        return (state["count"] + step, state["time"] + step * seconds,
+                state["points"] + step * points, types)
+
+    def apply(g, step):
+        counts[g] += step
+        state["count"], state["time"], state["points"], state["types"] = moved(g, step)
+
+    def current_cost():
+        return objective(state["count"], state["time"], state["points"], state["types"])
+
+    # 욕심쟁이 시작: 오차가 가장 많이 줄어드는 묶음을 하나씩 추가
+    cost = current_cost()
+    while time.perf_counter() < deadline:
+        best_g, best_cost = None, cost
+        for g in range(num_groups):
+            if counts[g] < capacity[g]:
+                candidate = objective(*moved(g, 1))
+                if candidate < best_cost:
+                    best_g, best_cost = g, candidate
+        if best_g is None:
+            break
+        apply(best_g, 1)
+        cost = best_cost
+
+    # 담금질 국소 탐색: 하나 추가 / 하나 빼기 / 한 묶음에서 다른 묶음으로 옮기기
+    best_counts, best_cost = list(counts), cost
+    temperature = INITIAL_TEMPERATURE
+    iteration = 0
+    while best_cost > 1e-12 and num_groups and iteration < iterations:
+        iteration += 1
+        if iteration % 256 == 0:
+            if time.perf_counter() >= deadline:
+                break
+            temperature = INITIAL_TEMPERATURE * (iterations - iteration) / iterations
+
+        g = rng.randrange(num_groups)
+        move = rng.randrange(3)
+        if move == 0:
+            if counts[g] >= capacity[g]:
+                continue
+            steps = [(g, 1)]
+        elif move == 1:
+            if counts[g] == 0:
+                continue
+            steps = [(g, -1)]
+        else:
+            h = rng.randrange(num_groups)
+            if h == g or counts[g] == 0 or counts[h] >= capacity[h]:
+                continue
+            steps = [(g, -1), (h, 1)]
+
+        for group, step in steps:
+            apply(group, step)
+        candidate = current_cost()
+        if candidate <= cost or rng.random() < math.exp((cost - candidate) / max(temperature, 1e-9)):
+            cost = candidate
+            if cost < best_cost:
+                best_counts, best_cost = list(counts), cost
+        else:
+            for group, step in reversed(steps):
+                apply(group, -step)
+
+    # 묶음별 개수대로 실제 문제를 고름
+    picked = []
+    draw_state = {"chosen": set(), "time": 0}
+    type_counts = {}
+    total_seconds = total_points_sum = 0
+    for g, count in enumerate(best_counts):
+        if count:
+            question_type, seconds, points = signatures[g]
+            picked.extend(draw(groups[signatures[g]], count, rng, draw_state))
+            type_counts[question_type] = type_counts.get(question_type, 0) + count
+            total_seconds += count * seconds
+            total_points_sum += count * points
+    rng.shuffle(picked)
+
+    return AssemblyResult(
+        question_ids=picked,
+        total_time=total_seconds,
+        total_points=total_points_sum,
+        type_counts=type_counts,
+        deviation=objective.deviation(len(picked), total_seconds, total_points_sum, type_counts),
+        cost=best_cost,
+        elapsed=time.perf_counter() - started,
+    )
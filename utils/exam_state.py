@@ -0,0 +1,43 @@
+import time
+from array import array
+
+
+class AnswerRecord:
+    """
+    문제 하나에 대한 답변 기록 (세션 상태에 저장)
+
+    문제 내용, 정답, 배점 등은 저장하지 않고 question_id로 공유 문제 은행에서
+    찾아서 표시합니다.
+
+    Attributes:
+    question_id (int): 문제 ID
+    user_answer (str): 사용자가 입력한 답변
+    score (int): 획득 점수
+    is_correct (bool): 정답 여부
+    started_at (float): 문제를 보여준 시각 (epoch 초)
+    submitted_at (float): 답변을 제출한 시각 (epoch 초)
+    """
+
+    __slots__ = ("question_id", "user_answer", "score", "is_correct", "started_at", "submitted_at")
+
+    def __init__(self, question_id, user_answer, score, is_correct, started_at, submitted_at=None):
+        self.question_id = int(question_id)
+        self.user_answer = user_answer
+        self.score = int(score)
+        self.is_correct = bool(is_correct)
+        self.started_at = started_at
+        self.submitted_at = time.time() if submitted_at is None else submitted_at
+
+    @property
+    def time_used(self):
+        """답변에 걸린 시간(초)"""
+        return self.submitted_at - self.started_at
+
+    def __repr__(self):
+        return (f"AnswerRecord(question_id={self.question_id}, score={self.score}, "
+                f"is_correct={self.is_correct})")
+
+
+def id_array(question_ids):
+    """문제 ID 목록을 세션 상태에 저장할 정수 배열로 바꾸는 함수"""
+    return array("q", (int(qid) for qid in question_ids))
@@ -0,0 +1,199 @@
+import unicodedata
+from itertools import repeat
+
+# 이 길이(자모 단위) 미만의 키워드는 오타를 허용하지 않음 (짧은 키워드는 우연히 비슷한 말이 많음)
+FUZZY_MIN_LENGTH = 5
+
+# 키워드 길이(자모 단위) 대비 허용하는 편집 거리 비율과 최대 편집 거리
+FUZZY_DISTANCE_RATIO = 0.2
+FUZZY_MAX_DISTANCE = 3
+
+
+def decompose_jamo(text):
+    """
+    한글 음절을 자모로 나누는 함수 (유니코드 NFD 정규화, 한글 음절은 조합형 자모로 나뉨)
+
+    Parameters:
+    text (str): 텍스트
+
+    Returns:
+    str: 자모로 나눈 텍스트 (예: "핵" -> 초성 ㅎ, 중성 ㅐ, 종성 ㄱ 세 글자)
+    """
+    # C로 구현된 정규화가 음절별 변환표(str.translate)보다 10배 이상 빠름
+    return unicodedata.normalize("NFD", text)
+
+
+def keyword_threshold(jamo_keyword):
+    """
+    키워드 하나에 허용하는 편집 거리 (자모 단위 길이에 비례, 짧은 키워드는 0)
+
+    Parameters:
+    jamo_keyword (str): 자모로 나눈 키워드
+
+    Returns:
+    int: 허용하는 편집 거리
+    """
+    length = len(jamo_keyword)
+    if length < FUZZY_MIN_LENGTH:
+        return 0
+    return min(FUZZY_MAX_DISTANCE, max(1, int(length * FUZZY_DISTANCE_RATIO)))
+
+
+def _split_pieces(pattern, count):
+    """패턴을 거의 같은 길이의 count개 조각으로 나누는 함수 (조각 시작 위치, 조각)"""
+    size, extra = divmod(len(pattern), count)
+    pieces = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        pieces.append((start, pattern[start:end]))
+        start = end
+    return pieces
+
+
+class _FuzzyPattern:
+    """근사 검색용으로 미리 계산한 키워드 하나 (문자별 비트 마스크, 필터 조각)"""
+
+    __slots__ = ("keyword", "jamo", "max_distance", "peq", "high", "mask", "pieces")
+
+    def __init__(self, keyword, max_distance=None):
+        self.keyword = keyword
+        self.jamo = decompose_jamo(keyword)
+        if max_distance is None:
+            max_distance = keyword_threshold(self.jamo)
+        # 키워드 길이 이상의 거리는 아무 텍스트나 맞으므로 길이 - 1까지만 허용
+        self.max_distance = max(0, min(max_distance, len(self.jamo) - 1))
+
+        # 문자 -> 패턴에서 그 문자가 나오는 위치의 비트
+        peq = {}
+        for position, ch in enumerate(self.jamo):
+            peq[ch] = peq.get(ch, 0) | (1 << position)
+        self.peq = peq
+        self.high = 1 << (len(self.jamo) - 1) if self.jamo else 0
+        self.mask = (1 << len(self.jamo)) - 1
+        self.pieces = _split_pieces(self.jamo, self.max_distance + 1) if self.max_distance else []
+
+    def within(self, text, start, end):
+        """
+        text[start:end] 안에 편집 거리 max_distance 이하로 나오는 곳이 있는지 확인하는 함수
+
+        Myers/Hyyrö 비트 병렬 알고리즘으로, 패턴 전체의 DP 열을 정수 하나의 비트로
+        들고 글자 하나당 정수 연산 열 몇 번으로 갱신합니다. 텍스트의 어느 위치에서든
+        시작할 수 있도록(부분 문자열 검색) 첫 행은 0으로 둡니다.
+        """
+        high = self.high
+        mask = self.mask
+        limit = self.max_distance
+        pv = mask
+        mv = 0
+        score = len(self.jamo)
+        # 글자 -> 비트 마스크 변환은 C로 구현된 map으로 한 번에
+        for eq in map(self.peq.get, text[start:end], repeat(0)):
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+                if score <= limit:
+                    return True
+            ph <<= 1
+            pv = ((mh << 1) | ~(xv | ph)) & mask
+            mv = ph & xv
+        return False
+
+    def search(self, text):
+        """
+        자모로 나눈 텍스트에 키워드가 허용 편집 거리 이내로 나오는지 확인하는 함수
+
+        조각이 정확히 나오는 위치마다 키워드가 들어갈 수 있는 구간을 만들고, 겹치는
+        구간은 합쳐서 구간마다 한 번만 비트 병렬 검사를 합니다.
+        """
+        if self.jamo in text:
+            return True
+        if not self.max_distance:
+            return False
+
+        length = len(self.jamo)
+        slack = self.max_distance
+        windows = []
+        for offset, piece in self.pieces:
+            position = text.find(piece)
+            while position != -1:
+                begin = position - offset - slack
+                windows.append((max(0, begin), min(len(text), begin + length + 2 * slack)))
+                position = text.find(piece, position + 1)
+        if not windows:
+            return False
+
+        windows.sort()
+        begin, end = windows[0]
+        for next_begin, next_end in windows[1:]:
+            if next_begin <= end:
+                end = max(end, next_end)
+                continue
+            if self.within(text, begin, end):
+                return True
+            begin, end = next_begin, next_end
+        return self.within(text, begin, end)
+
+
+class FuzzyKeywordMatcher:
+    """
+    오타를 허용하는 키워드 검색기 (KeywordMatcher와 같은 방법으로 사용)
+
+    한글은 음절을 자모(초성/중성/종성)로 나눈 뒤 비교하므로 받침 하나, 모음 하나가
+    틀린 음절은 편집 거리 1로 셉니다. 근사 검색은 Myers의 비트 병렬 편집 거리
+    알고리즘(Hyyrö의 정리)을 쓰고, 키워드를 k+1 조각으로 나눠 한 조각이라도 정확히
+    나오는 곳 주변만 검사하므로(편집 k번으로는 k+1 조각을 모두 망가뜨릴 수 없음)
+    검사 비용은 답변 길이에 선형입니다.
+
+    키워드마다 자모 단위 길이에 따라 허용 편집 거리를 정하고(keyword_threshold),
+    그 거리 이내로 답변에 나오는 키워드를 찾습니다. 허용 거리가 0인 짧은 키워드는
+    정확히 포함될 때만 찾습니다. 모든 키워드를 각자의 허용 거리로 끝까지 검사하므로
+    결과는 키워드 순서와 답변 길이에 관계없이 같습니다.
+    """
+
+    __slots__ = ("patterns", "_fuzzy")
+
+    def __init__(self, patterns, thresholds=None):
+        """
+        Parameters:
+        patterns (list): 키워드 목록
+        thresholds (dict): 키워드 -> 허용 편집 거리 (없는 키워드는 길이로 정함)
+        """
+        self.patterns = tuple(dict.fromkeys(patterns))
+        thresholds = thresholds or {}
+        self._fuzzy = [_FuzzyPattern(kw, thresholds.get(kw)) for kw in self.patterns]
+
+    def find(self, text, found=None, target=None):
+        """
+        텍스트에 (오타를 허용해서) 포함된 키워드를 찾는 함수
+
+        Parameters:
+        text (str): 검색할 텍스트
+        found (set): 이미 정확히 찾은 키워드 (다시 검사하지 않음)
+        target (int): 이만큼 찾으면 더 찾아도 채점 결과가 같으므로 멈춤 (None이면 모두 찾음)
+
+        Returns:
+        set: 포함된 키워드 집합 (found 포함)
+        """
+        found = set(found or ())
+        jamo_text = None
+        for pattern in self._fuzzy:
+            if target is not None and len(found) >= target:
+                break
+            if pattern.keyword in found:
+                continue
+            if pattern.keyword in text:
+                found.add(pattern.keyword)
+                continue
+            if not pattern.max_distance:
+                continue
+            if jamo_text is None:
+                jamo_text = decompose_jamo(text)
+            if pattern.search(jamo_text):
+                found.add(pattern.keyword)
+        return found
@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.metrics import GRADING_QUEUE_DEPTH, GRADING_SUBMISSIONS, GRADING_WAIT_SECONDS
+from utils.scoring import check_answer
+from utils.similarity import SIMILARITY_SCORING
+
+# 채점 스레드 수 (ANATOMY_ACE_GRADING_WORKERS=0 이면 채점 스레드 없이 제출한 스크립트에서 바로 채점)
+GRADING_WORKERS_ENV = "ANATOMY_ACE_GRADING_WORKERS"
+GRADING_WORKERS = int(os.environ.get(GRADING_WORKERS_ENV, min(4, os.cpu_count() or 1)))
+
+# 채점을 기다리는 제출의 최대 수 (넘으면 큐에 넣지 않고 제출한 스크립트에서 바로 채점)
+GRADING_MAX_PENDING = 256
+
+# 결과를 찾아가지 않은 채점표를 보관하는 시간 (초, 채점 중에 창을 닫고 떠난 경우)
+GRADING_RESULT_TTL = 10 * 60
+
+# 채점 중 화면에서 결과가 나왔는지 확인하는 간격 (초)
+GRADING_POLL_INTERVAL = 0.25
+
+
+def grade(user_answer, question_data, bank=None):
+    """
+    답변 하나를 채점하는 함수 (유사도 채점을 켰으면 서술형은 모범 답안과의 유사도도 반영)
+
+    Parameters:
+    user_answer (str): 사용자가 입력한 답변
+    question_data (Series): 문제 데이터
+    bank: 문제 은행 또는 문제 저장소 (유사도 색인을 만들 때 사용)
+
+    Returns:
+    tuple: (정답 여부, 점수)
+    """
+    similarity = None
+    if SIMILARITY_SCORING and bank is not None and question_data["Type"] == "서술형" and user_answer:
+        # 유사도 색인(numpy)은 유사도 채점을 켰을 때만 불러옴
+        from utils.similarity import get_similarity_index
+
+        similarity = get_similarity_index(bank).similarity(question_data["ID"], user_answer)
+    return check_answer(user_answer, question_data, similarity=similarity)
+
+
+class GradingService:
+    """
+    프로세스 안의 채점 서비스 (제한된 크기의 스레드 풀)
+
+    submit()은 채점을 큐에 넣고 채점표(ticket)를 바로 돌려주므로, 무거운 채점
+    (오타 허용, 긴 서술형 답변)이 제출한 세션의 화면 그리기를 막지 않습니다.
+    결과는 채점표로 result()를 호출해서 확인하고, 다 쓰면 release()로 정리합니다.
+
+    채점 스레드 수가 0이거나 기다리는 제출이 GRADING_MAX_PENDING을 넘으면
+    제출한 스레드에서 바로 채점해서 완료된 채점표를 돌려줍니다.
+    """
+
+    def __init__(self, workers=GRADING_WORKERS, max_pending=GRADING_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="grading") if workers > 0 else None
+        self._lock = threading.Lock()
+        self._tickets = {}  # 채점표 -> (Future, 제출 시각)
+        self._pending = 0
+        GRADING_QUEUE_DEPTH.set(0)
+
+    def _grade(self, submitted, user_answer, question_data, bank):
+        """채점 스레드: 기다린 시간을 기록하고 채점"""
+        with self._lock:
+            self._pending -= 1
+            GRADING_QUEUE_DEPTH.set(self._pending)
+        GRADING_WAIT_SECONDS.observe(time.monotonic() - submitted)
+        return grade(user_answer, question_data, bank)
+
+    def _expire(self, now):
+        """결과를 오래 찾아가지 않은 채점표 정리 (lock을 잡은 상태에서 호출)"""
+        expired = [ticket for ticket, (future, submitted) in self._tickets.items()
+                   if future.done() and now - submitted > GRADING_RESULT_TTL]
+        for ticket in expired:
+            del self._tickets[ticket]
+
+    def submit(self, user_answer, question_data, bank=None):
+        """
+        답변 채점을 요청하는 함수
+
+        Parameters:
+        user_answer (str): 사용자가 입력한 답변
+        question_data (Series): 문제 데이터
+        bank: 문제 은행 또는 문제 저장소 (유사도 채점에 사용, 없으면 키워드로만 채점)
+
+        Returns:
+        str: 채점표 (result()로 결과 확인)
+        """
+        ticket = uuid.uuid4().hex
+        submitted = time.monotonic()
+        with self._lock:
+            self._expire(submitted)
+            queued = self._executor is not None and self._pending < self.max_pending
+            if queued:
+                self._pending += 1
+                GRADING_QUEUE_DEPTH.set(self._pending)
+
+        if queued:
+            future = self._executor.submit(self._grade, submitted, user_answer, question_data, bank)
+        else:
+            future = Future()
+            try:
+                future.set_result(grade(user_answer, question_data, bank))
+            except Exception as e:
+                future.set_exception(e)
+        GRADING_SUBMISSIONS.inc(mode="pool" if queued else "inline")
+
+        with self._lock:
+            self._tickets[ticket] = (future, submitted)
+        return ticket
+
+    def result(self, ticket):
+        """
+        채점 결과를 확인하는 함수 (기다리지 않음)
+
+        Parameters:
+        ticket (str): submit()이 돌려준 채점표
+
+        Returns:
+        tuple: (정답 여부, 점수), 아직 채점 중이면 None
+               (채점 중 오류가 났으면 그 예외를 다시 발생)
+
+        Raises:
+        KeyError: 모르는 채점표 (정리됐거나 서버가 다시 시작된 경우)
+        """
+        with self._lock:
+            future, _ = self._tickets[ticket]
+        if not future.done():
+            return None
+        return future.result()
+
+    def done(self, ticket):
+        """채점이 끝났는지 확인하는 함수 (모르는 채점표도 True - 결과를 확인하는 쪽에서 처리)"""
+        with self._lock:
+            entry = self._tickets.get(ticket)
+        return entry is None or entry[0].done()
+
+    def release(self, ticket):
+        """결과를 다 쓴 채점표를 정리하는 함수"""
+        with self._lock:
+            self._tickets.pop(ticket, None)
+
+    def shutdown(self):
+        """채점 스레드를 멈추는 함수 (기다리는 채점은 끝까지 처리)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+@st.cache_resource(show_spinner=False)
+def get_grading_service():
+    """프로세스 전체가 공유하는 채점 서비스 (채점 스레드 풀은 프로세스마다 하나)"""
+    return GradingService()
+
+
+@st.fragment(run_every=GRADING_POLL_INTERVAL)
+def _grading_poller(ticket):
+    if get_grading_service().done(ticket):
+        st.rerun()
+    st.info("⏳ 채점 중입니다... 잠시만 기다려주세요.")
+
+
+def wait_for_grade(ticket):
+    """
+    채점 결과를 기다리는 동안 채점 중 안내를 보여주는 함수
+
+    안내 부분만 GRADING_POLL_INTERVAL마다 다시 그리며 결과를 확인하고, 결과가
+    나오면 페이지 전체를 다시 실행합니다 (페이지는 다시 실행될 때 결과를 기록).
+
+    Parameters:
+    ticket (str): 채점표
+    """
+    _grading_poller(ticket)
@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import os
+
+import streamlit as st
+
+# Pillow는 문제 은행을 만들 때(이미지를 줄여서 저장할 때)만 불러옴 (페이지에서는 이미지를 열지 않음)
+
+logger = logging.getLogger(__name__)
+
+# 문제 은행 CSV의 이미지 열 (CSV 파일이 있는 폴더 기준 경로, 비어 있으면 이미지 없는 문제)
+IMAGE_COLUMN = "Image"
+
+# 줄인 이미지를 저장하는 폴더 (내용 해시로 이름을 붙임)
+#   Streamlit 정적 파일 제공(server.enableStaticServing, .streamlit/config.toml)으로
+#   브라우저가 직접 받아가므로 앱 실행 위치의 static/ 아래에 둠
+IMAGE_CACHE_DIR = "static/question_images"
+IMAGE_URL_PREFIX = "app/static/question_images"
+
+# 미리 만들어 두는 표시 너비 (원본보다 큰 너비는 원본 너비로 만듦)
+IMAGE_WIDTHS = (480, 960)
+
+# WebP 화질
+WEBP_QUALITY = 80
+
+# 이미지 처리 방법(너비, 화질, 리사이즈 방식)이 바뀌면 올려서 이전 캐시를 쓰지 않게 함
+IMAGE_PIPELINE_VERSION = 1
+
+
+def image_digest(data):
+    """
+    원본 이미지 내용과 처리 설정으로 캐시 키(SHA-256)를 만드는 함수
+
+    Parameters:
+    data (bytes): 원본 이미지 파일 내용
+
+    Returns:
+    str: 16진수 해시
+    """
+    digest = hashlib.sha256(f"{IMAGE_PIPELINE_VERSION}:{IMAGE_WIDTHS}:{WEBP_QUALITY}\n".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def cached_image_path(key, width, cache_dir=IMAGE_CACHE_DIR):
+    """캐시 키와 너비로 줄인 이미지 파일 경로를 만드는 함수 (static/question_images/ab/ab12...-480.webp)"""
+    return os.path.join(cache_dir, key[:2], f"{key}-{width}.webp")
+
+
+def _encode_widths(image, key, widths, cache_dir):
+    """원본 이미지를 너비마다 줄여 WebP로 저장하는 함수 (큰 너비부터 줄여서 다음 너비의 원본으로 씀)"""
+    from PIL import Image, ImageOps
+
+    # JPEG은 디코딩할 때부터 필요한 크기에 가깝게 줄여서 읽음 (원본 크기로 풀지 않음,
+    # 회전된 사진도 가장 큰 너비 이상이 남도록 가로/세로 모두 그 이상으로 요청)
+    largest = widths[-1]
+    image.draft(image.mode, (largest, largest))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    for width in reversed(widths):
+        if image.width != width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        target = cached_image_path(key, width, cache_dir)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체해서 브라우저가 반쯤 쓰인 파일을 받지 않게 함
+        temp_path = target + ".tmp"
+        image.save(temp_path, format="WEBP", quality=WEBP_QUALITY, method=4)
+        os.replace(temp_path, target)
+
+
+def ingest_image(source_path, cache_dir=IMAGE_CACHE_DIR):
+    """
+    원본 이미지를 표시 너비별 WebP로 줄여서 캐시 폴더에 저장하는 함수
+
+    같은 내용의 이미지는 같은 키를 가지므로, 이미 모든 너비가 캐시에 있으면 원본을
+    디코딩하지 않고 키만 돌려줍니다.
+
+    Parameters:
+    source_path (str): 원본 이미지 파일 경로
+    cache_dir (str): 캐시 폴더
+
+    Returns:
+    tuple: (캐시 키, 저장한 너비 튜플)
+    """
+    from PIL import Image
+
+    with open(source_path, "rb") as f:
+        data = f.read()
+    key = image_digest(data)
+
+    # 크기는 파일 머리만 읽어서 확인 (Image.open은 픽셀을 디코딩하지 않음)
+    with Image.open(source_path) as image:
+        width, height = image.size
+        if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):  # 90도 회전된 사진
+            width = height
+        widths = tuple(sorted({min(target, width) for target in IMAGE_WIDTHS}))
+        if not all(os.path.exists(cached_image_path(key, w, cache_dir)) for w in widths):
+            _encode_widths(image, key, widths, cache_dir)
+    return key, widths
+
+
+def add_image_columns(questions, csv_path, cache_dir=IMAGE_CACHE_DIR):
+    """
+    이미지 열(Image)이 있는 문제 은행의 이미지를 캐시에 넣고 ImageKey, ImageWidths 열을 붙이는 함수
+
+    이미지 파일이 없거나 읽을 수 없는 문제는 경고를 남기고 이미지 없는 문제로 둡니다.
+    이미지 열이 없으면 아무것도 하지 않습니다.
+
+    Parameters:
+    questions (DataFrame): 정리된 문제 데이터 (직접 수정함)
+    csv_path (str): 문제 CSV 파일 경로 (이미지 경로의 기준 폴더)
+    cache_dir (str): 캐시 폴더
+
+    Returns:
+    DataFrame: 같은 문제 데이터
+    """
+    if IMAGE_COLUMN not in questions.columns:
+        return questions
+
+    base_dir = os.path.dirname(os.path.abspath(csv_path))
+    ingested = {}  # 같은 이미지를 여러 문제가 쓰면 한 번만 처리
+    keys, widths = [], []
+    for source in questions[IMAGE_COLUMN].tolist():
+        entry = None
+        if isinstance(source, str) and source.strip():
+            source_path = os.path.join(base_dir, source.strip())
+            if source_path not in ingested:
+                try:
+                    ingested[source_path] = ingest_image(source_path, cache_dir)
+                except (OSError, ValueError) as e:  # 파일 없음, 이미지가 아님 (PIL.UnidentifiedImageError 포함)
+                    logger.warning("문제 이미지를 처리하지 못했습니다: %s (%s)", source_path, e)
+                    ingested[source_path] = None
+            entry = ingested[source_path]
+        keys.append(entry[0] if entry else None)
+        widths.append(entry[1] if entry else None)
+    questions["ImageKey"] = keys
+    questions["ImageWidths"] = widths
+    return questions
+
+
+def image_html(key, widths):
+    """
+    캐시된 이미지를 너비별로 골라 받는 <img> 태그를 만드는 함수
+
+    브라우저가 화면 너비에 맞는 파일 하나만, 화면에 보일 때(loading="lazy") 정적 파일
+    주소에서 받아갑니다. 파일 이름이 내용 해시라서 브라우저 캐시를 그대로 쓸 수 있습니다.
+    """
+    srcset = ", ".join(f"{IMAGE_URL_PREFIX}/{key[:2]}/{key}-{width}.webp {width}w" for width in widths)
+    largest = widths[-1]
+    return (
+        f"<img class='question-image' src='{IMAGE_URL_PREFIX}/{key[:2]}/{key}-{largest}.webp' "
+        f"srcset='{srcset}' sizes='(max-width: {largest}px) 100vw, {largest}px' "
+        f"style='max-width: 100%; height: auto;' loading='lazy' decoding='async' alt='문제 이미지'>"
+    )
+
+
+def show_question_image(question_data):
+    """
+    문제에 이미지가 있으면 보여주는 함수 (화면에 있는 문제만 호출)
+
+    정적 파일 제공이 켜져 있으면 <img> 태그만 보내고 이미지 바이트는 브라우저가 직접
+    받아가며, 꺼져 있으면 캐시에서 가장 큰 너비의 파일을 st.image로 보냅니다.
+
+    Parameters:
+    question_data (Series): 문제 데이터
+    """
+    key = question_data.get("ImageKey")
+    widths = question_data.get("ImageWidths")
+    if not isinstance(key, str) or not isinstance(widths, (tuple, list)) or not widths:
+        return
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(image_html(key, widths), unsafe_allow_html=True)
+    else:
+        st.image(cached_image_path(key, widths[-1]))
@@ -0,0 +1,92 @@
+from collections import deque
+
+# 이 개수 이상의 키워드부터 Aho-Corasick 오토마톤으로 한 번에 검색
+# (CPython에서는 키워드가 적으면 C로 구현된 `in` 검사를 여러 번 하는 쪽이 더 빠름.
+#  답변 450자 기준으로 키워드 9개는 `in` 약 2us, 오토마톤 약 75us)
+AHO_CORASICK_MIN_PATTERNS = 256
+
+
+class KeywordMatcher:
+    """
+    여러 키워드를 미리 컴파일해두고 답변에 포함된 키워드를 찾는 클래스
+
+    키워드가 많으면 Aho-Corasick 오토마톤을 만들어 답변을 한 번만 훑고,
+    적으면 중복을 제거한 키워드 목록으로 부분 문자열 검사를 합니다.
+    어느 쪽이든 결과는 `kw in text` 를 키워드마다 검사한 것과 같습니다.
+    """
+
+    __slots__ = ("patterns", "_goto", "_fail", "_output")
+
+    def __init__(self, patterns):
+        # 중복 제거 (순서 유지)
+        self.patterns = tuple(dict.fromkeys(patterns))
+        self._goto = None
+        self._fail = None
+        self._output = None
+        if len(self.patterns) >= AHO_CORASICK_MIN_PATTERNS:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        goto = [{}]
+        output = [set()]
+
+        # 1단계: 키워드 트라이 만들기
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    goto.append({})
+                    output.append(set())
+                    next_state = len(goto) - 1
+                    goto[state][ch] = next_state
+                state = next_state
+            output[state].add(index)
+
+        # 2단계: 너비 우선으로 실패 링크 연결, 출력은 실패 링크를 따라 합침
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fallback = goto[f].get(ch, 0)
+                fail[next_state] = fallback if fallback != next_state else 0
+                output[next_state] |= output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [frozenset(o) for o in output]
+
+    def find(self, text):
+        """
+        텍스트에 포함된 키워드를 찾는 함수
+
+        Parameters:
+        text (str): 검색할 텍스트
+
+        Returns:
+        set: 포함된 키워드 집합
+        """
+        if self._goto is None:
+            return {kw for kw in self.patterns if kw in text}
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        # 빈 키워드는 항상 포함된 것으로 봄 (`"" in text` 와 동일)
+        found = set(output[0])
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found |= output[state]
+                if len(found) == len(self.patterns):
+                    break
+
+        return {self.patterns[i] for i in found}
@@ -0,0 +1,477 @@
+import atexit
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# 내보내기 설정 (둘 다 없으면 수집만 하고 내보내지 않음)
+#   ANATOMY_ACE_METRICS_PORT=9464        -> http://127.0.0.1:9464/metrics 로 제공
+#   ANATOMY_ACE_METRICS_FILE=metrics.txt -> METRICS_FILE_INTERVAL초마다 파일로 저장
+METRICS_PORT_ENV = "ANATOMY_ACE_METRICS_PORT"
+METRICS_FILE_ENV = "ANATOMY_ACE_METRICS_FILE"
+METRICS_HOST = "127.0.0.1"
+METRICS_FILE_INTERVAL = 10
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 초당 스크립트 실행 수를 계산하는 구간 (초)
+RATE_WINDOW = 60
+
+# 이 시간 동안 움직임이 없는 시험은 진행 중으로 세지 않음 (초, 창을 닫고 떠난 경우)
+ACTIVE_EXAM_TIMEOUT = 30 * 60
+
+# 스크립트 실행 시간을 재려고 Streamlit 내부(ScriptRunner 스레드와 on_event 신호)에 붙는 것을
+# 확인한 Streamlit 버전 범위 ((major, minor), 양 끝 포함)
+#   범위 밖의 버전에서는 경고를 한 번 남기고 실행 횟수만 셈 (새 버전에서 확인한 뒤 범위를 넓힘)
+SCRIPT_RUNNER_HOOK_VERSIONS = ((1, 65), (1, 65))
+SCRIPT_RUNNER_THREAD_NAME = "ScriptRunner.scriptThread"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    """레이블 값 조합마다 값을 따로 두는 지표의 공통 부분"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.documentation}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    """계속 늘어나기만 하는 횟수"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self, items):
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Gauge(_Metric):
+    """현재 값 (function을 주면 내보낼 때마다 호출해서 값을 구함)"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _render_samples(self, items):
+        if self._function is not None:
+            items = [((), self._function())]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Histogram(_Metric):
+    """지연 시간 분포 (구간별 누적 개수, 합계, 개수)"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """
+        값 하나를 기록하는 함수 (구간 찾기와 더하기만 하므로 1µs 정도)
+
+        Parameters:
+        value (float): 관측값 (초)
+        **labels: 레이블 이름 -> 값
+        """
+        key = self._key(labels)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 구간별 개수(마지막 칸은 +Inf), 합계
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][position] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록의 실행 시간을 기록하는 컨텍스트 매니저 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        return lines
+
+
+class Registry:
+    """프로세스의 모든 지표 (이름이 같으면 같은 지표를 돌려줌)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        return self._get_or_create(Gauge, name, documentation, labelnames, function=function)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """
+        모든 지표를 OpenMetrics 텍스트 형식으로 만드는 함수
+
+        Returns:
+        str: OpenMetrics 텍스트 (# EOF 로 끝남)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _RateWindow:
+    """최근 RATE_WINDOW초 동안의 사건 수로 초당 빈도를 구하는 창"""
+
+    def __init__(self, window=RATE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._events = deque()
+
+    def _prune(self, now):
+        while self._events and self._events[0] < now - self.window:
+            self._events.popleft()
+
+    def add(self):
+        now = time.monotonic()
+        with self._lock:
+            self._events.append(now)
+            self._prune(now)
+
+    def rate(self):
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            return len(self._events) / self.window
+
+
+class _ActiveExams:
+    """진행 중인 시험 (응시 ID -> 마지막으로 움직인 시각)"""
+
+    def __init__(self, timeout=ACTIVE_EXAM_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._last_seen = {}
+
+    def touch(self, attempt_id):
+        with self._lock:
+            self._last_seen[attempt_id] = time.monotonic()
+
+    def finish(self, attempt_id):
+        with self._lock:
+            self._last_seen.pop(attempt_id, None)
+
+    def count(self):
+        cutoff = time.monotonic() - self.timeout
+        with self._lock:
+            # 오래 움직임이 없는 시험(중간에 떠난 응시)은 정리
+            for attempt_id in [a for a, seen in self._last_seen.items() if seen < cutoff]:
+                del self._last_seen[attempt_id]
+            return len(self._last_seen)
+
+
+_script_run_rate = _RateWindow()
+_active_exams = _ActiveExams()
+
+# 주요 지표
+BANK_LOAD_SECONDS = REGISTRY.histogram(
+    "anatomy_ace_bank_load_seconds", "문제 은행/저장소를 읽는 데 걸린 시간", ["source"])
+CHECK_ANSWER_SECONDS = REGISTRY.histogram(
+    "anatomy_ace_check_answer_seconds", "check_answer 한 번의 채점 시간", ["type"])
+SCRIPT_RUN_SECONDS = REGISTRY.histogram(
+    "anatomy_ace_script_run_seconds", "페이지 스크립트 한 번의 실행 시간", ["page", "outcome"])
+SCRIPT_RUNS = REGISTRY.counter(
+    "anatomy_ace_script_runs", "페이지 스크립트 실행 횟수", ["page"])
+SCRIPT_RUNS_PER_SECOND = REGISTRY.gauge(
+    "anatomy_ace_script_runs_per_second", f"최근 {RATE_WINDOW}초 동안의 초당 스크립트 실행 수",
+    function=_script_run_rate.rate)
+ACTIVE_EXAMS = REGISTRY.gauge(
+    "anatomy_ace_active_exams", "진행 중인 모의고사 수 (이 서버 프로세스)", function=_active_exams.count)
+GRADING_QUEUE_DEPTH = REGISTRY.gauge(
+    "anatomy_ace_grading_queue_depth", "채점 스레드를 기다리는 제출 수")
+GRADING_WAIT_SECONDS = REGISTRY.histogram(
+    "anatomy_ace_grading_wait_seconds", "제출부터 채점 스레드가 채점을 시작할 때까지 기다린 시간")
+GRADING_SUBMISSIONS = REGISTRY.counter(
+    "anatomy_ace_grading_submissions", "채점 요청 수 (pool: 채점 스레드, inline: 큐가 가득 차서 바로 채점)", ["mode"])
+
+# 스크립트 실행이 끝난 이유 -> outcome 레이블
+_RUN_OUTCOMES = {
+    "SCRIPT_STOPPED_WITH_SUCCESS": "completed",
+    "SCRIPT_STOPPED_FOR_RERUN": "rerun",
+    "SCRIPT_STOPPED_WITH_COMPILE_ERROR": "compile_error",
+    "FRAGMENT_STOPPED_WITH_SUCCESS": "fragment",
+}
+
+
+class _RunTimer:
+    """세션 하나의 스크립트 실행 시간을 재는 객체 (Streamlit 스크립트 실행기의 이벤트를 받음)"""
+
+    def __init__(self):
+        self.page = None
+        self.started = None
+
+    def on_event(self, sender, event=None, **kwargs):
+        # 요소를 보낼 때마다 호출되므로 시작/종료 이벤트만 빠르게 골라냄
+        name = getattr(event, "name", None)
+        if name == "SCRIPT_STARTED":
+            self.page, self.started = None, time.perf_counter()
+        elif name in _RUN_OUTCOMES and self.started is not None:
+            SCRIPT_RUN_SECONDS.observe(time.perf_counter() - self.started,
+                                       page=self.page or "unknown", outcome=_RUN_OUTCOMES[name])
+            self.started = None
+
+
+_run_timers = weakref.WeakKeyDictionary()
+_run_timers_lock = threading.Lock()
+
+# Streamlit 내부에 붙을 수 있는지 (None이면 아직 확인 전)
+_script_runner_hook = None
+
+
+def _script_runner_hook_enabled():
+    """
+    설치된 Streamlit이 스크립트 실행기에 붙어도 되는 버전인지 확인하는 함수 (처음 한 번만 확인)
+
+    범위 밖이면 실행 시간을 재지 않는다는 경고를 한 번 남깁니다.
+    """
+    global _script_runner_hook
+    if _script_runner_hook is None:
+        version = getattr(sys.modules.get("streamlit"), "__version__", "")
+        try:
+            major_minor = tuple(int(part) for part in version.split(".")[:2])
+        except ValueError:
+            major_minor = ()
+        low, high = SCRIPT_RUNNER_HOOK_VERSIONS
+        _script_runner_hook = low <= major_minor <= high
+        if not _script_runner_hook:
+            logger.warning(
+                "Streamlit %s에서는 페이지 스크립트 실행 시간을 기록하지 않습니다 "
+                "(확인한 버전: %d.%d ~ %d.%d, 실행 횟수만 기록).",
+                version or "(버전 알 수 없음)", *low, *high,
+            )
+    return _script_runner_hook
+
+
+def _current_script_runner():
+    """
+    현재 스레드에서 스크립트를 실행 중인 Streamlit 스크립트 실행기 (없으면 None)
+
+    Streamlit은 스크립트 실행이 끝났다는 공개 훅이 없어서, 실행 스레드의 대상인
+    ScriptRunner의 on_event 신호(Streamlit이 세션에 실행 시작/종료를 알릴 때 쓰는
+    신호)를 구독합니다. 내부 구조이므로 확인한 버전(SCRIPT_RUNNER_HOOK_VERSIONS)의
+    실행 스레드에서만 붙고, 그 외에는 실행 횟수만 셉니다.
+    """
+    thread = threading.current_thread()
+    if thread.name != SCRIPT_RUNNER_THREAD_NAME or not _script_runner_hook_enabled():
+        return None
+    runner = getattr(getattr(thread, "_target", None), "__self__", None)
+    return runner if hasattr(getattr(runner, "on_event", None), "connect") else None
+
+
+def track_page(page):
+    """
+    페이지 스크립트 실행 한 번을 기록하는 함수 (페이지 맨 위에서 호출)
+
+    실행 횟수와 초당 실행 수를 세고, 실행이 끝날 때(끝까지 실행, st.rerun/st.stop,
+    페이지 이동) 걸린 시간을 page, outcome 레이블로 기록합니다. 처음 호출될 때
+    설정에 따라 지표 내보내기를 시작합니다.
+
+    Parameters:
+    page (str): 페이지 이름 (app, exam, review, results)
+    """
+    start_exporter()
+    SCRIPT_RUNS.inc(page=page)
+    _script_run_rate.add()
+
+    global _script_runner_hook
+    runner = _current_script_runner()
+    if runner is None:
+        return
+    timer = _run_timers.get(runner)
+    if timer is None:
+        with _run_timers_lock:
+            timer = _run_timers.get(runner)
+            if timer is None:
+                timer = _RunTimer()
+                try:
+                    runner.on_event.connect(timer.on_event, weak=False)
+                except Exception:  # 확인한 버전이라도 내부 구조가 다르면 시간 기록을 끔
+                    logger.warning("스크립트 실행기에 붙지 못해 실행 시간을 기록하지 않습니다.", exc_info=True)
+                    _script_runner_hook = False
+                    return
+                _run_timers[runner] = timer
+    if timer.started is None:
+        # 구독하기 전에 시작된 첫 실행은 여기서부터 잼
+        timer.started = time.perf_counter()
+    timer.page = page
+
+
+def exam_active(attempt_id):
+    """모의고사가 진행 중임을 표시하는 함수 (문제를 보여줄 때마다 호출)"""
+    _active_exams.touch(attempt_id)
+
+
+def exam_finished(attempt_id):
+    """모의고사가 끝났음을 표시하는 함수"""
+    _active_exams.finish(attempt_id)
+
+
+def _serve_metrics(port):
+    """로컬 포트에서 /metrics 요청에 OpenMetrics 텍스트로 응답하는 HTTP 서버를 띄우는 함수"""
+    # 포트로 내보낼 때만 필요하므로 여기서 import (페이지 첫 실행 시간에 포함되지 않게)
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 수집기가 주기적으로 요청하므로 접속 기록은 남기지 않음
+            pass
+
+    server = ThreadingHTTPServer((METRICS_HOST, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+
+
+def write_metrics_file(path):
+    """현재 지표를 OpenMetrics 텍스트 파일로 저장하는 함수 (임시 파일에 쓴 뒤 교체)"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(temp_path, path)
+
+
+def _file_writer(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_metrics_file(path)
+        except OSError:
+            logger.exception("지표 파일을 저장하지 못했습니다: %s", path)
+
+
+_exporter_lock = threading.Lock()
+_exporter_started = False
+
+
+def start_exporter(port=None, path=None):
+    """
+    지표 내보내기를 시작하는 함수 (프로세스당 한 번만, 이후 호출은 무시)
+
+    Parameters:
+    port (int): 지표를 제공할 로컬 포트 (없으면 ANATOMY_ACE_METRICS_PORT)
+    path (str): 지표를 저장할 파일 (없으면 ANATOMY_ACE_METRICS_FILE)
+    """
+    global _exporter_started
+    if _exporter_started:
+        return
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+        port = port or os.environ.get(METRICS_PORT_ENV)
+        path = path or os.environ.get(METRICS_FILE_ENV)
+        if port:
+            try:
+                _serve_metrics(int(port))
+            except OSError:
+                # 같은 포트를 이미 다른 서버 프로세스가 쓰는 경우
+                logger.exception("지표 포트를 열 수 없습니다: %s", port)
+        if path:
+            threading.Thread(target=_file_writer, args=(path, METRICS_FILE_INTERVAL),
+                             name="metrics-file", daemon=True).start()
+            atexit.register(write_metrics_file, path)
@@ -0,0 +1,402 @@
+import hashlib
+import os
+import pickle
+import threading
+
+import streamlit as st
+
+from utils.images import add_image_columns
+from utils.metrics import BANK_LOAD_SECONDS
+from utils.scoring import compile_keywords
+
+# pandas는 문제 은행을 실제로 읽을 때만 불러옴 (홈 화면 등 문제 데이터가 필요 없는 페이지의
+# 첫 실행을 가볍게 하기 위해 이 모듈의 함수 안에서 import)
+
+# 기본 문제 은행 경로
+QUESTIONS_PATH = "data/questions.csv"
+
+# 미리 정리/타입 변환해둔 바이너리 문제 은행 (extract_keywords.py가 CSV 옆에 생성)
+#   파일 안에 머리(형식, 버전, 원본 CSV 해시)와 문제 데이터를 차례로 pickle해서 머리만 따로 읽을 수 있음
+ARTIFACT_FORMAT = "anatomy-ace-question-bank"
+ARTIFACT_VERSION = 2
+
+# 아티팩트에 반드시 있어야 하는 열과 타입 (None이면 타입 검사 안 함)
+ARTIFACT_COLUMNS = {
+    "ID": "int64",
+    "Question": None,
+    "Type": None,
+    "Answer": None,
+    "Time_lmit": "int64",
+    "Points": "int64",
+    "Year": "int64",
+    "KeywordList": "object",
+}
+
+
+class ArtifactError(ValueError):
+    """바이너리 문제 은행 파일이 손상되었거나 형식/버전이 맞지 않을 때 발생하는 예외"""
+
+
+def clean_questions(questions):
+    """
+    원본 문제 데이터를 정리하고 타입을 맞추는 함수
+
+    Parameters:
+    questions (DataFrame): CSV에서 읽은 원본 문제 데이터
+
+    Returns:
+    DataFrame: 정리된 문제 데이터 (0부터 시작하는 인덱스)
+    """
+    # 엑셀에서 넘어온 빈 열(Unnamed: 7 ...) 제거
+    questions = questions.loc[:, ~questions.columns.str.startswith("Unnamed")]
+
+    # NaN 값 처리 및 유효한 문제만 필터링
+    questions = questions.dropna(subset=['Question', 'Answer'])  # 문제나 답이 없는 행 제거
+
+    # 데이터 타입 변환 - 오류 방지
+    questions = questions.assign(
+        ID=questions['ID'].astype(int),
+        Time_lmit=questions['Time_lmit'].fillna(240).astype(int),  # NaN 값은 240으로 대체
+        Points=questions['Points'].fillna(3).astype(int),  # NaN 값은 3으로 대체
+        Year=questions['Year'].fillna(0).astype(int),  # NaN 값은 0으로 대체
+    )
+
+    return questions.reset_index(drop=True)
+
+
+def _compile_keywords_column(questions, synonyms=None):
+    """
+    모든 문제의 채점 기준을 컴파일하는 함수 (채점에 필요한 열만 꺼내서 처리)
+
+    synonyms가 켜져 있으면(None이면 SYNONYM_MATCHING 설정) 동의어 검색기와 정규화한
+    정답도 여기서 한 번만 만듭니다.
+    """
+    columns = [c for c in ("Answer", "Keywords", "KeywordList") if c in questions.columns]
+    rows = zip(*(questions[c].tolist() for c in columns))
+    return [compile_keywords(dict(zip(columns, values)), synonyms) for values in rows]
+
+
+def artifact_path_for(csv_path):
+    """CSV 문제 은행에 대응하는 바이너리 파일 경로 (data/questions.csv -> data/questions.pkl)"""
+    return os.path.splitext(csv_path)[0] + ".pkl"
+
+
+def _validate_artifact_questions(questions):
+    """아티팩트에 들어 있는 문제 데이터의 열과 타입을 확인하는 함수"""
+    import pandas as pd
+
+    if not isinstance(questions, pd.DataFrame):
+        raise ArtifactError("문제 데이터가 DataFrame이 아닙니다.")
+    for column, dtype in ARTIFACT_COLUMNS.items():
+        if column not in questions.columns:
+            raise ArtifactError(f"'{column}' 열이 없습니다.")
+        if dtype is not None and str(questions[column].dtype) != dtype:
+            raise ArtifactError(f"'{column}' 열의 타입이 {questions[column].dtype} 입니다. ({dtype} 필요)")
+    if not questions["ID"].is_unique:
+        raise ArtifactError("문제 ID가 중복됩니다.")
+
+
+def prepare_questions(csv_path):
+    """
+    CSV 문제 은행을 읽어 정리하고 채점 키워드 목록(KeywordList 열)을 붙이는 함수
+    (바이너리 파일을 만들 때 공통으로 사용)
+
+    이미지 열(Image)이 있으면 이미지를 표시 너비별 WebP로 줄여 캐시에 넣고
+    ImageKey, ImageWidths 열도 붙입니다.
+
+    Returns:
+    DataFrame: 정리된 문제 데이터
+    """
+    import pandas as pd
+
+    questions = clean_questions(pd.read_csv(csv_path))
+    questions["KeywordList"] = [compiled.keywords for compiled in _compile_keywords_column(questions, synonyms=False)]
+    add_image_columns(questions, csv_path)
+    _validate_artifact_questions(questions)
+    return questions
+
+
+def build_artifact(csv_path=QUESTIONS_PATH, artifact_path=None):
+    """
+    CSV 문제 은행을 정리/타입 변환해서 바이너리 파일(버전이 붙은 pickle)로 저장하는 함수
+
+    키워드는 채점에 쓰는 목록(KeywordList 열)으로 미리 나눠서 저장합니다.
+
+    Parameters:
+    csv_path (str): 문제 CSV 파일 경로
+    artifact_path (str): 저장할 경로 (없으면 CSV 옆에 .pkl)
+
+    Returns:
+    str: 저장한 파일 경로
+    """
+    if artifact_path is None:
+        artifact_path = artifact_path_for(csv_path)
+
+    questions = prepare_questions(csv_path)
+
+    header = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "source_sha256": _file_digest(csv_path),
+    }
+
+    # 임시 파일에 쓴 뒤 교체해서 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 함
+    temp_path = artifact_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(questions, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, artifact_path)
+    return artifact_path
+
+
+_UNPICKLING_ERRORS = (pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError)
+
+
+def _read_artifact_header(f):
+    """열린 아티팩트 파일에서 머리를 읽고 형식/버전을 확인하는 함수"""
+    try:
+        header = pickle.load(f)
+    except _UNPICKLING_ERRORS as e:
+        raise ArtifactError(f"아티팩트를 읽을 수 없습니다: {e}") from e
+
+    if not isinstance(header, dict) or header.get("format") != ARTIFACT_FORMAT:
+        raise ArtifactError("문제 은행 아티팩트 형식이 아닙니다.")
+    if header.get("version") != ARTIFACT_VERSION:
+        raise ArtifactError(f"지원하지 않는 아티팩트 버전입니다: {header.get('version')}")
+    return header
+
+
+def artifact_source_digest(path):
+    """
+    아티팩트를 만든 원본 CSV의 SHA-256 해시를 읽는 함수 (문제 데이터는 읽지 않음)
+
+    Parameters:
+    path (str): 아티팩트 파일 경로
+
+    Returns:
+    str: 16진수 해시
+    """
+    with open(path, "rb") as f:
+        return _read_artifact_header(f).get("source_sha256")
+
+
+def load_artifact(path, source_sha256=None):
+    """
+    바이너리 문제 은행 파일을 읽고 검증하는 함수
+
+    Parameters:
+    path (str): 아티팩트 파일 경로
+    source_sha256 (str): 원본 CSV의 해시 (주면 아티팩트를 만든 CSV와 다를 때 ArtifactError)
+
+    Returns:
+    DataFrame: 정리된 문제 데이터 (KeywordList 열 포함)
+    """
+    with open(path, "rb") as f:
+        header = _read_artifact_header(f)
+        if source_sha256 is not None and header.get("source_sha256") != source_sha256:
+            raise ArtifactError("아티팩트가 현재 CSV 문제 은행으로 만든 것이 아닙니다.")
+        try:
+            questions = pickle.load(f)
+        except _UNPICKLING_ERRORS as e:
+            raise ArtifactError(f"아티팩트를 읽을 수 없습니다: {e}") from e
+
+    _validate_artifact_questions(questions)
+    return questions
+
+
+# (CSV 경로, 파생 파일 경로) -> ((두 파일의 mtime/크기), 현재 CSV로 만든 파일인지)
+#   파일이 바뀌지 않았으면 해시를 다시 계산하지 않음
+_source_checks = {}
+
+
+def is_built_from(csv_path, derived_path, read_digest):
+    """
+    CSV에서 만든 파일(.pkl 아티팩트, .qdb 저장소, 통계 스냅숏)이 현재 CSV 내용으로 만든 것인지 확인하는 함수
+
+    파일에 기록된 원본 CSV 해시를 현재 CSV 내용의 해시와 비교하므로, mtime이 오래된
+    CSV로 되돌리거나(git checkout, 복사) 파일만 새로 만져도 정확히 판단합니다. 해시는
+    두 파일의 mtime이나 크기가 바뀌었을 때만 다시 확인합니다.
+
+    Parameters:
+    csv_path (str): 문제 CSV 파일 경로
+    derived_path (str): CSV에서 만든 파일 경로
+    read_digest (callable): 파일 경로 -> 파일에 기록된 원본 CSV 해시 (16진수)
+
+    Returns:
+    bool: 두 파일이 있고 해시가 같으면 True (파일이 없거나 읽을 수 없으면 False)
+    """
+    try:
+        csv_stat = os.stat(csv_path)
+        derived_stat = os.stat(derived_path)
+    except FileNotFoundError:
+        return False
+
+    key = (csv_stat.st_mtime_ns, csv_stat.st_size, derived_stat.st_mtime_ns, derived_stat.st_size)
+    checked = _source_checks.get((csv_path, derived_path))
+    if checked is None or checked[0] != key:
+        try:
+            current = read_digest(derived_path) == _file_digest(csv_path)
+        except (ArtifactError, OSError, ValueError):
+            current = False
+        checked = _source_checks[(csv_path, derived_path)] = (key, current)
+    return checked[1]
+
+
+def preferred_source(csv_path):
+    """
+    실제로 읽을 파일을 고르는 함수
+
+    아티팩트가 현재 CSV로 만든 것이면(is_built_from) 아티팩트를, 아니면(아티팩트가 없거나,
+    손상되었거나, CSV가 바뀐 뒤 다시 만들지 않았으면) CSV를 사용합니다.
+    """
+    artifact_path = artifact_path_for(csv_path)
+    if is_built_from(csv_path, artifact_path, artifact_source_digest):
+        return artifact_path
+    return csv_path
+
+
+def read_question_bank(path=QUESTIONS_PATH, synonyms=None):
+    """
+    문제 은행 파일(CSV 또는 .pkl 아티팩트)을 읽어 정리된 문제 데이터를 반환하는 함수 (캐시 없음)
+
+    Parameters:
+    path (str): 문제 CSV 파일 또는 아티팩트 경로
+    synonyms (bool): 동의어 채점용 데이터도 미리 만들지 (None이면 SYNONYM_MATCHING 설정을 따름)
+
+    Returns:
+    DataFrame: 정리된 문제 데이터 (Matcher 열에 컴파일된 채점 기준 포함)
+    """
+    source = "artifact" if path.endswith(".pkl") else "csv"
+    with BANK_LOAD_SECONDS.time(source=source):
+        if source == "artifact":
+            questions = load_artifact(path)
+        else:
+            import pandas as pd
+
+            questions = add_image_columns(clean_questions(pd.read_csv(path)), path)
+
+        # 채점 키워드는 문제 은행을 읽을 때 한 번만 컴파일
+        questions["Matcher"] = _compile_keywords_column(questions, synonyms)
+    return questions
+
+
+def _file_digest(path):
+    """파일 내용의 SHA-256 해시를 계산하는 함수"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class QuestionBank:
+    """
+    한 버전의 문제 은행 (모든 세션이 공유하므로 읽기 전용으로만 사용)
+
+    Attributes:
+    questions (DataFrame): 정리된 문제 데이터
+    version (str): 원본 파일 내용의 해시
+    path (str): 원본 파일 경로
+    """
+
+    def __init__(self, questions, version, path):
+        self.questions = questions
+        self.version = version
+        self.path = path
+        # 문제 ID -> 행 위치
+        self._positions = {qid: i for i, qid in enumerate(questions['ID'].tolist())}
+
+    def __len__(self):
+        return len(self.questions)
+
+    def ids(self):
+        """파일 순서대로 모든 문제 ID 목록"""
+        return self.questions['ID'].tolist()
+
+    def get_question(self, question_id):
+        """
+        문제 ID로 문제 한 개를 가져오는 함수
+
+        Parameters:
+        question_id (int): 문제 ID
+
+        Returns:
+        Series: 문제 데이터 (없는 ID면 None)
+        """
+        position = self._positions.get(int(question_id))
+        if position is None:
+            return None
+        return self.questions.iloc[position]
+
+    def get_questions(self, question_ids):
+        """
+        문제 ID 목록 순서대로 문제들을 가져오는 함수 (없는 ID는 건너뜀)
+
+        Parameters:
+        question_ids (list): 문제 ID 목록
+
+        Returns:
+        DataFrame: 문제 데이터
+        """
+        positions = [self._positions[int(qid)] for qid in question_ids if int(qid) in self._positions]
+        return self.questions.iloc[positions]
+
+
+class _BankHolder:
+    """파일 변경(mtime, 내용 해시)을 감지해서 문제 은행을 교체하는 보관소"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._bank = None
+
+    def get(self):
+        source = preferred_source(self.path)
+        stamp = (source, os.stat(source).st_mtime_ns)
+        bank = self._bank
+        if bank is not None and stamp == self._stamp:
+            return bank
+
+        with self._lock:
+            # 다른 스레드가 먼저 갱신했을 수 있으므로 다시 확인
+            if self._bank is not None and stamp == self._stamp:
+                return self._bank
+
+            digest = _file_digest(source)
+            if self._bank is None or digest != self._bank.version:
+                try:
+                    questions = read_question_bank(source)
+                except ArtifactError:
+                    # 아티팩트가 손상되었거나 버전이 다르면 CSV를 직접 읽음
+                    source = self.path
+                    digest = _file_digest(source)
+                    questions = read_question_bank(source)
+                # 새 버전을 완전히 만든 뒤 참조만 바꿔서 읽는 쪽은 항상 온전한 버전을 봄
+                self._bank = QuestionBank(questions, digest, source)
+            self._stamp = stamp
+            return self._bank
+
+
+@st.cache_resource(show_spinner=False)
+def _bank_holder(path):
+    # 서버 프로세스당 하나만 만들어짐
+    return _BankHolder(path)
+
+
+def load_question_bank(path=QUESTIONS_PATH):
+    """
+    프로세스 전체가 공유하는 문제 은행을 가져오는 함수
+
+    현재 CSV로 만든 바이너리 아티팩트(.pkl)가 있으면 그것을, 없으면 CSV를 읽습니다.
+    파일은 프로세스당 한 번만 읽고, 파일의 mtime이 바뀌었고 내용 해시도
+    달라졌을 때만 다시 읽습니다. 반환된 데이터는 모든 세션이 공유하므로
+    수정하면 안 됩니다.
+
+    Parameters:
+    path (str): 문제 CSV 파일 경로
+
+    Returns:
+    QuestionBank: 현재 버전의 문제 은행
+    """
+    return _bank_holder(path).get()
@@ -0,0 +1,255 @@
+import random
+from array import array
+from bisect import bisect_right
+
+import streamlit as st
+
+from utils.question_bank import QUESTIONS_PATH, load_question_bank
+
+# 색인을 만드는 열 (문제 은행에 있는 열만 사용)
+INDEX_FIELDS = ("Type", "Year", "Category", "Points", "Time_lmit")
+
+# 후보가 뽑을 문제 수의 이 배수 이하이면 후보 전체를 섞어서 뽑음 (그 외에는 무작위 위치 추출)
+SMALL_POOL_FACTOR = 4
+
+# 무작위 위치 추출에서 문제 하나당 최대 시도 횟수 (중복/시간 초과로 버려지는 경우)
+MAX_DRAW_ATTEMPTS = 20
+
+
+class _Pool:
+    """조건에 맞는 칸(cell)들을 이어 붙인 후보 목록 (칸 크기의 누적 합으로 위치를 찾음)"""
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.bounds = []
+        total = 0
+        for _, ids, _ in cells:
+            total += len(ids)
+            self.bounds.append(total)
+        self.total = total
+
+    def at(self, position):
+        """후보 목록의 position번째 (문제 ID, 제한 시간)"""
+        c = bisect_right(self.bounds, position)
+        offset = position - (self.bounds[c - 1] if c else 0)
+        _, ids, times = self.cells[c]
+        return ids[offset], times[offset]
+
+
+class QuestionIndex:
+    """
+    문제 은행의 역색인 (유형/연도/카테고리/배점/제한 시간 -> 문제 ID)
+
+    같은 (유형, 연도, 카테고리, 배점, 제한 시간) 조합의 문제를 한 칸(cell)에 모으고, 값마다 그 값을
+    가진 칸 번호(역색인)를 둡니다. 조건에 맞는 칸은 역색인의 교집합으로 찾으므로
+    값 조합 수에만 비례하고 문제 수와는 무관합니다.
+
+    Attributes:
+    fields (tuple): 색인한 열 (Category 열은 문제 은행에 있을 때만)
+    version (str): 색인을 만든 문제 은행 버전
+    """
+
+    def __init__(self, questions, version=None):
+        self.version = version
+        self.fields = tuple(field for field in INDEX_FIELDS if field in questions.columns)
+
+        cells = {}
+        columns = [questions[field].tolist() for field in self.fields]
+        for qid, time_limit, *key in zip(questions["ID"].tolist(), questions["Time_lmit"].tolist(), *columns):
+            ids, times = cells.setdefault(tuple(key), ([], []))
+            ids.append(int(qid))
+            times.append(int(time_limit))
+        self._cells = [(key, array("q", ids), array("q", times)) for key, (ids, times) in cells.items()]
+
+        # 열 -> 값 -> 칸 번호 집합
+        self._postings = {field: {} for field in self.fields}
+        for position, (key, _, _) in enumerate(self._cells):
+            for field, value in zip(self.fields, key):
+                self._postings[field].setdefault(value, set()).add(position)
+
+    def __len__(self):
+        return sum(len(ids) for _, ids, _ in self._cells)
+
+    def values(self, field):
+        """열의 값 목록 (정렬됨, 색인하지 않은 열이면 빈 목록)"""
+        return sorted(self._postings.get(field, ()))
+
+    def _cell_positions(self, filters):
+        """
+        조건에 맞는 칸 번호 집합을 구하는 함수
+
+        filters는 열 -> 허용하는 값 목록이며, 값이 None인 조건은 무시합니다.
+        색인하지 않은 열(예: Category 열이 없는 문제 은행)로 거르면 ValueError를 냅니다
+        (조건 없이 전체에서 뽑히는 것을 막기 위해).
+        """
+        unknown = [field for field, allowed in filters.items() if allowed is not None and field not in self._postings]
+        if unknown:
+            raise ValueError(
+                f"문제 은행에 없는 열로는 거를 수 없습니다: {', '.join(unknown)} "
+                f"(거를 수 있는 열: {', '.join(self.fields)})"
+            )
+
+        positions = set(range(len(self._cells)))
+        for field, allowed in filters.items():
+            if allowed is None:
+                continue
+            matched = set()
+            for value in allowed:
+                matched |= self._postings[field].get(value, set())
+            positions &= matched
+        return positions
+
+    def _pool(self, filters, exclude_types=None):
+        positions = self._cell_positions(filters)
+        type_position = self.fields.index("Type") if "Type" in self.fields else None
+        cells = [
+            self._cells[p] for p in sorted(positions)
+            if not exclude_types or self._cells[p][0][type_position] not in exclude_types
+        ]
+        return _Pool(cells)
+
+    def groups(self, fields, **filters):
+        """
+        조건에 맞는 문제를 fields 값 조합별 후보 목록으로 나누는 함수 (칸 단위로 묶으므로
+        문제 수와 무관)
+
+        Returns:
+        dict: 값 조합(튜플) -> 후보 목록
+        """
+        columns = [self.fields.index(field) for field in fields]
+        grouped = {}
+        for position in sorted(self._cell_positions(filters)):
+            cell = self._cells[position]
+            grouped.setdefault(tuple(cell[0][c] for c in columns), []).append(cell)
+        return {key: _Pool(cells) for key, cells in grouped.items()}
+
+    def count(self, **filters):
+        """조건에 맞는 문제 수"""
+        return self._pool(filters).total
+
+    def sample(self, size, type_ratio=None, time_budget=None, seed=None, **filters):
+        """
+        조건에 맞는 문제를 유형 비율대로 층화 추출해서 시험을 구성하는 함수
+
+        뽑는 데 드는 시간은 시험 문제 수(와 값 조합 수)에 비례하고 문제 은행 크기와는
+        무관합니다. 같은 seed와 조건이면 항상 같은 시험이 만들어집니다.
+
+        Parameters:
+        size (int): 문제 수
+        type_ratio (dict): 유형 -> 비율 (예: {"서술형": 0.7}, 나머지는 다른 유형에서)
+        time_budget (int): 제한 시간 합계의 상한 (초, None이면 제한 없음)
+        seed (int): 난수 시드
+        **filters: 열 -> 허용하는 값 목록 (Type, Year, Category, Points, Time_lmit 중 fields에 있는 열,
+                   없는 열이면 ValueError)
+
+        Returns:
+        list: 문제 ID 목록 (시험 순서)
+        """
+        rng = random.Random(seed)
+        state = {"chosen": set(), "time": 0}
+
+        strata = []
+        if type_ratio:
+            for question_type, ratio in type_ratio.items():
+                strata.append((ratio, self._pool(dict(filters, Type=[question_type]))))
+            rest = 1.0 - sum(type_ratio.values())
+            if rest > 1e-9:
+                strata.append((rest, self._pool(filters, exclude_types=set(type_ratio))))
+        else:
+            strata.append((1.0, self._pool(filters)))
+
+        picked = []
+        for (_, pool), quota in zip(strata, _quotas([ratio for ratio, _ in strata], size)):
+            picked.extend(draw(pool, quota, rng, state, time_budget))
+
+        # 어떤 유형의 후보가 모자라면 나머지는 조건에 맞는 아무 문제로 채움
+        if len(picked) < size:
+            picked.extend(draw(self._pool(filters), size - len(picked), rng, state, time_budget))
+
+        rng.shuffle(picked)
+        return picked
+
+
+def _quotas(ratios, size):
+    """비율을 합이 size인 정수 문제 수로 나누는 함수 (최대 나머지 방식)"""
+    total = sum(ratios)
+    if total <= 0:
+        return [0] * len(ratios)
+    exact = [size * ratio / total for ratio in ratios]
+    quotas = [int(x) for x in exact]
+    by_remainder = sorted(range(len(ratios)), key=lambda i: exact[i] - quotas[i], reverse=True)
+    for i in by_remainder[:size - sum(quotas)]:
+        quotas[i] += 1
+    return quotas
+
+
+def draw(pool, count, rng, state, time_budget=None):
+    """
+    후보 목록에서 아직 뽑지 않은 문제를 count개까지 무작위로 뽑는 함수
+
+    state의 chosen(뽑은 ID)과 time(제한 시간 합계)을 갱신하며, time_budget을 넘기는
+    문제는 건너뜁니다. 같은 state로 여러 후보 목록에서 뽑으면 중복 없이 뽑힙니다.
+
+    Parameters:
+    pool: QuestionIndex의 후보 목록 (total, at(position))
+    count (int): 뽑을 문제 수
+    rng (Random): 난수 생성기
+    state (dict): {"chosen": 뽑은 문제 ID 집합, "time": 제한 시간 합계}
+    time_budget (int): 제한 시간 합계 상한 (None이면 제한 없음)
+
+    Returns:
+    list: 뽑은 문제 ID 목록 (후보가 모자라면 count개보다 적음)
+    """
+    if count <= 0 or pool.total == 0:
+        return []
+
+    def accept(qid, time_limit):
+        if qid in state["chosen"]:
+            return False
+        if time_budget is not None and state["time"] + time_limit > time_budget:
+            return False
+        state["chosen"].add(qid)
+        state["time"] += time_limit
+        return True
+
+    picked = []
+    if pool.total <= SMALL_POOL_FACTOR * count:
+        # 후보가 적으면 전부 섞어서 앞에서부터
+        positions = list(range(pool.total))
+        rng.shuffle(positions)
+        for position in positions:
+            qid, time_limit = pool.at(position)
+            if accept(qid, time_limit):
+                picked.append(qid)
+                if len(picked) == count:
+                    break
+        return picked
+
+    # 후보가 많으면 무작위 위치를 골라서 (대부분 한 번에 성공)
+    attempts = MAX_DRAW_ATTEMPTS * count
+    while len(picked) < count and attempts > 0:
+        attempts -= 1
+        qid, time_limit = pool.at(rng.randrange(pool.total))
+        if accept(qid, time_limit):
+            picked.append(qid)
+    return picked
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _index_for_version(version, _bank):
+    # 문제 은행 버전마다 한 번만 만들어짐 (_bank는 캐시 키에서 제외)
+    return QuestionIndex(_bank.questions, version)
+
+
+def get_question_index(path=QUESTIONS_PATH):
+    """
+    현재 문제 은행 버전의 역색인을 가져오는 함수 (시험을 시작할 때 파일을 읽지 않음)
+
+    Parameters:
+    path (str): 문제 CSV 파일 경로
+
+    Returns:
+    QuestionIndex: 역색인
+    """
+    bank = load_question_bank(path)
+    return _index_for_version(bank.version, bank)
@@ -0,0 +1,316 @@
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+
+import streamlit as st
+
+from utils.question_bank import (
+    QUESTIONS_PATH,
+    ArtifactError,
+    _file_digest,
+    is_built_from,
+    load_question_bank,
+    prepare_questions,
+)
+from utils.metrics import BANK_LOAD_SECONDS
+from utils.scoring import compile_keywords
+
+logger = logging.getLogger(__name__)
+
+# 메모리 매핑 문제 저장소 파일 형식
+#   헤더 | ID 오프셋 색인 | (정렬 색인이면) 정렬된 ID 목록 | 파일 순서 ID 목록 | 문제 레코드(JSON)
+#   직접 색인: ID - min_id 번째 칸 (칸마다 고정 길이)
+#   정렬 색인: ID가 듬성듬성한 은행용, ID 순서의 칸을 정렬된 ID 목록에서 이진 탐색으로 찾음
+STORE_MAGIC = b"AAQSTORE"
+STORE_VERSION = 2
+
+# magic, 버전, 원본 CSV SHA-256, 최소 ID, 색인 칸 수, 문제 수, 정렬 색인 여부
+HEADER = struct.Struct("<8sI32sqqqI")
+
+# 색인 칸: 레코드 시작 위치, 길이 (길이가 0이면 없는 ID)
+INDEX_ENTRY = struct.Struct("<QI")
+
+# ID가 너무 듬성듬성하면 직접 색인이 커지므로 정렬 색인을 씀 (문제 수 대비 최대 칸 수 배율)
+MAX_INDEX_SPARSITY = 4
+
+
+
+def store_path_for(csv_path):
+    """CSV 문제 은행에 대응하는 메모리 매핑 파일 경로 (data/questions.csv -> data/questions.qdb)"""
+    return os.path.splitext(csv_path)[0] + ".qdb"
+
+
+def _json_value(value):
+    """레코드에 넣을 수 있는 값으로 바꾸는 함수 (NaN은 null, 튜플은 목록)"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def build_question_store(csv_path=QUESTIONS_PATH, store_path=None):
+    """
+    CSV 문제 은행을 메모리 매핑용 파일로 저장하는 함수
+
+    문제마다 한 줄의 JSON 레코드로 저장하고, 앞쪽에 ID로 바로 찾을 수 있는 고정 길이
+    오프셋 색인을 둡니다. ID 범위가 문제 수에 비해 너무 넓으면 ID 순서로 정렬한
+    색인과 ID 목록을 두고 이진 탐색으로 찾습니다.
+
+    Parameters:
+    csv_path (str): 문제 CSV 파일 경로
+    store_path (str): 저장할 경로 (없으면 CSV 옆에 .qdb)
+
+    Returns:
+    str: 저장한 파일 경로
+    """
+    if store_path is None:
+        store_path = store_path_for(csv_path)
+
+    questions = prepare_questions(csv_path)
+    ids = questions["ID"].tolist()
+    min_id = min(ids) if ids else 0
+    slot_count = (max(ids) - min_id + 1) if ids else 0
+    sorted_index = slot_count > MAX_INDEX_SPARSITY * len(ids) + 1024
+    if sorted_index:
+        sorted_ids = sorted(ids)
+        slots = {qid: slot for slot, qid in enumerate(sorted_ids)}
+        slot_count = len(ids)
+    else:
+        sorted_ids = []
+        slots = {qid: qid - min_id for qid in ids}
+
+    columns = list(questions.columns)
+    records = [
+        json.dumps(dict(zip(columns, map(_json_value, row))), ensure_ascii=False).encode("utf-8")
+        for row in zip(*(questions[c].tolist() for c in columns))
+    ]
+
+    index = bytearray(INDEX_ENTRY.size * slot_count)
+    offset = HEADER.size + len(index) + 8 * len(sorted_ids) + 8 * len(ids)
+    for qid, record in zip(ids, records):
+        INDEX_ENTRY.pack_into(index, INDEX_ENTRY.size * slots[qid], offset, len(record))
+        offset += len(record)
+
+    header = HEADER.pack(STORE_MAGIC, STORE_VERSION, bytes.fromhex(_file_digest(csv_path)),
+                         min_id, slot_count, len(ids), int(sorted_index))
+
+    # 임시 파일에 쓴 뒤 교체 (이미 매핑해서 읽고 있는 프로세스는 이전 파일을 계속 봄)
+    temp_path = store_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(index)
+        f.write(array("q", sorted_ids).tobytes())
+        f.write(array("q", ids).tobytes())
+        for record in records:
+            f.write(record)
+    os.replace(temp_path, store_path)
+    return store_path
+
+
+def store_source_digest(path):
+    """
+    저장소 파일 헤더에 기록된 원본 CSV의 SHA-256 해시를 읽는 함수 (헤더만 읽음)
+
+    Parameters:
+    path (str): 저장소 파일 경로
+
+    Returns:
+    str: 16진수 해시
+    """
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ArtifactError("문제 저장소 파일이 손상되었습니다.")
+    magic, version, digest, *_ = HEADER.unpack(data)
+    if magic != STORE_MAGIC or version != STORE_VERSION:
+        raise ArtifactError("지원하지 않는 문제 저장소 파일입니다.")
+    return digest.hex()
+
+
+class MappedQuestionStore:
+    """
+    메모리 매핑 파일에서 필요한 문제만 읽는 문제 저장소 (QuestionBank와 같은 조회 방법 제공)
+
+    문제 전체를 DataFrame으로 올리지 않고, ID로 색인 칸을 바로 찾아 그 문제의
+    레코드만 읽습니다. 파일 내용은 운영체제 페이지 캐시를 통해 여러 프로세스가
+    공유합니다.
+
+    Attributes:
+    version (str): 원본 CSV 내용의 해시
+    path (str): 저장소 파일 경로
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # 빈 파일
+                raise ArtifactError(f"문제 저장소 파일을 읽을 수 없습니다: {e}") from e
+
+        if len(self._map) < HEADER.size:
+            raise ArtifactError("문제 저장소 파일이 손상되었습니다.")
+        magic, version, digest, self._min_id, self._slot_count, self._count, sorted_index = \
+            HEADER.unpack_from(self._map)
+        if magic != STORE_MAGIC:
+            raise ArtifactError("문제 저장소 파일 형식이 아닙니다.")
+        if version != STORE_VERSION:
+            raise ArtifactError(f"지원하지 않는 문제 저장소 버전입니다: {version}")
+        self.version = digest.hex()
+        self._ids_offset = HEADER.size + INDEX_ENTRY.size * self._slot_count
+        self._sorted_ids = None
+        if sorted_index:
+            # 정렬된 ID 목록은 복사하지 않고 매핑된 파일을 그대로 봄
+            self._sorted_ids = memoryview(self._map)[self._ids_offset:self._ids_offset + 8 * self._count].cast("q")
+            self._ids_offset += 8 * self._count
+        # 채점 기준은 문제 수만큼 보관 (은행이 커도 한 번 컴파일한 문제는 다시 컴파일하지 않음)
+        self._matcher = lru_cache(maxsize=max(1, self._count))(self._compile_matcher)
+
+    def __len__(self):
+        return self._count
+
+    def ids(self):
+        """파일 순서대로 모든 문제 ID 목록"""
+        ids = array("q")
+        ids.frombytes(self._map[self._ids_offset:self._ids_offset + 8 * self._count])
+        return ids.tolist()
+
+    def _read_record(self, question_id):
+        """문제 ID의 레코드를 dict로 읽는 함수 (없는 ID면 None)"""
+        question_id = int(question_id)
+        if self._sorted_ids is None:
+            slot = question_id - self._min_id
+        else:
+            slot = bisect_left(self._sorted_ids, question_id)
+            if slot < self._count and self._sorted_ids[slot] != question_id:
+                return None
+        if not 0 <= slot < self._slot_count:
+            return None
+        offset, length = INDEX_ENTRY.unpack_from(self._map, HEADER.size + INDEX_ENTRY.size * slot)
+        if length == 0:
+            return None
+        record = json.loads(self._map[offset:offset + length])
+        record["KeywordList"] = tuple(record["KeywordList"])
+        return record
+
+    def _compile_matcher(self, question_id):
+        return compile_keywords(self._read_record(question_id))
+
+    def _row(self, question_id):
+        record = self._read_record(question_id)
+        if record is not None:
+            # 채점 기준은 문제마다 한 번만 컴파일해서 재사용
+            record["Matcher"] = self._matcher(record["ID"])
+        return record
+
+    def get_question(self, question_id):
+        """
+        문제 ID로 문제 한 개를 가져오는 함수
+
+        Parameters:
+        question_id (int): 문제 ID
+
+        Returns:
+        Series: 문제 데이터 (없는 ID면 None)
+        """
+        import pandas as pd
+
+        record = self._row(question_id)
+        return None if record is None else pd.Series(record)
+
+    def get_questions(self, question_ids):
+        """
+        문제 ID 목록 순서대로 문제들을 가져오는 함수 (없는 ID는 건너뜀)
+
+        Parameters:
+        question_ids (list): 문제 ID 목록
+
+        Returns:
+        DataFrame: 문제 데이터
+        """
+        import pandas as pd
+
+        records = [record for record in map(self._row, question_ids) if record is not None]
+        return pd.DataFrame.from_records(records, columns=self._columns(records))
+
+    def _columns(self, records):
+        if records:
+            return list(records[0])
+        first = self._row(self.ids()[0]) if self._count else {}
+        return list(first or {})
+
+
+class _StoreHolder:
+    """저장소 파일이 교체되면(mtime 변경) 새로 매핑하는 보관소"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._store = None
+
+    def get(self):
+        stamp = os.stat(self.path).st_mtime_ns
+        store = self._store
+        if store is not None and stamp == self._stamp:
+            return store
+
+        with self._lock:
+            if self._store is None or stamp != self._stamp:
+                # 이전 매핑은 아직 쓰고 있는 곳이 없어지면 닫힘
+                with BANK_LOAD_SECONDS.time(source="qdb"):
+                    self._store = MappedQuestionStore(self.path)
+                self._stamp = stamp
+            return self._store
+
+
+@st.cache_resource(show_spinner=False)
+def _store_holder(path):
+    # 서버 프로세스당 하나만 만들어짐
+    return _StoreHolder(path)
+
+
+def load_question_store(path=QUESTIONS_PATH):
+    """
+    문제 ID로 필요한 문제만 읽는 저장소를 가져오는 함수
+
+    메모리 매핑 파일(.qdb)이 있으면 그것을 사용합니다. 헤더에 기록된 원본 CSV 해시가
+    현재 CSV와 다르면(CSV가 바뀐 뒤 다시 만들지 않았으면) 먼저 다시 만듭니다. 파일이
+    없거나 읽거나 만들 수 없으면 load_question_bank()의 공유 문제 은행을 반환합니다.
+    두 경우 모두 ids(), get_question(), get_questions()로 같은 방법으로 조회할 수 있습니다.
+
+    Parameters:
+    path (str): 문제 CSV 파일 경로
+
+    Returns:
+    MappedQuestionStore 또는 QuestionBank
+    """
+    store_path = store_path_for(path)
+    if not os.path.exists(store_path):
+        return load_question_bank(path)
+    try:
+        if not is_built_from(path, store_path, store_source_digest):
+            _rebuild_store(path, store_path)
+        return _store_holder(store_path).get()
+    except (OSError, ArtifactError) as e:
+        logger.warning("문제 저장소를 쓰지 못해 문제 은행을 직접 읽습니다: %s (%s)", store_path, e)
+    return load_question_bank(path)
+
+
+_rebuild_lock = threading.Lock()
+
+
+def _rebuild_store(csv_path, store_path):
+    """현재 CSV와 다른 저장소 파일을 다시 만드는 함수 (여러 세션이 동시에 요청해도 한 번만 만듦)"""
+    with _rebuild_lock:
+        if not is_built_from(csv_path, store_path, store_source_digest):
+            logger.info("문제 저장소가 현재 CSV와 달라 다시 만듭니다: %s", store_path)
+            build_question_store(csv_path, store_path)
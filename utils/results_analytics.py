@@ -0,0 +1,130 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# 배점 구간 (구간 오른쪽 끝 포함)
+POINT_BANDS = [0, 1, 3, 5, np.inf]
+POINT_BAND_LABELS = ["1점", "2~3점", "4~5점", "6점 이상"]
+
+# 문제별 결과에 붙이는 문제 정보 열
+QUESTION_COLUMNS = ["ID", "Question", "Answer", "Type", "Year", "Points"]
+
+
+def attempt_fingerprint(store, attempt_id, bank_version):
+    """
+    응시 기록 하나의 지문 (답변이 추가되거나 문제 은행이 바뀌면 달라짐)
+
+    답변 기록 전체를 읽지 않고 저장소의 개수/마지막 제출 시각만 확인합니다.
+    """
+    count, last_submitted = store.result_stamp(attempt_id)
+    key = f"{attempt_id}:{count}:{last_submitted}:{bank_version}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def build_attempt_frame(records, bank):
+    """
+    응시 기록의 답변(AnswerRecord 목록)과 문제 정보를 한 번에 열 단위 표로 만드는 함수
+
+    Parameters:
+    records (list): AnswerRecord 목록 (푼 순서)
+    bank: 문제 은행 또는 문제 저장소 (get_questions 제공)
+
+    Returns:
+    DataFrame: 답변 하나당 한 행 (문제 은행에서 삭제된 문제는 제외, 푼 순서 유지)
+    """
+    count = len(records)
+    answers = pd.DataFrame({
+        "question_id": np.fromiter((r.question_id for r in records), dtype=np.int64, count=count),
+        "user_answer": [r.user_answer for r in records],
+        "score": np.fromiter((r.score for r in records), dtype=np.int64, count=count),
+        "is_correct": np.fromiter((r.is_correct for r in records), dtype=bool, count=count),
+        "time_used": np.fromiter((r.time_used for r in records), dtype=np.float64, count=count),
+    })
+
+    questions = bank.get_questions(pd.unique(answers["question_id"]).tolist())
+    questions = questions.reindex(columns=QUESTION_COLUMNS)
+    questions = questions.astype({"ID": np.int64, "Points": np.int64}) if len(questions) else questions
+
+    # inner merge는 왼쪽(답변) 순서를 유지
+    frame = answers.merge(questions, left_on="question_id", right_on="ID", how="inner").drop(columns="ID")
+
+    points = frame["Points"].to_numpy()
+    score = frame["score"].to_numpy()
+    frame["credit"] = np.select([score >= points, score > 0], ["만점", "부분 점수"], default="0점")
+    frame["point_band"] = pd.cut(frame["Points"], bins=POINT_BANDS, labels=POINT_BAND_LABELS)
+    return frame
+
+
+def _accuracy_by(frame, column):
+    """열 값별 정답률/득점률/평균 풀이 시간 표"""
+    table = frame.groupby(column, sort=True, observed=True).agg(
+        문제수=("score", "size"),
+        정답수=("is_correct", "sum"),
+        획득점수=("score", "sum"),
+        배점=("Points", "sum"),
+        평균시간_초=("time_used", "mean"),
+    )
+    table["정답률(%)"] = (table["정답수"] / table["문제수"] * 100).round(1)
+    table["득점률(%)"] = (table["획득점수"] / table["배점"].where(table["배점"] > 0) * 100).round(1)
+    table["평균시간_초"] = table["평균시간_초"].round(1)
+    table.index.name = None
+    return table
+
+
+def summarize_attempt(frame):
+    """
+    열 단위 표에서 결과 화면에 필요한 집계를 모두 계산하는 함수
+
+    Returns:
+    dict: totals, by_type, by_year, by_points, credit, time_used, questions, wrong
+    """
+    total_score = int(frame["score"].sum())
+    max_score = int(frame["Points"].sum())
+    time_used = frame["time_used"]
+
+    return {
+        "totals": {
+            "questions": int(len(frame)),
+            "score": total_score,
+            "max_score": max_score,
+            "percentage": (total_score / max_score) * 100 if max_score else 0.0,
+            "correct": int(frame["is_correct"].sum()),
+        },
+        "by_type": _accuracy_by(frame, "Type"),
+        "by_year": _accuracy_by(frame, "Year"),
+        "by_points": _accuracy_by(frame, "point_band"),
+        "credit": frame["credit"].value_counts().reindex(["만점", "부분 점수", "0점"], fill_value=0),
+        "time_used": {
+            "total": round(float(time_used.sum()), 1) if len(frame) else 0.0,
+            "mean": round(float(time_used.mean()), 1) if len(frame) else 0.0,
+            "median": round(float(time_used.median()), 1) if len(frame) else 0.0,
+            "p90": round(float(time_used.quantile(0.9)), 1) if len(frame) else 0.0,
+            "max": round(float(time_used.max()), 1) if len(frame) else 0.0,
+        },
+        "questions": frame[["Question", "Answer", "user_answer", "score", "Points", "is_correct"]],
+        "wrong": frame.loc[~frame["is_correct"], ["Question", "Answer", "user_answer"]],
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_analytics(fingerprint, attempt_id, _store, _bank):
+    # 지문이 같으면 다시 계산하지 않음 (_store, _bank는 캐시 키에서 제외)
+    return summarize_attempt(build_attempt_frame(_store.attempt_results(attempt_id), _bank))
+
+
+def load_attempt_analytics(store, bank, attempt_id):
+    """
+    응시 기록 하나의 결과 집계를 가져오는 함수 (응시 지문별로 한 번만 계산)
+
+    Parameters:
+    store (AttemptStore): 응시 기록 저장소
+    bank: 문제 은행 또는 문제 저장소
+    attempt_id (str): 응시 ID
+
+    Returns:
+    dict: summarize_attempt()의 결과
+    """
+    fingerprint = attempt_fingerprint(store, attempt_id, bank.version)
+    return _cached_analytics(fingerprint, attempt_id, store, bank)
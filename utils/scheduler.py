@@ -0,0 +1,192 @@
+import heapq
+import threading
+import time
+
+import streamlit as st
+
+# SM-2 기본값
+DEFAULT_EASINESS = 2.5
+MIN_EASINESS = 1.3
+
+# 간격 단위 (초)
+DAY = 24 * 60 * 60
+
+# 한 번의 복습 세션에서 꺼내는 최대 문제 수
+REVIEW_SESSION_SIZE = 20
+
+# 프로세스에 보관하는 사용자 복습 일정 수 (넘으면 오래 쓰지 않은 사용자부터 버리고 다음에 저장소에서 다시 읽음)
+SCHEDULER_CACHE_SIZE = 1024
+
+
+def answer_quality(score, points, is_correct=None):
+    """
+    채점 점수를 SM-2 응답 품질(0~5)로 바꾸는 함수
+
+    정답이 아닌 답변(is_correct=False)은 부분 점수가 높아도 2 이하(망각)로 보므로
+    연속 횟수가 초기화되고 바로 다시 복습 대상이 됩니다.
+
+    Parameters:
+    score (int): check_answer가 준 점수
+    points (int): 문제 배점
+    is_correct (bool): check_answer가 준 정답 여부 (None이면 점수로만 정함)
+
+    Returns:
+    int: 0(완전히 틀림) ~ 5(만점)
+    """
+    if points <= 0:
+        return 0
+    quality = max(0, min(5, round(5 * score / points)))
+    if is_correct is not None and not is_correct:
+        quality = min(quality, 2)
+    return quality
+
+
+class ReviewItem:
+    """
+    문제 하나의 간격 반복 상태
+
+    Attributes:
+    question_id (int): 문제 ID
+    easiness (float): SM-2 난이도 계수
+    interval (float): 현재 복습 간격 (일)
+    repetitions (int): 연속으로 맞힌 횟수
+    due_at (float): 다음 복습 시각 (epoch 초)
+    reviewed_at (float): 마지막으로 푼 시각 (epoch 초)
+    """
+
+    __slots__ = ("question_id", "easiness", "interval", "repetitions", "due_at", "reviewed_at")
+
+    def __init__(self, question_id, easiness=DEFAULT_EASINESS, interval=0.0, repetitions=0,
+                 due_at=0.0, reviewed_at=0.0):
+        self.question_id = int(question_id)
+        self.easiness = easiness
+        self.interval = interval
+        self.repetitions = repetitions
+        self.due_at = due_at
+        self.reviewed_at = reviewed_at
+
+    def update(self, quality, now):
+        """
+        SM-2 규칙으로 다음 복습 시각을 정하는 함수
+
+        품질이 3 미만이면(틀렸거나 절반 미만) 연속 횟수를 초기화하고 바로 다시
+        복습 대상이 되며, 다음에 맞히면 1일, 6일, 그 뒤로는 간격 x 난이도 계수로
+        늘어납니다.
+        """
+        if quality < 3:
+            self.repetitions = 0
+            self.interval = 0.0
+        else:
+            if self.repetitions == 0:
+                self.interval = 1.0
+            elif self.repetitions == 1:
+                self.interval = 6.0
+            else:
+                self.interval = self.interval * self.easiness
+            self.repetitions += 1
+
+        self.easiness = max(
+            MIN_EASINESS,
+            self.easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02),
+        )
+        self.due_at = now + self.interval * DAY
+        self.reviewed_at = now
+
+
+class ReviewScheduler:
+    """
+    사용자 한 명의 복습 일정 (다음 복습 시각 기준 우선순위 큐)
+
+    힙에는 (복습 시각, 문제 ID)만 넣고, 문제 상태가 바뀌면 새 항목을 넣은 뒤
+    오래된 항목은 꺼낼 때 버립니다. 따라서 기록과 다음 문제 꺼내기는 문제 수가
+    수만 개여도 O(log n)입니다. store가 있으면 바뀐 상태를 저장소에 기록합니다.
+    같은 사용자의 여러 탭(세션)이 한 객체를 함께 쓰므로 갱신과 조회는 잠금 안에서 합니다.
+    """
+
+    def __init__(self, user_id, items=(), store=None):
+        self.user_id = user_id
+        self._store = store
+        self._lock = threading.Lock()
+        self._items = {item.question_id: item for item in items}
+        self._heap = [(item.due_at, item.question_id) for item in self._items.values()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, question_id):
+        return int(question_id) in self._items
+
+    def get(self, question_id):
+        """문제의 복습 상태를 반환하는 함수 (없으면 None)"""
+        return self._items.get(int(question_id))
+
+    def record(self, question_id, score, points, is_correct=None, now=None):
+        """
+        채점 결과를 반영해서 문제의 다음 복습 시각을 정하는 함수 (정답이 아니면 바로 복습 대상)
+
+        Returns:
+        ReviewItem: 갱신된 복습 상태
+        """
+        now = time.time() if now is None else now
+        question_id = int(question_id)
+        with self._lock:
+            item = self._items.get(question_id)
+            if item is None:
+                item = self._items[question_id] = ReviewItem(question_id)
+
+            item.update(answer_quality(score, points, is_correct), now)
+            heapq.heappush(self._heap, (item.due_at, question_id))
+            if self._store is not None:
+                # 쓰기 스레드 큐에 넣기만 함 (커밋을 기다리지 않음)
+                self._store.save_review_item(self.user_id, item)
+        return item
+
+    def _is_current(self, entry):
+        item = self._items.get(entry[1])
+        return item is not None and item.due_at == entry[0]
+
+    def _discard_stale(self):
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def next_due_at(self):
+        """가장 먼저 복습할 문제의 복습 시각 (문제가 없으면 None)"""
+        with self._lock:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def due(self, now=None, limit=REVIEW_SESSION_SIZE):
+        """
+        지금 복습할 문제 ID를 복습 시각이 이른 순서로 최대 limit개 반환하는 함수
+
+        꺼낸 항목은 다시 힙에 넣으므로 일정은 바뀌지 않습니다 (O(k log n)).
+        """
+        now = time.time() if now is None else now
+        taken = []
+        with self._lock:
+            while len(taken) < limit:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                taken.append(heapq.heappop(self._heap))
+            for entry in taken:
+                heapq.heappush(self._heap, entry)
+        return [question_id for _, question_id in taken]
+
+
+@st.cache_resource(show_spinner=False, max_entries=SCHEDULER_CACHE_SIZE)
+def _user_scheduler(user_id, _store):
+    # 사용자마다 프로세스에서 한 번만 저장소에서 읽음 (_store는 캐시 키에서 제외)
+    return ReviewScheduler(user_id, _store.review_items(user_id), store=_store)
+
+
+def get_user_scheduler(store, user_id):
+    """
+    사용자 복습 일정을 반환하는 함수 (프로세스 전체에서 사용자마다 하나)
+
+    처음 한 번만 저장소에서 읽어서 힙을 만들고, 그 뒤로는 같은 객체를 제자리에서
+    갱신합니다. 같은 사용자가 연 여러 탭(세션)이 한 일정을 함께 쓰므로 서로 결과가
+    바로 보이고, 화면을 그릴 때 저장소를 다시 읽거나 쓰기 커밋을 기다리지 않습니다.
+    """
+    return _user_scheduler(user_id, store)
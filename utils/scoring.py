@@ -1,35 +1,108 @@
-import pandas as pd
+import os
 import re
+import time
+from utils.fuzzy_matcher import FuzzyKeywordMatcher
+from utils.keyword_matcher import KeywordMatcher
+from utils.metrics import CHECK_ANSWER_SECONDS
+from utils.similarity import blend_similarity
+from utils.synonyms import AlternativeMatcher, normalize_text
 
-def check_answer(user_answer, question_data):
+# 번호가 있는 항목 패턴 (예: 1) ... 2) ... 3) ...)
+NUMBERED_ITEM_SPLIT = re.compile(r'\s*\d+\)\s*|\s*\d+\.\s*')
+NUMBERED_ITEM_FIND = re.compile(r'\d+\)\s*|\d+\.\s*')
+
+# 오타 허용 채점 (키워드 길이에 비례한 편집 거리 이내면 포함된 것으로 봄, 기본은 꺼짐)
+#   ANATOMY_ACE_FUZZY_MATCHING=1 로 서버 전체에서 켜거나 check_answer(..., fuzzy=True)로 지정
+FUZZY_MATCHING_ENV = "ANATOMY_ACE_FUZZY_MATCHING"
+FUZZY_MATCHING = os.environ.get(FUZZY_MATCHING_ENV, "") in ("1", "true", "yes")
+
+# 동의어/표기 정규화 채점 (data/synonyms.txt의 대역어, 띄어쓰기/하이픈/괄호 풀이 차이를 인정, 기본은 꺼짐)
+#   ANATOMY_ACE_SYNONYM_MATCHING=1 로 서버 전체에서 켜거나 check_answer(..., synonyms=True)로 지정
+SYNONYM_MATCHING_ENV = "ANATOMY_ACE_SYNONYM_MATCHING"
+SYNONYM_MATCHING = os.environ.get(SYNONYM_MATCHING_ENV, "") in ("1", "true", "yes")
+
+
+class CompiledKeywords:
+    """
+    한 문제의 채점 기준을 미리 계산해둔 객체 (문제 은행을 읽을 때 한 번 생성)
+
+    Attributes:
+    keywords (tuple): 채점 키워드 목록 (중복 포함, 원래 순서)
+    matcher (KeywordMatcher): 키워드 검색기
+    correct_answer (str): 소문자로 바꾸고 앞뒤 공백을 제거한 정답
+    alternatives (AlternativeMatcher): 키워드별 동의어/정규화 표현 검색기 (동의어 채점용으로 만들었을 때만)
+    normalized_answer (str): 정규화한 정답 (normalize_text, 동의어 채점용으로 만들었을 때만)
     """
-    사용자 답변을 채점하는 함수
-    
+
+    __slots__ = ("keywords", "matcher", "correct_answer", "alternatives", "normalized_answer", "_fuzzy_matcher")
+
+    def __init__(self, keywords, correct_answer, synonyms=False):
+        self.keywords = tuple(keywords)
+        self.matcher = KeywordMatcher(self.keywords)
+        self.correct_answer = correct_answer
+        # 동의어 사전은 문제 은행을 읽을 때 키워드에 한 번만 적용 (채점할 때는 답변만 정규화)
+        self.alternatives = AlternativeMatcher(self.keywords) if synonyms else None
+        self.normalized_answer = normalize_text(correct_answer) if synonyms else None
+        self._fuzzy_matcher = None
+
+    @property
+    def fuzzy_matcher(self):
+        """오타 허용 키워드 검색기 (오타 허용 채점을 처음 할 때 만듦)"""
+        if self._fuzzy_matcher is None:
+            self._fuzzy_matcher = FuzzyKeywordMatcher(self.keywords)
+        return self._fuzzy_matcher
+
+    def count_matches(self, user_answer, fuzzy=False, normalized_answer=None, target=None):
+        """
+        답변에 포함된 키워드 수 (키워드 목록의 중복도 각각 셈)
+
+        normalized_answer(정규화한 답변)를 주면 동의어/정규화 표현도 인정하고,
+        fuzzy면 오타를 허용합니다. target을 주면 오타 허용 검색은 그 수만큼 찾았을 때
+        멈추므로 결과는 target 이상이면서 실제 수보다 작을 수 있습니다 (그 이상은
+        점수에 영향이 없을 때 사용).
+        """
+        found = self.matcher.find(user_answer)
+        if normalized_answer is not None and len(found) < len(self.matcher.patterns):
+            found |= self.alternatives.find(normalized_answer)
+        if fuzzy and len(found) < len(self.matcher.patterns) and (target is None or len(found) < target):
+            # 정확히 찾지 못한 키워드만 오타를 허용해서 다시 찾음
+            found = self.fuzzy_matcher.find(user_answer, found, target)
+        return sum(1 for kw in self.keywords if kw in found)
+
+
+def _has_value(value):
+    """pandas.notna와 같음 (pandas는 CSV에서 읽은 키워드가 있을 때만 불러옴)"""
+    import pandas as pd
+    return pd.notna(value)
+
+
+def compile_keywords(question_data, synonyms=None):
+    """
+    문제 데이터에서 채점 키워드를 추출해 미리 컴파일하는 함수
+
     Parameters:
-    user_answer (str): 사용자가 입력한 답변
     question_data (Series): 문제 데이터
-    
+    synonyms (bool): 동의어 채점용 검색기와 정규화한 정답도 만들지 (None이면 SYNONYM_MATCHING 설정을 따름)
+
     Returns:
-    tuple: (정답 여부, 점수)
+    CompiledKeywords: 컴파일된 채점 기준
     """
-    # 빈 답변 처리
-    if not user_answer or user_answer.strip() == "":
-        return False, 0
-    
-    # 소문자 변환 및 공백 제거
-    user_answer = user_answer.lower().strip()
-    
-    # 키워드 목록 가져오기
-    if "Keywords" in question_data and pd.notna(question_data["Keywords"]):
+    correct_answer = str(question_data["Answer"]).lower().strip()
+
+    # 키워드 목록 가져오기 (바이너리 문제 은행에는 미리 나눠둔 목록이 있음)
+    keyword_list = question_data.get("KeywordList")
+    if isinstance(keyword_list, tuple):
+        keywords = list(keyword_list)
+    elif "Keywords" in question_data and _has_value(question_data["Keywords"]):
         keywords = [kw.strip().lower() for kw in question_data["Keywords"].split(";") if kw.strip()]
     else:
         # 키워드가 없는 경우 정답 자체를 키워드로 사용
-        answer = str(question_data["Answer"]).lower().strip()
-        
+        answer = correct_answer
+
         # 번호가 있는 항목으로 나누기 (예: 1) ... 2) ... 3) ...)
-        numbered_items = re.split(r'\s*\d+\)\s*|\s*\d+\.\s*', answer)
+        numbered_items = NUMBERED_ITEM_SPLIT.split(answer)
         numbered_items = [item.strip() for item in numbered_items if item.strip()]
-        
+
         if len(numbered_items) > 1:
             keywords = numbered_items
         else:
@@ -40,92 +113,148 @@ def check_answer(user_answer, question_data):
                 keywords = [kw.strip() for kw in answer.split(",") if kw.strip()]
             else:
                 keywords = [answer]
-    
+
+    if synonyms is None:
+        synonyms = SYNONYM_MATCHING
+    return CompiledKeywords(keywords, correct_answer, synonyms)
+
+
+def get_compiled_keywords(question_data):
+    """문제 은행에서 미리 컴파일한 채점 기준을 가져오고, 없으면 새로 만드는 함수"""
+    compiled = question_data.get("Matcher")
+    if isinstance(compiled, CompiledKeywords):
+        return compiled
+    return compile_keywords(question_data)
+
+
+def check_answer(user_answer, question_data, fuzzy=None, synonyms=None, similarity=None):
+    """
+    사용자 답변을 채점하는 함수 (채점 시간은 문제 유형별 지표로 기록)
+
+    Parameters:
+    user_answer (str): 사용자가 입력한 답변
+    question_data (Series): 문제 데이터
+    fuzzy (bool): 키워드 오타 허용 여부 (None이면 FUZZY_MATCHING 설정을 따름)
+    synonyms (bool): 동의어/표기 정규화 허용 여부 (None이면 SYNONYM_MATCHING 설정을 따름)
+    similarity (float): 서술형 모범 답안과의 코사인 유사도 (SimilarityIndex로 계산, 주면 키워드 비율과 섞음)
+
+    Returns:
+    tuple: (정답 여부, 점수)
+    """
+    if fuzzy is None:
+        fuzzy = FUZZY_MATCHING
+    if synonyms is None:
+        synonyms = SYNONYM_MATCHING
+    started = time.perf_counter()
+    try:
+        return _check_answer(user_answer, question_data, fuzzy, synonyms, similarity)
+    finally:
+        CHECK_ANSWER_SECONDS.observe(time.perf_counter() - started, type=question_data["Type"])
+
+
+def _check_answer(user_answer, question_data, fuzzy, synonyms, similarity=None):
+    """check_answer의 채점 본체"""
+    # 빈 답변 처리
+    if not user_answer or user_answer.strip() == "":
+        return False, 0
+
+    # 소문자 변환 및 공백 제거
+    user_answer = user_answer.lower().strip()
+
+    # 미리 컴파일된 키워드 가져오기
+    compiled = get_compiled_keywords(question_data)
+    keywords = compiled.keywords
+    correct_answer = compiled.correct_answer
+
+    # 문제 은행을 동의어 채점 없이 읽었는데 동의어 채점을 요청한 경우만 이 문제용으로 따로 만듦
+    # (공유하는 채점 기준은 바꾸지 않음, 미리 만들려면 read_question_bank(..., synonyms=True))
+    if synonyms and compiled.alternatives is None:
+        compiled = compile_keywords(question_data, synonyms=True)
+
+    # 동의어 채점이면 답변을 한 번만 정규화해서 정답 비교와 키워드 검색에 같이 씀
+    normalized_answer = normalize_text(user_answer) if synonyms else None
+    if normalized_answer and normalized_answer == compiled.normalized_answer:
+        return True, question_data["Points"]
+
     # 키워드가 없으면 정확한 일치만 인정
     if not keywords:
-        correct_answer = str(question_data["Answer"]).lower().strip()
         is_correct = (user_answer == correct_answer)
         return is_correct, question_data["Points"] if is_correct else 0
-    
+
     # 단답형인 경우
     if question_data["Type"] == "단답형":
-        correct_answer = str(question_data["Answer"]).lower().strip()
-        
         # 정확히 일치하는 경우
         if user_answer == correct_answer:
             return True, question_data["Points"]
-        
+
         # 키워드 매칭 검사
-        matched_keywords = []
-        for kw in keywords:
-            if kw in user_answer:
-                matched_keywords.append(kw)
-        
+        matched_count = compiled.count_matches(user_answer, fuzzy, normalized_answer)
+
         # 모든 키워드가 포함된 경우만 정답으로 인정
-        if len(matched_keywords) == len(keywords):
+        if matched_count == len(keywords):
             return True, question_data["Points"]
-        
+
         # 일부 키워드만 포함된 경우 부분 점수
-        if matched_keywords:
-            ratio = len(matched_keywords) / len(keywords)
+        if matched_count:
+            ratio = matched_count / len(keywords)
             partial_score = round(question_data["Points"] * ratio)
             return False, partial_score
-        
+
         return False, 0
-    
+
     # 서술형인 경우
     elif question_data["Type"] == "서술형":
         # 번호가 있는 항목 확인 (예: 1) ... 2) ... 3) ...)
-        numbered_items_in_answer = re.findall(r'\d+\)\s*|\d+\.\s*', user_answer)
-        
-        # 포함된 키워드 수 계산
-        matched_keywords = []
-        for kw in keywords:
-            if kw in user_answer:
-                matched_keywords.append(kw)
-        
+        numbered_items_in_answer = NUMBERED_ITEM_FIND.findall(user_answer)
+
+        # 포함된 키워드 수 계산 (번호 항목 수로 점수가 제한되면 그 이상은 찾을 필요 없음)
+        target = None
+        if numbered_items_in_answer and len(numbered_items_in_answer) < len(keywords):
+            target = len(numbered_items_in_answer)
+        matched_count = compiled.count_matches(user_answer, fuzzy, normalized_answer, target)
+
         # 키워드 비율 계산
-        keyword_ratio = len(matched_keywords) / len(keywords) if keywords else 0
-        
+        keyword_ratio = matched_count / len(keywords) if keywords else 0
+
         # 번호 항목이 있는 경우, 번호 개수도 확인
         if numbered_items_in_answer and len(numbered_items_in_answer) < len(keywords):
             # 번호 항목이 부족한 경우 더 엄격하게 채점
             max_ratio = min(1.0, len(numbered_items_in_answer) / len(keywords))
             keyword_ratio = min(keyword_ratio, max_ratio)
-        
+
+        # 유사도가 있으면 키워드로 잡히지 않은 바꿔 쓴 표현도 인정 (키워드 비율보다 낮아지지는 않음)
+        if similarity is not None:
+            keyword_ratio = blend_similarity(keyword_ratio, similarity)
+
         # 모든 키워드가 포함되어야만 만점 (100%)
         if keyword_ratio >= 0.99:  # 반올림 오차 고려
             return True, question_data["Points"]
-        
-        # 일부 키워드만 포함되면 부분 점수
-        elif matched_keywords:
+
+        # 일부 키워드만 포함되면 부분 점수 (유사도 없이는 matched_count가 있을 때와 같음)
+        elif keyword_ratio > 0:
             # 키워드 비율에 따라 점수 계산
             partial_score = round(question_data["Points"] * keyword_ratio)
             return False, partial_score
-        
+
         return False, 0
-    
+
     # 기타 유형
     else:
         # 기본적으로 정확히 일치해야 정답
-        correct_answer = str(question_data["Answer"]).lower().strip()
         if user_answer == correct_answer:
             return True, question_data["Points"]
-        
+
         # 키워드 매칭 검사
-        matched_keywords = []
-        for kw in keywords:
-            if kw in user_answer:
-                matched_keywords.append(kw)
-        
+        matched_count = compiled.count_matches(user_answer, fuzzy, normalized_answer)
+
         # 모든 키워드가 포함된 경우만 정답으로 인정
-        if len(matched_keywords) == len(keywords):
+        if matched_count == len(keywords):
             return True, question_data["Points"]
-        
+
         # 일부 키워드만 포함된 경우 부분 점수
-        if matched_keywords:
-            ratio = len(matched_keywords) / len(keywords)
+        if matched_count:
+            ratio = matched_count / len(keywords)
             partial_score = round(question_data["Points"] * ratio)
             return False, partial_score
-        
+
         return False, 0
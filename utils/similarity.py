@@ -0,0 +1,243 @@
+import math
+import os
+import threading
+from collections import Counter
+from itertools import compress, repeat
+
+from utils.synonyms import normalize_text
+
+# numpy는 유사도 채점을 실제로 할 때만 불러옴 (페이지 첫 실행을 가볍게 하기 위해 함수 안에서 import)
+
+# 서술형 유사도 채점 (모범 답안과의 글자 n-gram TF-IDF 코사인 유사도를 키워드 비율과 섞음, 기본은 꺼짐)
+#   ANATOMY_ACE_SIMILARITY_SCORING=1 로 서버 전체에서 켬
+SIMILARITY_SCORING_ENV = "ANATOMY_ACE_SIMILARITY_SCORING"
+SIMILARITY_SCORING = os.environ.get(SIMILARITY_SCORING_ENV, "") in ("1", "true", "yes")
+
+# 글자 n-gram 길이 (정규화한 텍스트 기준, 한글은 2~3글자가 대략 한 단어의 일부/전체)
+NGRAM_SIZES = (2, 3)
+
+# 코사인 유사도 -> 점수 비율 변환 구간 (FLOOR 이하는 0, CEILING 이상은 1, 사이는 선형)
+# (관련 없는 답변도 조사/어미가 겹쳐 0.1~0.2 정도가 나오므로 그 아래는 인정하지 않음)
+SIMILARITY_FLOOR = 0.2
+SIMILARITY_CEILING = 0.8
+
+# 키워드 비율과 섞을 때 유사도 점수의 비중
+SIMILARITY_WEIGHT = 0.5
+
+# 프로세스마다 보관하는 문제 은행 버전별 색인 수
+INDEX_CACHE_SIZE = 2
+
+
+def char_ngrams(text):
+    """
+    텍스트를 정규화(normalize_text)한 뒤 글자 n-gram 목록으로 나누는 함수
+
+    Returns:
+    list: n-gram 목록 (중복 포함)
+    """
+    text = normalize_text(text)
+    return [text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)]
+
+
+def similarity_credit(cosine):
+    """코사인 유사도를 0~1 사이의 점수 비율로 바꾸는 함수"""
+    return min(1.0, max(0.0, (cosine - SIMILARITY_FLOOR) / (SIMILARITY_CEILING - SIMILARITY_FLOOR)))
+
+
+def blend_similarity(keyword_ratio, cosine):
+    """
+    키워드 비율과 유사도 점수를 섞는 함수
+
+    유사도는 키워드로 잡히지 않은 바꿔 쓴 표현을 인정하기 위한 것이므로, 섞은 값이
+    키워드 비율보다 낮으면 키워드 비율을 그대로 씁니다.
+
+    Parameters:
+    keyword_ratio (float): 포함된 키워드 비율 (0~1)
+    cosine (float): 모범 답안과의 코사인 유사도 (0~1)
+
+    Returns:
+    float: 점수 비율 (0~1)
+    """
+    blended = (1 - SIMILARITY_WEIGHT) * keyword_ratio + SIMILARITY_WEIGHT * similarity_credit(cosine)
+    return max(keyword_ratio, blended)
+
+
+class SimilarityIndex:
+    """
+    문제 은행의 모든 모범 답안(Answer)을 글자 n-gram TF-IDF 벡터로 만든 희소 행렬
+
+    행렬은 CSR 형식(data, indices, indptr 배열)으로 저장하며 행마다 L2 정규화되어
+    있으므로, 답변 벡터와의 내적이 곧 코사인 유사도입니다. 여러 답변은 한 번에
+    벡터로 만들고, (문제, 답변) 쌍의 내적을 (쌍 번호, 열) 키의 정렬된 교집합 한 번으로
+    계산합니다. 외부 모델이나 네트워크 없이 numpy만 씁니다.
+
+    Attributes:
+    ids (list): 행 순서의 문제 ID
+    vocabulary (dict): n-gram -> 열 번호
+    idf (ndarray): 열별 IDF
+    data, indices, indptr (ndarray): CSR 행렬
+    """
+
+    __slots__ = ("ids", "vocabulary", "idf", "data", "indices", "indptr", "_rows", "_unknown_idf")
+
+    def __init__(self, ids, answers):
+        """
+        Parameters:
+        ids (list): 문제 ID 목록
+        answers (list): 문제 ID 순서의 모범 답안
+        """
+        import numpy as np
+
+        self.ids = [int(qid) for qid in ids]
+        self._rows = {qid: row for row, qid in enumerate(self.ids)}
+
+        # 문서 빈도로 IDF 계산 (sklearn의 smooth_idf와 같은 식)
+        grams = [char_ngrams(str(answer)) for answer in answers]
+        document_frequency = {}
+        for row_grams in grams:
+            for gram in set(row_grams):
+                document_frequency[gram] = document_frequency.get(gram, 0) + 1
+        self.vocabulary = {gram: column for column, gram in enumerate(document_frequency)}
+        count = len(self.ids)
+        self.idf = np.fromiter(
+            (math.log((1 + count) / (1 + df)) + 1 for df in document_frequency.values()),
+            dtype=np.float64, count=len(document_frequency),
+        )
+        # 은행에 없는 n-gram의 IDF (답변 벡터의 크기에는 들어가지만 내적에는 기여하지 않음)
+        self._unknown_idf = math.log(1 + count) + 1
+
+        self.data, self.indices, self.indptr = self._vectorize(grams)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _vectorize(self, grams_list):
+        """n-gram 목록들을 L2 정규화된 TF-IDF CSR 행렬로 만드는 함수 (은행에 없는 n-gram은 크기에만 반영)"""
+        import numpy as np
+
+        # n-gram -> 열 번호 변환은 C로 구현된 map으로 (은행에 없는 n-gram은 -1)
+        vocabulary_get = self.vocabulary.get
+        width = len(self.vocabulary) + 1
+        count = len(grams_list)
+        columns = []
+        lengths = []
+        unknown = []  # 행별 은행에 없는 n-gram의 가중치 제곱합
+        for grams in grams_list:
+            row_columns = list(map(vocabulary_get, grams, repeat(-1)))
+            columns.extend(row_columns)
+            lengths.append(len(row_columns))
+            missing = Counter(compress(grams, map((-1).__eq__, row_columns))) if -1 in row_columns else {}
+            unknown.append(sum((1 + math.log(tf)) ** 2 for tf in missing.values()) * self._unknown_idf ** 2)
+
+        # 빈도 세기, 가중치 계산, 행 정규화는 전체 배열에서 한 번에
+        # ((행, 열) 키를 np.unique로 세면 CSR 순서대로 정렬된 결과가 나옴)
+        columns = np.asarray(columns, dtype=np.int64)
+        rows = np.repeat(np.arange(count, dtype=np.int64), lengths)
+        known = columns >= 0
+        keys, frequencies = np.unique(rows[known] * width + columns[known], return_counts=True)
+        rows, columns = np.divmod(keys, width)
+        weights = (1 + np.log(frequencies)) * self.idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=count) + np.asarray(unknown))
+        weights /= np.where(norms > 0, norms, 1)[rows]
+        indptr = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=count), out=indptr[1:])
+        return weights, columns, indptr
+
+    def similarities(self, question_ids, texts):
+        """
+        (문제, 답변) 쌍마다 모범 답안과의 코사인 유사도를 한 번에 계산하는 함수
+
+        Parameters:
+        question_ids (list): 문제 ID 목록
+        texts (list): 같은 순서의 답변 목록
+
+        Returns:
+        ndarray: 코사인 유사도 (은행에 없는 문제는 0)
+        """
+        import numpy as np
+
+        pairs = len(texts)
+        query_data, query_indices, query_indptr = self._vectorize([char_ngrams(text) for text in texts])
+        rows = np.fromiter((self._rows.get(int(qid), -1) for qid in question_ids), dtype=np.int64, count=pairs)
+        known = rows >= 0
+
+        # 쌍마다 해당 문제의 행을 모아서 (쌍 번호, 열) 키로 만듦
+        starts = np.where(known, self.indptr[np.maximum(rows, 0)], 0)
+        lengths = np.where(known, self.indptr[np.maximum(rows, 0) + 1] - starts, 0)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        width = len(self.vocabulary) + 1
+        bank_keys = np.repeat(np.arange(pairs), lengths) * width + self.indices[offsets]
+        query_keys = np.repeat(np.arange(pairs), np.diff(query_indptr)) * width + query_indices
+
+        # 행마다 열이 중복 없이 정렬되어 있으므로 키도 중복이 없음
+        _, bank_hits, query_hits = np.intersect1d(bank_keys, query_keys, assume_unique=True, return_indices=True)
+        products = self.data[offsets[bank_hits]] * query_data[query_hits]
+        return np.bincount(query_keys[query_hits] // width, weights=products, minlength=pairs)
+
+    def similarity(self, question_id, text):
+        """답변 하나와 모범 답안의 코사인 유사도"""
+        return float(self.similarities([question_id], [text])[0])
+
+
+def build_similarity_index(bank):
+    """
+    문제 은행(또는 문제 저장소)의 모든 모범 답안으로 유사도 색인을 만드는 함수
+
+    Parameters:
+    bank: QuestionBank 또는 MappedQuestionStore
+
+    Returns:
+    SimilarityIndex: 유사도 색인
+    """
+    questions = bank.get_questions(bank.ids())
+    return SimilarityIndex(questions["ID"].tolist(), questions["Answer"].tolist())
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index(bank):
+    """
+    문제 은행 버전마다 한 번만 만든 유사도 색인을 가져오는 함수 (모든 스레드가 공유)
+
+    Parameters:
+    bank: QuestionBank 또는 MappedQuestionStore (version 속성으로 구분)
+
+    Returns:
+    SimilarityIndex: 유사도 색인
+    """
+    index = _indexes.get(bank.version)
+    if index is not None:
+        return index
+    with _indexes_lock:
+        index = _indexes.get(bank.version)
+        if index is None:
+            index = build_similarity_index(bank)
+            while len(_indexes) >= INDEX_CACHE_SIZE:
+                del _indexes[next(iter(_indexes))]
+            _indexes[bank.version] = index
+        return index
+
+
+def check_answers(user_answers, questions, index):
+    """
+    여러 답변을 한 번에 채점하는 함수 (서술형은 유사도를 한 번의 일괄 계산으로 구해서 섞음)
+
+    Parameters:
+    user_answers (list): 답변 목록
+    questions (list): 같은 순서의 문제 데이터 (Series 또는 dict)
+    index (SimilarityIndex): 유사도 색인
+
+    Returns:
+    list: (정답 여부, 점수) 목록
+    """
+    from utils.scoring import check_answer
+
+    essays = [i for i, question in enumerate(questions) if question["Type"] == "서술형" and user_answers[i]]
+    cosines = index.similarities([questions[i]["ID"] for i in essays], [user_answers[i] for i in essays])
+    similarity = dict(zip(essays, cosines.tolist()))
+    return [
+        check_answer(answer, question, similarity=similarity.get(i))
+        for i, (answer, question) in enumerate(zip(user_answers, questions))
+    ]
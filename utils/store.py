@@ -0,0 +1,358 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import streamlit as st
+
+from utils.exam_state import AnswerRecord
+from utils.scheduler import ReviewItem
+
+logger = logging.getLogger(__name__)
+
+# 기본 저장소 경로 (응시 기록, 문제별 결과, 배지, 복습 일정)
+#   ANATOMY_ACE_STORE_PATH 로 다른 파일을 쓸 수 있음 (부하 테스트 등에서 실제 기록을 건드리지 않도록)
+STORE_PATH = "data/anatomy_ace.db"
+STORE_PATH_ENV = "ANATOMY_ACE_STORE_PATH"
+
+# 쓰기 스레드가 한 트랜잭션으로 묶어서 커밋하는 최대 쓰기 수
+WRITE_BATCH_SIZE = 256
+
+# 사용자 식별에 쓰는 URL 파라미터 이름
+USER_QUERY_PARAM = "uid"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    attempt_id  TEXT PRIMARY KEY,
+    user_id     TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    score       INTEGER,
+    max_score   INTEGER
+);
+CREATE INDEX IF NOT EXISTS attempts_by_user ON attempts (user_id, started_at);
+
+CREATE TABLE IF NOT EXISTS results (
+    attempt_id   TEXT NOT NULL,
+    position     INTEGER NOT NULL,
+    user_id      TEXT NOT NULL,
+    question_id  INTEGER NOT NULL,
+    user_answer  TEXT NOT NULL,
+    score        INTEGER NOT NULL,
+    is_correct   INTEGER NOT NULL,
+    started_at   REAL NOT NULL,
+    submitted_at REAL NOT NULL,
+    PRIMARY KEY (attempt_id, position)
+);
+CREATE INDEX IF NOT EXISTS results_by_user_question ON results (user_id, question_id, submitted_at);
+
+CREATE TABLE IF NOT EXISTS badges (
+    badge_id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id    TEXT NOT NULL,
+    attempt_id TEXT,
+    created_at REAL NOT NULL,
+    date       TEXT NOT NULL,
+    type       TEXT NOT NULL,
+    category   TEXT NOT NULL,
+    score      TEXT NOT NULL,
+    percentage TEXT NOT NULL,
+    grade      TEXT NOT NULL,
+    title      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS badges_by_user ON badges (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS review_items (
+    user_id     TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    easiness    REAL NOT NULL,
+    interval    REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    due_at      REAL NOT NULL,
+    reviewed_at REAL NOT NULL,
+    PRIMARY KEY (user_id, question_id)
+);
+"""
+
+# 쓰기 스레드 종료 신호
+_STOP = object()
+
+
+def make_badge(badge_type, category, total_score, max_score, now=None):
+    """
+    모의고사 완료 배지를 만드는 함수
+
+    Parameters:
+    badge_type (str): "일반 모의고사" 또는 "복습 모의고사"
+    category (str): 카테고리 이름
+    total_score (int): 획득 점수
+    max_score (int): 만점
+    now (datetime): 배지 생성 시각 (기본값: 현재 시각)
+
+    Returns:
+    dict: 배지 정보
+    """
+    now = now or datetime.now()
+    percentage = (total_score / max_score) * 100 if max_score else 0.0
+
+    # 점수에 따른 등급 결정
+    if percentage >= 90:
+        grade = "🏆 최우수"
+    elif percentage >= 80:
+        grade = "🥇 우수"
+    elif percentage >= 70:
+        grade = "🥈 장려"
+    else:
+        grade = "🥉 노력"
+
+    return {
+        "date": now.strftime("%Y-%m-%d %H:%M"),
+        "type": badge_type,
+        "category": category,
+        "score": f"{total_score}/{max_score}",
+        "percentage": f"{percentage:.1f}%",
+        "grade": grade,
+        "title": f"{badge_type} 완료: {grade}",
+    }
+
+
+class AttemptStore:
+    """
+    응시 기록, 문제별 결과, 배지를 저장하는 SQLite(WAL) 저장소
+
+    프로세스마다 연결 하나를 공유합니다. 쓰기는 큐에 넣기만 하고 바로 돌아오며,
+    별도 쓰기 스레드가 쌓인 쓰기를 한 트랜잭션으로 묶어서 커밋하므로 화면을 그리는
+    스크립트 실행이 디스크 쓰기를 기다리지 않습니다. 방금 쓴 내용을 읽어야 할 때는
+    flush()로 대기 중인 쓰기가 커밋될 때까지 기다립니다.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="attempt-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ---- 쓰기 (큐에 넣고 바로 반환) ----
+
+    def _enqueue(self, sql, params):
+        self._queue.put((sql, params))
+
+    def start_attempt(self, user_id, kind, started_at=None):
+        """새 응시 기록을 만들고 응시 ID를 반환하는 함수 (kind: "exam" 또는 "review")"""
+        attempt_id = uuid.uuid4().hex
+        self._enqueue(
+            "INSERT INTO attempts (attempt_id, user_id, kind, started_at) VALUES (?, ?, ?, ?)",
+            (attempt_id, user_id, kind, time.time() if started_at is None else started_at),
+        )
+        return attempt_id
+
+    def add_result(self, attempt_id, user_id, position, record):
+        """응시 기록에 문제 하나의 답변 기록(AnswerRecord)을 추가하는 함수"""
+        self._enqueue(
+            "INSERT OR REPLACE INTO results (attempt_id, position, user_id, question_id, user_answer, "
+            "score, is_correct, started_at, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (attempt_id, position, user_id, record.question_id, record.user_answer,
+             record.score, int(record.is_correct), record.started_at, record.submitted_at),
+        )
+
+    def finish_attempt(self, attempt_id, score, max_score, finished_at=None):
+        """응시 기록에 최종 점수를 저장하는 함수"""
+        self._enqueue(
+            "UPDATE attempts SET finished_at = ?, score = ?, max_score = ? WHERE attempt_id = ?",
+            (time.time() if finished_at is None else finished_at, int(score), int(max_score), attempt_id),
+        )
+
+    def add_badge(self, user_id, badge, attempt_id=None):
+        """make_badge()로 만든 배지를 저장하는 함수"""
+        self._enqueue(
+            "INSERT INTO badges (user_id, attempt_id, created_at, date, type, category, score, "
+            "percentage, grade, title) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (user_id, attempt_id, time.time(), badge["date"], badge["type"], badge["category"],
+             badge["score"], badge["percentage"], badge["grade"], badge["title"]),
+        )
+
+    def save_review_item(self, user_id, item):
+        """문제 하나의 간격 반복 상태(ReviewItem)를 저장하는 함수"""
+        self._enqueue(
+            "INSERT OR REPLACE INTO review_items (user_id, question_id, easiness, interval, "
+            "repetitions, due_at, reviewed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user_id, item.question_id, item.easiness, item.interval, item.repetitions,
+             item.due_at, item.reviewed_at),
+        )
+
+    def flush(self, timeout=None):
+        """지금까지 넣은 쓰기가 모두 커밋될 때까지 기다리는 함수"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _write_loop(self):
+        """쓰기 스레드: 큐에 쌓인 쓰기를 최대 WRITE_BATCH_SIZE개씩 묶어서 커밋"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE and not isinstance(batch[-1], threading.Event) \
+                    and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if isinstance(item, tuple)]
+            try:
+                if writes:
+                    self._commit(writes)
+            except Exception:
+                # 어떤 오류가 나도 쓰기 스레드는 살아 있어야 이후 쓰기가 큐에 쌓이지 않음
+                logger.exception("응시 기록 %d건을 저장하지 못했습니다.", len(writes))
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+            if batch[-1] is _STOP:
+                return
+
+    def _commit(self, writes):
+        """
+        쓰기 묶음을 한 트랜잭션으로 커밋하는 함수
+
+        쓰기마다 SAVEPOINT를 두어 실패한 쓰기만 되돌리고 기록을 남기며, 같은 묶음의
+        다른 쓰기(다른 사용자의 기록 등)는 그대로 커밋합니다. 트랜잭션 자체가 실패하면
+        (디스크 오류, 잠금 시간 초과 등) 되돌린 뒤 쓰기를 하나씩 다시 시도합니다.
+        """
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                for sql, params in writes:
+                    self._conn.execute("SAVEPOINT write")
+                    try:
+                        self._conn.execute(sql, params)
+                    except sqlite3.Error:
+                        self._conn.execute("ROLLBACK TO write")
+                        logger.exception("응시 기록을 저장하지 못했습니다: %s %r", sql, params)
+                    self._conn.execute("RELEASE write")
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                logger.exception("응시 기록 %d건을 한 번에 저장하지 못해 하나씩 다시 저장합니다.", len(writes))
+                # 되돌리기도 실패할 수 있으므로 따로 처리
+                try:
+                    if self._conn.in_transaction:
+                        self._conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    logger.exception("트랜잭션을 되돌리지 못했습니다.")
+                for sql, params in writes:
+                    try:
+                        self._conn.execute(sql, params)
+                    except sqlite3.Error:
+                        logger.exception("응시 기록을 저장하지 못했습니다: %s %r", sql, params)
+
+    def close(self):
+        """대기 중인 쓰기를 모두 커밋하고 연결을 닫는 함수"""
+        if not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    # ---- 읽기 (사용자별 색인 사용) ----
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def attempt(self, attempt_id):
+        """응시 기록 하나를 dict로 반환하는 함수 (없으면 None)"""
+        rows = self._query("SELECT * FROM attempts WHERE attempt_id = ?", (attempt_id,))
+        return dict(rows[0]) if rows else None
+
+    def attempt_results(self, attempt_id):
+        """응시 기록의 문제별 결과를 푼 순서대로 AnswerRecord 목록으로 반환하는 함수"""
+        rows = self._query(
+            "SELECT question_id, user_answer, score, is_correct, started_at, submitted_at "
+            "FROM results WHERE attempt_id = ? ORDER BY position",
+            (attempt_id,),
+        )
+        return [AnswerRecord(*row) for row in rows]
+
+    def result_stamp(self, attempt_id):
+        """응시 기록의 (답변 수, 마지막 제출 시각) - 결과가 바뀌었는지 확인하는 용도"""
+        rows = self._query(
+            "SELECT COUNT(*), MAX(submitted_at) FROM results WHERE attempt_id = ?",
+            (attempt_id,),
+        )
+        return tuple(rows[0])
+
+    def user_attempts(self, user_id, kind=None, finished_only=True, limit=20):
+        """사용자의 응시 기록을 최근 순으로 반환하는 함수"""
+        sql = "SELECT * FROM attempts WHERE user_id = ?"
+        params = [user_id]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        if finished_only:
+            sql += " AND finished_at IS NOT NULL"
+        sql += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._query(sql, params)]
+
+    def user_badges(self, user_id):
+        """사용자가 획득한 배지를 최근 순으로 반환하는 함수"""
+        rows = self._query(
+            "SELECT date, type, category, score, percentage, grade, title FROM badges "
+            "WHERE user_id = ? ORDER BY created_at DESC",
+            (user_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def review_items(self, user_id):
+        """사용자의 간격 반복 상태를 ReviewItem 목록으로 반환하는 함수"""
+        self.flush()  # 다른 세션에서 방금 기록한 상태까지 읽음
+        rows = self._query(
+            "SELECT question_id, easiness, interval, repetitions, due_at, reviewed_at "
+            "FROM review_items WHERE user_id = ?",
+            (user_id,),
+        )
+        return [ReviewItem(*row) for row in rows]
+
+
+@st.cache_resource(show_spinner=False)
+def get_store(path=None):
+    """
+    프로세스 전체가 공유하는 저장소 (연결과 쓰기 스레드는 프로세스마다 하나)
+
+    Parameters:
+    path (str): 저장소 파일 경로 (없으면 ANATOMY_ACE_STORE_PATH 환경 변수, 그것도 없으면 STORE_PATH)
+    """
+    return AttemptStore(path or os.environ.get(STORE_PATH_ENV) or STORE_PATH)
+
+
+def current_user_id():
+    """
+    현재 사용자 ID를 반환하는 함수
+
+    URL의 uid 파라미터로 사용자를 구분하므로 같은 주소로 다시 접속하면 이전 기록을
+    볼 수 있습니다. 파라미터가 없으면 세션에 있던 ID를 쓰거나 새로 만들어 URL에 넣습니다.
+    """
+    user_id = st.query_params.get(USER_QUERY_PARAM) or st.session_state.get("user_id") or uuid.uuid4().hex
+    if st.query_params.get(USER_QUERY_PARAM) != user_id:
+        st.query_params[USER_QUERY_PARAM] = user_id
+    st.session_state.user_id = user_id
+    return user_id
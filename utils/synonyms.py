@@ -0,0 +1,163 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+from utils.keyword_matcher import KeywordMatcher
+
+# 동의어/대역어 사전 (한 줄에 같은 뜻의 용어를 ;로 나열, #은 주석)
+SYNONYMS_PATH = "data/synonyms.txt"
+
+# 이보다 짧은 대체 표현은 쓰지 않음 (정규화 후 글자 수, "위" 같은 한 글자는 어디에나 포함됨)
+ALTERNATIVE_MIN_LENGTH = 2
+
+# 한글 용어와 영어 용어를 나란히 쓴 키워드(예: "위 superior")를 나눌 때 한쪽의 최대 단어 수
+# (이보다 긴 문장형 키워드는 나누지 않음)
+GLOSS_MAX_WORDS = 3
+
+# 비교할 때 무시하는 글자 (공백, 하이픈/대시, 밑줄, 괄호, 문장 부호 등 글자와 숫자가 아닌 것)
+_IGNORED = re.compile(r"[\W_]+")
+
+# "용어(풀이)" 형식의 키워드
+_PAREN_GLOSS = re.compile(r"^(?P<term>[^()]+?)\s*\((?P<gloss>[^()]+)\)$")
+
+# "용어_풀이" 형식의 키워드 (예: 신경핵_nucleus)
+_UNDERSCORE_GLOSS = re.compile(r"^(?P<term>[^_]+?)\s*_\s*(?P<gloss>[^_]+)$")
+
+# 한글 용어와 영어 용어가 나란히 있는 키워드 (예: "위 superior", "superior 위")
+_SCRIPT_GLOSS = (
+    re.compile(r"^(?P<term>[가-힣][가-힣 ]*?)\s*(?P<gloss>[a-z][a-z -]*)$"),
+    re.compile(r"^(?P<term>[a-z][a-z -]*?)\s*(?P<gloss>[가-힣][가-힣 ]*)$"),
+)
+
+
+def normalize_text(text):
+    """
+    비교용으로 텍스트를 정규화하는 함수
+
+    유니코드 호환 정규화(NFKC: 조합형 한글, 합자 "ﬁ", 전각 문자 등을 하나로 맞춤) 후
+    소문자로 바꾸고, 공백/하이픈/밑줄/괄호/문장 부호를 모두 없앱니다. 그래서
+    띄어쓰기나 하이픈 유무가 달라도 같은 문자열이 됩니다.
+
+    Parameters:
+    text (str): 텍스트
+
+    Returns:
+    str: 정규화한 텍스트 (예: "Upper-Limbs (팔)" -> "upperlimbs팔")
+    """
+    return _IGNORED.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def gloss_variants(keyword):
+    """
+    키워드에 함께 적힌 다른 언어 표기/풀이를 나눠서 돌려주는 함수
+
+    "epidermis(표피)", "신경핵_nucleus", "위 superior" 처럼 한 키워드에 두 표기가
+    같이 있으면 각각을 따로 인정할 수 있도록 나눕니다.
+
+    Returns:
+    list: 키워드 자신과 나눈 표기들
+    """
+    keyword = unicodedata.normalize("NFKC", keyword).lower().strip()
+    variants = [keyword]
+    match = _PAREN_GLOSS.match(keyword) or _UNDERSCORE_GLOSS.match(keyword)
+    if match is None:
+        for pattern in _SCRIPT_GLOSS:
+            match = pattern.match(keyword)
+            if match and all(len(match[part].split()) <= GLOSS_MAX_WORDS for part in ("term", "gloss")):
+                break
+            match = None
+    if match is not None:
+        variants.extend([match["term"], match["gloss"]])
+    return variants
+
+
+@lru_cache(maxsize=4)
+def load_synonyms(path=SYNONYMS_PATH):
+    """
+    동의어 사전을 읽는 함수 (프로세스마다 한 번, 파일을 고치면 서버를 다시 시작해야 반영)
+
+    Parameters:
+    path (str): 사전 파일 경로 (없으면 빈 사전)
+
+    Returns:
+    dict: 정규화한 용어 -> 같은 뜻 용어들(정규화, frozenset)
+    """
+    synonyms = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return synonyms
+
+    for line in lines:
+        line = line.split("#", 1)[0]
+        group = {normalize_text(term) for term in line.split(";")}
+        group = frozenset(term for term in group if len(term) >= ALTERNATIVE_MIN_LENGTH)
+        if len(group) < 2:
+            continue
+        for term in group:
+            # 여러 줄에 나오는 용어는 모든 줄의 용어를 합침
+            synonyms[term] = synonyms.get(term, frozenset()) | group
+    return synonyms
+
+
+def keyword_alternatives(keyword, synonyms):
+    """
+    키워드 하나를 인정하는 정규화된 표현 집합을 만드는 함수
+
+    키워드 자신과 함께 적힌 다른 표기(gloss_variants), 그리고 각 표기와 같은 뜻인
+    사전의 용어를 모두 정규화해서 모읍니다.
+
+    Returns:
+    frozenset: 정규화한 표현들 (ALTERNATIVE_MIN_LENGTH 미만은 제외)
+    """
+    alternatives = set()
+    for variant in gloss_variants(keyword):
+        normalized = normalize_text(variant)
+        if len(normalized) < ALTERNATIVE_MIN_LENGTH:
+            continue
+        alternatives.add(normalized)
+        alternatives |= synonyms.get(normalized, frozenset())
+    return frozenset(alternatives)
+
+
+class AlternativeMatcher:
+    """
+    키워드마다 미리 만들어 둔 대체 표현으로 정규화된 답변에서 키워드를 찾는 검색기
+
+    문제 은행을 읽을 때 한 번 만들어 두므로, 채점할 때는 답변만 한 번 정규화하고
+    모든 키워드의 대체 표현을 한 번에 검색합니다.
+
+    Attributes:
+    alternatives (dict): 키워드 -> 정규화한 대체 표현 집합
+    """
+
+    __slots__ = ("alternatives", "_matcher", "_owners")
+
+    def __init__(self, keywords, synonyms=None):
+        if synonyms is None:
+            synonyms = load_synonyms()
+        self.alternatives = {kw: keyword_alternatives(kw, synonyms) for kw in dict.fromkeys(keywords)}
+
+        # 대체 표현 -> 그 표현으로 인정되는 키워드들
+        owners = {}
+        for kw, alternatives in self.alternatives.items():
+            for alternative in alternatives:
+                owners.setdefault(alternative, []).append(kw)
+        self._owners = owners
+        self._matcher = KeywordMatcher(owners)
+
+    def find(self, normalized_text):
+        """
+        정규화된 답변에서 대체 표현이 나오는 키워드를 찾는 함수
+
+        Parameters:
+        normalized_text (str): normalize_text()로 정규화한 답변
+
+        Returns:
+        set: 찾은 키워드 집합
+        """
+        found = set()
+        for alternative in self._matcher.find(normalized_text):
+            found.update(self._owners[alternative])
+        return found
@@ -1,29 +1,133 @@
-import streamlit as st
+import os
 import time
+from functools import lru_cache
+
+import streamlit as st
+
+# 클라이언트가 보낸 시간 초과 신호를 인정하는 서버 기준 오차 (초)
+EXPIRY_TOLERANCE = 1.0
+
+# 제출 버튼 요청이 늦게 도착해도 인정하는 네트워크 여유 시간 (초)
+SUBMIT_GRACE = 2.0
+
+# 클라이언트가 시간 초과를 너무 일찍 알려왔을 때 서버 시계로 다시 확인하는 간격 (초)
+EXPIRY_RECHECK_INTERVAL = 0.5
+
+
+@lru_cache(maxsize=None)
+def _countdown_component():
+    """
+    브라우저에서 도는 카운트다운 컴포넌트 (빌드 과정 없는 정적 HTML)
+
+    컴포넌트 등록은 수십 ms가 걸리므로 모듈을 불러올 때가 아니라 타이머를 처음
+    표시할 때 프로세스당 한 번만 합니다.
+    """
+    import streamlit.components.v1 as components
+
+    return components.declare_component(
+        "countdown",
+        path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "countdown_frontend"),
+    )
+
 
-def countdown(seconds):
+def start_timer(seconds):
     """
-    카운트다운 타이머 함수
-    
+    현재 문제의 타이머를 시작하는 함수 (이미 시작된 경우 그대로 둠)
+
     Parameters:
-    seconds (int): 초 단위 시간
-    
-    Returns:
-    int: 남은 시간(초)
+    seconds (int): 제한 시간(초)
     """
-    # 타이머 시작 시간이 없으면 초기화
     if "timer_start" not in st.session_state:
         st.session_state.timer_start = time.time()
+    if "time_limit" not in st.session_state:
         st.session_state.time_limit = seconds
-    
-    # 경과 시간 계산
+
+
+def remaining_time():
+    """
+    서버에 저장된 timer_start/time_limit 기준 남은 시간을 계산하는 함수
+
+    Returns:
+    float: 남은 시간(초), 0 이상
+    """
     elapsed = time.time() - st.session_state.timer_start
-    remaining = max(0, st.session_state.time_limit - elapsed)
-    
-    # 시간이 다 되면 타이머 초기화
+    return max(0.0, st.session_state.time_limit - elapsed)
+
+
+def is_late_submission():
+    """
+    지금 도착한 요청(제출 버튼, 답변 입력)이 제한 시간(+네트워크 여유 시간)을 넘겼는지 확인하는 함수
+
+    시간 초과 신호로 자동 제출되는 답변은 이 함수로 거르지 않고, 마감 전에 저장해둔
+    답변(keep_answer)을 채점합니다 (백그라운드 탭이나 느린 연결 때문에 신호가 늦게 와도
+    마감 전에 입력해둔 답변은 채점).
+
+    Returns:
+    bool: 마감 이후에 도착한 요청이면 True
+    """
+    elapsed = time.time() - st.session_state.timer_start
+    return elapsed > st.session_state.time_limit + SUBMIT_GRACE
+
+
+def keep_answer(user_answer):
+    """
+    입력한 답변을 세션 상태(user_answer)에 저장하는 함수 (마감 뒤에 도착한 입력은 버림)
+
+    마감(+네트워크 여유 시간)이 지난 뒤의 다시 실행에서 들어온 입력은 저장하지 않으므로,
+    카운트다운을 숨기거나 멈춘 클라이언트가 시간이 지난 뒤에 답변을 고쳐도 채점에는
+    마감 전에 마지막으로 저장된 답변만 쓰입니다.
+
+    Parameters:
+    user_answer (str): 입력창의 현재 값
+
+    Returns:
+    str: 채점에 쓸 답변 (마감 전에 마지막으로 저장된 답변)
+    """
+    if not is_late_submission():
+        st.session_state.user_answer = user_answer
+    return st.session_state.user_answer
+
+
+@st.fragment(run_every=EXPIRY_RECHECK_INTERVAL)
+def _expiry_recheck():
+    # 서버 시계로도 시간이 다 되면 페이지 전체를 다시 실행 (countdown()이 True를 반환)
+    if remaining_time() <= 0:
+        st.rerun()
+
+
+def countdown(key, note=""):
+    """
+    브라우저에서 도는 카운트다운 타이머를 표시하는 함수
+
+    타이머는 브라우저에서만 갱신되고, 서버는 시간이 다 됐을 때 한 번만
+    호출됩니다. 시간 초과 여부는 클라이언트 신호와 관계없이 서버에 저장된
+    timer_start/time_limit으로 판정합니다. 클라이언트가 서버 시계보다 일찍 만료를
+    알려오면 컴포넌트는 다시 알리지 않으므로, 서버가 EXPIRY_RECHECK_INTERVAL마다
+    직접 확인해서 시간이 다 되면 다시 실행합니다.
+
+    Parameters:
+    key (str): 문제마다 다른 컴포넌트 키
+    note (str): 남은 시간 옆에 표시할 안내 문구
+
+    Returns:
+    bool: 서버 기준으로 시간이 다 되었으면 True
+    """
+    remaining = remaining_time()
     if remaining <= 0:
-        del st.session_state.timer_start
-        del st.session_state.time_limit
-        return 0
-    
-    return int(remaining)
+        return True
+
+    reported = _countdown_component()(
+        remaining=round(remaining, 1),
+        limit=st.session_state.time_limit,
+        note=note,
+        key=key,
+        default=None,
+    )
+
+    if reported is None:
+        return False
+    # 클라이언트가 일찍 만료를 알려와도 서버 시계로 확인될 때만 인정
+    if remaining <= EXPIRY_TOLERANCE:
+        return True
+    _expiry_recheck()
+    return False